@@ -0,0 +1,71 @@
+"""
+Бенчмарк: пропускная способность BackendAPIClient при разных настройках пула против FakeBackend
+
+Запуск: python -m benchmarks.bench_backend_pool [запросов] [одновременно]
+
+HTTP/2 здесь не меряется: aiohttp-сервер фейка не говорит h2c, мультиплексирование
+проверяется только против настоящего Backend за TLS (BACKEND_HTTP2=true, нужен пакет h2).
+"""
+import asyncio
+import sys
+import time
+from typing import List, Tuple
+
+from loadtest.fake_backend import FakeBackend, FakeBackendSettings
+from loadtest.harness import percentile
+from src.clients.backend_api import BackendAPIClient
+from src.monitoring.metrics import backend_pool_wait
+
+# (название, max_connections, max_keepalive, keepalive_expiry)
+CONFIGS: Tuple[Tuple[str, int, int, float], ...] = (
+    ("httpx default 100/20", 100, 20, 5.0),
+    ("keep-alive = pool 100/100", 100, 100, 5.0),
+    ("pool 50/50", 50, 50, 5.0),
+    ("small pool 20/20", 20, 20, 5.0),
+    ("large pool 200/200", 200, 200, 30.0),
+)
+
+
+async def _run(url: str, total: int, concurrency: int, max_connections: int, max_keepalive: int, expiry: float):
+    client = BackendAPIClient(max_connections=max_connections, max_keepalive=max_keepalive, keepalive_expiry=expiry)
+    client.base_url = url
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+
+    async def one(i: int) -> None:
+        async with semaphore:
+            started = time.perf_counter()
+            await client.get_user(100000 + i % 1000)
+            latencies.append(time.perf_counter() - started)
+
+    wait = backend_pool_wait.labels()
+    wait_sum, wait_count = wait.sum, wait.count
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(total)))
+    elapsed = time.perf_counter() - started
+    await client.aclose()
+    latencies.sort()
+    mean_wait = (wait.sum - wait_sum) / max(1, wait.count - wait_count)
+    return total / elapsed, percentile(latencies, 50), percentile(latencies, 95), mean_wait
+
+
+async def main(total: int = 3000, concurrency: int = 200) -> None:
+    backend = FakeBackend(FakeBackendSettings(latency=0.005))
+    url = await backend.start()
+    try:
+        # Прогрев: импорт, JIT-кеши httpx/aiohttp
+        await _run(url, 200, 50, 100, 100, 5.0)
+        print(f"{total} запросов, {concurrency} одновременно, задержка Backend 5 мс")
+        for name, max_connections, max_keepalive, expiry in CONFIGS:
+            rps, p50, p95, mean_wait = await _run(url, total, concurrency, max_connections, max_keepalive, expiry)
+            print(
+                f"  {name:26} {rps:8.0f} req/s  p50 {p50 * 1000:7.2f} ms  p95 {p95 * 1000:7.2f} ms"
+                f"  ожидание пула {mean_wait * 1000:6.2f} ms"
+            )
+    finally:
+        await backend.stop()
+
+
+if __name__ == "__main__":
+    args = [int(value) for value in sys.argv[1:3]]
+    asyncio.run(main(*args))
@@ -0,0 +1,75 @@
+"""
+Бенчмарк: компактный кодек callback данных против CallbackData.pack()/unpack()
+
+Запуск: python -m benchmarks.bench_callback_codec
+"""
+import timeit
+
+from aiogram.filters.callback_data import CallbackData
+
+from src.keyboards.factories import AdminExtendCallback, PaymentCallback
+
+
+class LegacyPaymentCallback(CallbackData, prefix="pay"):
+    """Прежний формат: payment_id перегружен строкой "<sid>:<provider>:<plan>" """
+    action: str
+    payment_id: str = ""
+    page: int = 1
+
+
+class LegacyAdminExtendCallback(CallbackData, prefix="aex"):
+    action: str
+    subscription_id: int
+    plan: str = ""
+
+
+CASES = [
+    (
+        "payment select",
+        LegacyPaymentCallback(action="change_method", payment_id="123456"),
+        PaymentCallback(action="select", subscription_id=123456, provider="yookassa", plan="m12"),
+    ),
+    (
+        "payment check",
+        LegacyPaymentCallback(action="check", payment_id="pay_2f9c1e7a4b"),
+        PaymentCallback(action="check", payment_id="pay_2f9c1e7a4b"),
+    ),
+    (
+        "admin extend",
+        LegacyAdminExtendCallback(action="select_plan", subscription_id=987654, plan="m3"),
+        AdminExtendCallback(action="select_plan", subscription_id=987654, plan="m3"),
+    ),
+]
+
+
+def _per_call_us(stmt, number: int) -> float:
+    return min(timeit.repeat(stmt, number=number, repeat=5)) / number * 1e6
+
+
+def main(number: int = 20000) -> None:
+    header = (
+        f"{'case':<16}{'codec':<9}{'bytes':>6}{'pack us':>10}"
+        f"{'unpack us':>11}{'cached us':>11}"
+    )
+    print(header)
+    print("-" * len(header))
+    for name, legacy, compact in CASES:
+        for label, cb in (("legacy", legacy), ("compact", compact)):
+            cls = type(cb)
+            packed = cb.pack()
+            pack_us = _per_call_us(cb.pack, number)
+            if label == "legacy":
+                unpack_us = _per_call_us(lambda: cls.unpack(packed), number)
+                cached = "-"
+            else:
+                # Холодный разбор без кеша и повторный (кнопка уже встречалась)
+                unpack_us = _per_call_us(lambda: cls._compact_unpack(packed), number)
+                cached = f"{_per_call_us(lambda: cls.unpack(packed), number):.2f}"
+            print(
+                f"{name:<16}{label:<9}{len(packed.encode()):>6}{pack_us:>10.2f}"
+                f"{unpack_us:>11.2f}{cached:>11}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+"""
+Бенчмарк: DateFormatter с кешем разбора против fromisoformat + astimezone на каждый вызов
+
+Запуск: python -m benchmarks.bench_date_formatter
+"""
+import timeit
+from datetime import datetime
+
+from src.services.date_formatter import DATE_PATTERNS, DateFormatter, get_zone
+
+TZ_NAME = "Europe/Moscow"
+# Типичная страница истории: 20 платежей, даты повторяются между запросами
+VALUES = [f"2024-01-{day:02d}T10:00:00Z" for day in range(1, 21)]
+
+
+def _naive_format(value: str, language: str) -> str:
+    dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    return dt.astimezone(get_zone(TZ_NAME)).strftime(DATE_PATTERNS[language])
+
+
+def _per_page_us(call, number: int) -> float:
+    return min(timeit.repeat(call, number=number, repeat=5)) / number * 1e6
+
+
+def main(number: int = 2000) -> None:
+    formatter = DateFormatter(TZ_NAME)
+    assert formatter.format_many(VALUES, "ru") == [_naive_format(v, "ru") for v in VALUES]
+    naive = _per_page_us(lambda: [_naive_format(v, "ru") for v in VALUES], number)
+    cached = _per_page_us(lambda: formatter.format_many(VALUES, "ru"), number)
+    print(f"{len(VALUES)} дат на страницу, мкс на страницу")
+    print(f"  {'без кеша':<14}{naive:8.2f}")
+    print(f"  {'DateFormatter':<14}{cached:8.2f}  (x{naive / cached:.1f})")
+
+
+if __name__ == "__main__":
+    main()
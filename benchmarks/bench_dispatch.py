@@ -0,0 +1,95 @@
+"""
+Бенчмарк: линейный перебор хендлеров Router против IndexedRouter для callback_query
+
+Запуск: python -m benchmarks.bench_dispatch
+"""
+import asyncio
+import time
+from typing import Literal
+
+from aiogram import F, Router
+from aiogram.filters import StateFilter
+from aiogram.filters.callback_data import CallbackData
+from aiogram.fsm.state import State, StatesGroup
+from aiogram.types import CallbackQuery, User
+
+from src.bot.dispatch import IndexedRouter
+
+ACTIONS = ("list", "detail", "check", "cancel")
+
+
+class BenchSG(StatesGroup):
+    idle = State()
+    busy = State()
+
+
+def _callback_classes(count: int):
+    return [
+        type(
+            f"BenchCallback{i}",
+            (CallbackData,),
+            {"__annotations__": {"action": Literal[ACTIONS], "item_id": int}},
+            prefix=f"b{i}",
+        )
+        for i in range(count)
+    ]
+
+
+def _populate(router: Router, classes) -> None:
+    async def handler(callback: CallbackQuery) -> None:
+        return None
+
+    for cls in classes:
+        for action in ACTIONS:
+            router.callback_query.register(
+                handler, StateFilter(BenchSG.idle), cls.filter(F.action == action)
+            )
+
+
+def _query(data: str) -> CallbackQuery:
+    return CallbackQuery(
+        id="1",
+        from_user=User(id=1, is_bot=False, first_name="bench"),
+        chat_instance="bench",
+        data=data,
+    )
+
+
+async def _per_call_us(router: Router, event: CallbackQuery, number: int) -> float:
+    trigger = router.callback_query.trigger
+    raw_state = BenchSG.idle.state
+    await trigger(event, raw_state=raw_state)
+    best = float("inf")
+    for _ in range(5):
+        started = time.perf_counter()
+        for _ in range(number):
+            await trigger(event, raw_state=raw_state)
+        best = min(best, time.perf_counter() - started)
+    return best / number * 1e6
+
+
+async def run(number: int = 2000) -> None:
+    header = f"{'prefixes':>9}{'handlers':>10}{'router us':>11}{'indexed us':>12}{'speedup':>9}"
+    print(header)
+    print("-" * len(header))
+    for count in (2, 8, 32, 128):
+        classes = _callback_classes(count)
+        plain, indexed = Router(), IndexedRouter()
+        _populate(plain, classes)
+        _populate(indexed, classes)
+        # Худший случай для перебора: последний хендлер последнего префикса
+        event = _query(classes[-1](action=ACTIONS[-1], item_id=42).pack())
+        plain_us = await _per_call_us(plain, event, number)
+        indexed_us = await _per_call_us(indexed, event, number)
+        print(
+            f"{count:>9}{count * len(ACTIONS):>10}{plain_us:>11.2f}"
+            f"{indexed_us:>12.2f}{plain_us / indexed_us:>8.1f}x"
+        )
+
+
+def main() -> None:
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
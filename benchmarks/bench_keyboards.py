@@ -0,0 +1,73 @@
+"""
+Бенчмарк: сборка клавиатур без кеша против мемоизированных билдеров
+
+Запуск: python -m benchmarks.bench_keyboards
+"""
+import timeit
+import tracemalloc
+
+from src.keyboards.cache import prebuild_keyboards
+from src.keyboards.inline import (
+    _build_payment_method_select_keyboard,
+    get_admin_main_keyboard,
+    get_payment_failed_keyboard,
+    get_payment_waiting_keyboard,
+    get_subscription_detail_keyboard,
+)
+from src.keyboards.reply import get_main_keyboard
+
+PROVIDERS = ["yookassa", "cryptobot"]
+PLANS = [
+    {"code": "m1", "amount": 299, "currency": "RUB"},
+    {"code": "m3", "amount": 799, "currency": "RUB"},
+    {"code": "m12", "amount": 2990, "currency": "RUB"},
+]
+
+PLAN_KEY = tuple((plan["code"], plan["amount"], plan["currency"]) for plan in PLANS)
+
+# (название, мемоизированный билдер, аргументы); без кеша — builder.__wrapped__
+CASES = [
+    ("main (reply)", get_main_keyboard, ("ru",)),
+    ("admin main", get_admin_main_keyboard, ("ru",)),
+    ("subscription", get_subscription_detail_keyboard, (123456, "ru")),
+    ("payment wait", get_payment_waiting_keyboard,
+     ("pay_2f9c1e7a4b", "https://pay.example/i/1", None, "ru")),
+    ("payment failed", get_payment_failed_keyboard, ("pay_2f9c1e7a4b", 123456, "ru")),
+    ("method select", _build_payment_method_select_keyboard,
+     (tuple(PROVIDERS), PLAN_KEY, 123456, "ru")),
+]
+
+
+def _allocated_bytes(call, number: int = 200) -> float:
+    call()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    results = [call() for _ in range(number)]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    stats = after.compare_to(before, "filename")
+    del results
+    return sum(stat.size_diff for stat in stats if stat.size_diff > 0) / number
+
+
+def _per_call_us(call, number: int) -> float:
+    return min(timeit.repeat(call, number=number, repeat=5)) / number * 1e6
+
+
+def main(number: int = 5000) -> None:
+    prebuild_keyboards(("ru", "en"))
+    header = f"{'keyboard':<16}{'build us':>10}{'cached us':>11}{'build B':>10}{'cached B':>10}"
+    print(header)
+    print("-" * len(header))
+    for name, builder, args in CASES:
+        raw = builder.__wrapped__
+        uncached = lambda: raw(*args)
+        cached = lambda: builder(*args)
+        print(
+            f"{name:<16}{_per_call_us(uncached, number):>10.2f}{_per_call_us(cached, number):>11.2f}"
+            f"{_allocated_bytes(uncached):>10.0f}{_allocated_bytes(cached):>10.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
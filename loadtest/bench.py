@@ -0,0 +1,156 @@
+"""
+Сквозной бенчмарк: синтетические апдейты через Dispatcher со всеми роутерами и middleware
+
+Запуск: python -m loadtest.bench --users 500 --save results.json
+Сравнение: python -m loadtest.bench --baseline results.json [--fail-on-regression]
+
+Redis — fakeredis (по умолчанию) или --redis-url; Backend и Telegram — фейки
+из loadtest/. По каждому сценарию: p50/p95/p99 задержки, операций/с, пиковый RSS.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import platform
+import sys
+from typing import Any, Dict, List, Optional, Tuple
+
+from loadtest.fake_backend import FakeBackend, FakeBackendSettings
+from loadtest.fake_telegram import FakeTelegram, FakeTelegramSettings
+from loadtest.harness import Harness
+from loadtest.scenarios import SCENARIOS
+
+# Сравниваемые показатели: (ключ, больше — лучше)
+COMPARED = (("ops_per_sec", True), ("p50_ms", False), ("p95_ms", False), ("p99_ms", False))
+# Диапазоны tg_id сценариев не пересекаются: у каждого свой счётчик RateLimitMiddleware
+USER_RANGE = 1_000_000
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    if args.redis_url:
+        from redis.asyncio import Redis
+        redis = Redis.from_url(args.redis_url)
+    else:
+        from fakeredis.aioredis import FakeRedis
+        redis = FakeRedis()
+
+    backend = FakeBackend(FakeBackendSettings(
+        latency=args.backend_latency,
+        jitter=args.backend_jitter,
+        error_rate=args.error_rate,
+        users=args.recipients,
+        subscriptions_per_user=25,
+    ))
+    limits = FakeTelegramSettings() if args.telegram_limits else FakeTelegramSettings(
+        global_rate=1e9, global_burst=10**9, chat_rate=1e9, chat_burst=10**9,
+    )
+    limits.latency = args.telegram_latency
+    telegram = FakeTelegram(limits)
+    await backend.start()
+    await telegram.start()
+    harness = Harness(redis, backend, telegram, concurrency=args.concurrency)
+    await harness.start()
+    results: Dict[str, Any] = {}
+    try:
+        for index, name in enumerate(args.scenarios):
+            first = USER_RANGE * (index + 1)
+            users = list(range(first, first + args.users))
+            result = await SCENARIOS[name](harness, users)
+            results[name] = result.summary()
+            print(_format_row(name, results[name]), flush=True)
+            if harness.errors.last and result.errors:
+                print(f"  last error: {harness.errors.last}", flush=True)
+    finally:
+        await harness.stop()
+        await telegram.stop()
+        await backend.stop()
+        await redis.aclose() if hasattr(redis, "aclose") else await redis.close()
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "users": args.users,
+            "concurrency": args.concurrency,
+            "redis": "redis" if args.redis_url else "fakeredis",
+            "backend_latency": args.backend_latency,
+            "telegram_limits": args.telegram_limits,
+        },
+        "scenarios": results,
+    }
+
+
+def _format_row(name: str, summary: Dict[str, Any]) -> str:
+    return (
+        f"{name:22} {summary['operations']:7d} ops {summary['ops_per_sec']:9.1f}/s  "
+        f"p50 {summary['p50_ms']:8.2f}ms  p95 {summary['p95_ms']:8.2f}ms  p99 {summary['p99_ms']:8.2f}ms  "
+        f"errors {summary['errors']}  rss {summary['peak_rss_mb']}MB"
+    )
+
+
+def compare(
+    current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float
+) -> Tuple[List[str], List[str]]:
+    """Строки сравнения и список регрессий (ухудшение больше tolerance)"""
+    lines: List[str] = []
+    regressions: List[str] = []
+    for name, summary in current["scenarios"].items():
+        base = baseline.get("scenarios", {}).get(name)
+        if base is None:
+            lines.append(f"{name:22} (нет в baseline)")
+            continue
+        cells = []
+        for key, higher_is_better in COMPARED:
+            old, new = base.get(key), summary.get(key)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            cells.append(f"{key} {old} -> {new} ({change:+.1%})")
+            worse = -change if higher_is_better else change
+            if worse > tolerance:
+                regressions.append(f"{name}.{key}: {old} -> {new} ({change:+.1%})")
+        lines.append(f"{name:22} " + "  ".join(cells))
+    return lines, regressions
+
+
+def _parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scenarios", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--users", type=int, default=200, help="пользователей на сценарий")
+    parser.add_argument("--concurrency", type=int, default=100, help="одновременно обрабатываемых пользователей")
+    parser.add_argument("--recipients", type=int, default=1000, help="получателей рассылки")
+    parser.add_argument("--redis-url", default="", help="реальный Redis вместо fakeredis")
+    parser.add_argument("--backend-latency", type=float, default=0.005)
+    parser.add_argument("--backend-jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--telegram-latency", type=float, default=0.0)
+    parser.add_argument("--telegram-limits", action="store_true", help="реальные лимиты Bot API (429)")
+    parser.add_argument("--save", default="", help="записать результаты в JSON")
+    parser.add_argument("--baseline", default="", help="сравнить с сохранёнными результатами")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="допустимое ухудшение (доля)")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    return parser.parse_args(argv)
+
+
+def _main(argv: Optional[List[str]] = None) -> int:
+    args = _parse_args(argv)
+    # Ошибки считает Harness; в консоль — только результаты
+    logging.getLogger().setLevel(logging.ERROR)
+    logging.getLogger().addHandler(logging.NullHandler())
+    current = asyncio.run(run(args))
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(current, f, ensure_ascii=False, indent=2)
+    if not args.baseline:
+        return 0
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    lines, regressions = compare(current, baseline, args.tolerance)
+    print(f"\nСравнение с {args.baseline} (допуск {args.tolerance:.0%}):")
+    print("\n".join(lines))
+    if regressions:
+        print("\nРегрессии:\n  " + "\n  ".join(regressions))
+        return 1 if args.fail_on_regression else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(_main())
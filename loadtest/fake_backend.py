@@ -0,0 +1,299 @@
+"""
+Фейковый Backend API для нагрузочных тестов (контракты docs/TZ.BackendAPI.md, п.5)
+
+Данные генерируются детерминированно из tg_id: любой пользователь существует,
+у него subscriptions_per_user подписок и payments_per_user платежей в истории.
+Задержка, доля ошибок 5xx и размер набора получателей рассылки настраиваются.
+"""
+import asyncio
+import random
+import uuid
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional
+
+from aiohttp import web
+
+from loadtest.server import FakeServer
+
+# Размер страницы списков по контракту (п.7.5)
+PAGE_SIZE = 10
+PLANS = (("m1", 10.0), ("m3", 27.0), ("m6", 50.0), ("y1", 90.0))
+PROVIDERS = ("yookassa", "paypal", "cryptomus")
+PAYMENT_STATUSES = ("paid", "paid", "failed", "canceled")
+
+
+@dataclass
+class FakeBackendSettings:
+    latency: float = 0.005
+    jitter: float = 0.0
+    error_rate: float = 0.0
+    error_status: int = 500
+    users: int = 1000
+    first_tg_id: int = 100000
+    services: int = 5
+    subscriptions_per_user: int = 3
+    payments_per_user: int = 25
+    payment_ttl: int = 900
+    token: Optional[str] = None
+    seed: int = 0
+
+
+def _iso(value: datetime) -> str:
+    return value.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _error(status: int, code: str, message: str) -> web.Response:
+    return web.json_response({"code": code, "message": message}, status=status)
+
+
+def _page(items: list, page: int) -> Dict[str, Any]:
+    pages = max(1, -(-len(items) // PAGE_SIZE))
+    start = (page - 1) * PAGE_SIZE
+    return {"items": items[start:start + PAGE_SIZE], "page": page, "pages": pages}
+
+
+def _int_param(request: web.Request, name: str, default: int) -> int:
+    try:
+        return max(1, int(request.query.get(name, default)))
+    except ValueError:
+        return default
+
+
+class FakeBackend(FakeServer):
+    """aiohttp-приложение с эндпоинтами Backend API и счётчиками запросов"""
+
+    def __init__(self, settings: Optional[FakeBackendSettings] = None):
+        super().__init__()
+        self.settings = settings or FakeBackendSettings()
+        self.requests: Counter = Counter()
+        self.errors_injected = 0
+        self._random = random.Random(self.settings.seed)
+        self._now = datetime.now(timezone.utc).replace(microsecond=0)
+        # Изменяемое состояние: переопределения пользователей, созданные платежи, ответы по ключу идемпотентности
+        self._users: Dict[int, Dict[str, Any]] = {}
+        self.payments: Dict[str, Dict[str, Any]] = {}
+        self._idempotency: Dict[str, Dict[str, Any]] = {}
+        self._next_subscription_id = 1
+
+    def build_app(self) -> web.Application:
+        app = web.Application(middlewares=[self._middleware])
+        app.add_routes([
+            web.get("/users/{tg_id}", self._get_user),
+            web.patch("/users/{tg_id}", self._update_user),
+            web.post("/users/{tg_id}/language", self._update_language),
+            web.get("/users/{tg_id}/subscriptions", self._user_subscriptions),
+            web.get("/users/{tg_id}/payments", self._user_payments),
+            web.get("/subscriptions/{id}", self._get_subscription),
+            web.get("/services/{id}", self._get_service),
+            web.get("/services/{id}/payment-options", self._payment_options),
+            web.get("/services/{id}/faq", self._faq),
+            web.post("/payments", self._create_payment),
+            web.get("/payments/{id}", self._get_payment),
+            web.get("/admin/users/search", self._search_users),
+            web.get("/admin/users/{tg_id}", self._admin_user),
+            web.get("/admin/stats", self._admin_stats),
+            web.post("/admin/subscriptions", self._admin_create_subscription),
+            web.post("/admin/subscriptions/{id}/extend", self._admin_extend),
+            web.post("/admin/services/{id}/{action:start|pause|resume}", self._admin_service_action),
+            web.get("/admin/broadcast/recipients", self._broadcast_recipients),
+            web.post("/events", self._event),
+        ])
+        return app
+
+    @web.middleware
+    async def _middleware(self, request: web.Request, handler):
+        settings = self.settings
+        route = request.match_info.route.resource
+        self.requests[f"{request.method} {route.canonical if route else request.path}"] += 1
+        if settings.token and request.headers.get("Authorization") != f"Bearer {settings.token}":
+            return _error(401, "unauthorized", "Invalid token")
+        delay = settings.latency + (self._random.uniform(0, settings.jitter) if settings.jitter else 0.0)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if settings.error_rate and self._random.random() < settings.error_rate:
+            self.errors_injected += 1
+            return _error(settings.error_status, "internal_error", "Injected failure")
+        return await handler(request)
+
+    # Генерация данных
+
+    def user(self, tg_id: int) -> Dict[str, Any]:
+        data = {"tg_id": tg_id, "language": "ru", "used_bot_before": False}
+        data.update(self._users.get(tg_id, {}))
+        return data
+
+    def subscription(self, subscription_id: int) -> Optional[Dict[str, Any]]:
+        tg_id, index = divmod(subscription_id, 100)
+        if index >= self.settings.subscriptions_per_user or tg_id <= 0:
+            return None
+        service_id = index % self.settings.services + 1
+        active = index % 3 != 2
+        return {
+            "id": subscription_id,
+            "service_id": service_id,
+            "service_name": f"Service {service_id}",
+            "status": "active" if active else "expired",
+            "until_date": _iso(self._now + timedelta(days=7 + index * 11)) if active else None,
+        }
+
+    def _history(self, tg_id: int) -> list:
+        items = []
+        for index in range(self.settings.payments_per_user):
+            plan, amount = PLANS[index % len(PLANS)]
+            items.append({
+                "id": f"pay_{tg_id}_{index}",
+                "provider": PROVIDERS[index % len(PROVIDERS)],
+                "amount": amount,
+                "currency": "USD",
+                "status": PAYMENT_STATUSES[index % len(PAYMENT_STATUSES)],
+                "date": _iso(self._now - timedelta(days=index * 30)),
+                "description": f"Plan {plan}",
+            })
+        return items
+
+    # Пользователи и подписки
+
+    async def _get_user(self, request: web.Request) -> web.Response:
+        return web.json_response(self.user(int(request.match_info["tg_id"])))
+
+    async def _update_user(self, request: web.Request) -> web.Response:
+        body = await request.json()
+        self._users.setdefault(int(request.match_info["tg_id"]), {}).update(body)
+        return web.Response(status=204)
+
+    async def _update_language(self, request: web.Request) -> web.Response:
+        body = await request.json()
+        if body.get("language") not in ("ru", "en"):
+            return _error(400, "validation_error", "language must be ru or en")
+        self._users.setdefault(int(request.match_info["tg_id"]), {})["language"] = body["language"]
+        return web.Response(status=204)
+
+    async def _user_subscriptions(self, request: web.Request) -> web.Response:
+        tg_id = int(request.match_info["tg_id"])
+        items = [self.subscription(tg_id * 100 + index) for index in range(self.settings.subscriptions_per_user)]
+        return web.json_response(_page(items, _int_param(request, "page", 1)))
+
+    async def _user_payments(self, request: web.Request) -> web.Response:
+        items = self._history(int(request.match_info["tg_id"]))
+        return web.json_response(_page(items, _int_param(request, "page", 1)))
+
+    async def _get_subscription(self, request: web.Request) -> web.Response:
+        subscription = self.subscription(int(request.match_info["id"]))
+        if subscription is None:
+            return _error(404, "not_found", "Subscription not found")
+        return web.json_response(subscription)
+
+    # Сервисы
+
+    async def _get_service(self, request: web.Request) -> web.Response:
+        service_id = int(request.match_info["id"])
+        if not 1 <= service_id <= self.settings.services:
+            return _error(404, "not_found", "Service not found")
+        return web.json_response({
+            "id": service_id,
+            "name": f"Service {service_id}",
+            "status": "running",
+            "support_link": "https://t.me/support",
+        })
+
+    async def _payment_options(self, request: web.Request) -> web.Response:
+        return web.json_response({
+            "providers": list(PROVIDERS),
+            "plans": [{"code": code, "amount": amount, "currency": "USD"} for code, amount in PLANS],
+        })
+
+    async def _faq(self, request: web.Request) -> web.Response:
+        return web.json_response({"text": f"FAQ ({request.query.get('lang', 'ru')})"})
+
+    # Платежи
+
+    async def _create_payment(self, request: web.Request) -> web.Response:
+        key = request.headers.get("Idempotency-Key") or request.headers.get("X-Idempotency-Key")
+        if key and key in self._idempotency:
+            return web.json_response(self._idempotency[key])
+        body = await request.json()
+        if body.get("plan") not in dict(PLANS) or body.get("provider") not in PROVIDERS:
+            return _error(400, "validation_error", "Unknown plan or provider")
+        payment_id = f"pay_{uuid.uuid4().hex[:16]}"
+        expires_at = _iso(datetime.now(timezone.utc) + timedelta(seconds=self.settings.payment_ttl))
+        result = {
+            "payment_id": payment_id,
+            "pay_link": f"https://pay.example/{payment_id}",
+            "expires_at": expires_at,
+        }
+        self.payments[payment_id] = {
+            "id": payment_id,
+            "provider": body["provider"],
+            "amount": dict(PLANS)[body["plan"]],
+            "currency": "USD",
+            "status": "pending",
+            "date": _iso(datetime.now(timezone.utc)),
+        }
+        if key:
+            self._idempotency[key] = result
+        return web.json_response(result)
+
+    async def _get_payment(self, request: web.Request) -> web.Response:
+        payment = self.payments.get(request.match_info["id"])
+        if payment is None:
+            return _error(404, "not_found", "Payment not found")
+        return web.json_response(payment)
+
+    # Админка
+
+    async def _search_users(self, request: web.Request) -> web.Response:
+        query = request.query.get("q", "")
+        items = []
+        if query.isdigit():
+            items.append({**self.user(int(query)), "subscriptions_count": self.settings.subscriptions_per_user})
+        # Клиент читает обёртку {items: [...]}
+        return web.json_response({"items": items})
+
+    async def _admin_user(self, request: web.Request) -> web.Response:
+        tg_id = int(request.match_info["tg_id"])
+        return web.json_response({
+            "profile": self.user(tg_id),
+            "subscriptions": [
+                self.subscription(tg_id * 100 + index) for index in range(self.settings.subscriptions_per_user)
+            ],
+            "last_payments": self._history(tg_id)[:5],
+        })
+
+    async def _admin_stats(self, request: web.Request) -> web.Response:
+        return web.json_response({
+            "users_total": self.settings.users,
+            "users_active": self.settings.users // 2,
+            "active_subscriptions": self.settings.users,
+            "mrr": [{"currency": "USD", "amount": self.settings.users * 10.0}],
+        })
+
+    async def _admin_create_subscription(self, request: web.Request) -> web.Response:
+        await request.json()
+        subscription_id = self._next_subscription_id
+        self._next_subscription_id += 1
+        until_date = _iso(datetime.now(timezone.utc) + timedelta(days=30))
+        return web.json_response({"id": subscription_id, "until_date": until_date}, status=201)
+
+    async def _admin_extend(self, request: web.Request) -> web.Response:
+        await request.json()
+        return web.json_response({"until_date": _iso(datetime.now(timezone.utc) + timedelta(days=30))})
+
+    async def _admin_service_action(self, request: web.Request) -> web.Response:
+        return web.Response(status=204)
+
+    async def _broadcast_recipients(self, request: web.Request) -> web.Response:
+        limit = min(_int_param(request, "limit", 1000), 1000)
+        cursor = request.query.get("cursor")
+        start = int(cursor) if cursor and cursor.isdigit() else 0
+        end = min(start + limit, self.settings.users)
+        first = self.settings.first_tg_id
+        data: Dict[str, Any] = {"items": list(range(first + start, first + end))}
+        if end < self.settings.users:
+            data["next_cursor"] = str(end)
+        return web.json_response(data)
+
+    async def _event(self, request: web.Request) -> web.Response:
+        await request.read()
+        return web.Response(status=204)
@@ -0,0 +1,240 @@
+"""
+Фейковый Telegram Bot API для нагрузочных тестов
+
+Принимает вызовы вида POST /bot<token>/<method>, записывает их и применяет
+лимиты, близкие к реальным: ~30 сообщений/с на бота, ~1/с в личный чат и
+20/мин в группу. Сверх лимита отвечает 429 с parameters.retry_after — aiogram
+поднимает TelegramRetryAfter так же, как на настоящем API. Повторное
+редактирование тем же текстом даёт 400 «message is not modified».
+"""
+import asyncio
+import json
+import math
+import time
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, FrozenSet, List, Optional, Tuple
+
+from aiohttp import web
+
+from loadtest.server import FakeServer
+
+# Методы, на которые действуют лимиты отправки
+LIMITED_METHODS = frozenset({
+    "sendMessage", "sendPhoto", "sendDocument", "sendMediaGroup", "copyMessage", "forwardMessage",
+    "editMessageText", "editMessageReplyMarkup", "editMessageCaption",
+})
+NOT_MODIFIED = (
+    "Bad Request: message is not modified: specified new message content and reply markup "
+    "are exactly the same as a specified old content and reply markup of the message"
+)
+
+
+@dataclass
+class FakeTelegramSettings:
+    latency: float = 0.0
+    global_rate: float = 30.0
+    global_burst: int = 30
+    chat_rate: float = 1.0
+    chat_burst: int = 3
+    group_rate: float = 20 / 60
+    group_burst: int = 20
+    blocked: FrozenSet[int] = frozenset()
+    max_calls: int = 100000
+    bot_id: int = 1000001
+
+
+@dataclass
+class TelegramCall:
+    method: str
+    chat_id: Optional[int]
+    params: Dict[str, Any]
+    status: int
+    at: float = field(default_factory=time.monotonic)
+
+
+class TokenBucket:
+    """Ведро токенов: rate в секунду, не больше burst подряд"""
+
+    __slots__ = ("rate", "burst", "tokens", "updated")
+
+    def __init__(self, rate: float, burst: int, now: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = now
+
+    def take(self, now: float) -> float:
+        """0 — токен взят; иначе сколько секунд ждать следующего"""
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+def _chat_id(params: Dict[str, Any]) -> Optional[int]:
+    try:
+        return int(params["chat_id"])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+class FakeTelegram(FakeServer):
+    """aiohttp-приложение Bot API: запись вызовов, лимиты, очередь апдейтов для getUpdates"""
+
+    def __init__(self, settings: Optional[FakeTelegramSettings] = None):
+        super().__init__()
+        self.settings = settings or FakeTelegramSettings()
+        self.calls: Deque[TelegramCall] = deque(maxlen=self.settings.max_calls)
+        self.counts: Counter = Counter()
+        self.rate_limited = 0
+        self.messages: Dict[Tuple[int, int], Tuple[str, str]] = {}
+        self._next_message_id = 1
+        self._global: Optional[TokenBucket] = None
+        self._chats: Dict[int, TokenBucket] = {}
+        self._updates: List[Dict[str, Any]] = []
+        self._update_id = 0
+        self._updates_ready = asyncio.Event()
+
+    def build_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_post("/bot{token}/{method}", self._handle)
+        return app
+
+    def push_update(self, update: Dict[str, Any]) -> int:
+        """Положить апдейт в очередь getUpdates; вернуть его update_id"""
+        self._update_id += 1
+        self._updates.append({**update, "update_id": self._update_id})
+        self._updates_ready.set()
+        return self._update_id
+
+    def calls_for(self, method: str) -> List[TelegramCall]:
+        return [call for call in self.calls if call.method == method]
+
+    def reset(self) -> None:
+        self.calls.clear()
+        self.counts.clear()
+        self.rate_limited = 0
+        self._global = None
+        self._chats.clear()
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        method = request.match_info["method"]
+        params = await self._params(request)
+        chat_id = _chat_id(params)
+        if self.settings.latency:
+            await asyncio.sleep(self.settings.latency)
+
+        status, payload = await self._dispatch(method, params, chat_id)
+        self.counts[method] += 1
+        self.calls.append(TelegramCall(method, chat_id, params, status))
+        return web.json_response(payload, status=status)
+
+    async def _params(self, request: web.Request) -> Dict[str, Any]:
+        if request.content_type == "application/json":
+            return await request.json()
+        form = await request.post()
+        params: Dict[str, Any] = {}
+        for key, value in form.items():
+            if not isinstance(value, str):
+                params[key] = "<file>"
+                continue
+            # Сложные поля (reply_markup, entities) aiogram передаёт JSON-строкой
+            if value[:1] in ("{", "["):
+                try:
+                    value = json.loads(value)
+                except ValueError:
+                    pass
+            params[key] = value
+        return params
+
+    async def _dispatch(self, method: str, params: Dict[str, Any], chat_id: Optional[int]):
+        if method == "getUpdates":
+            return 200, {"ok": True, "result": await self._get_updates(params)}
+        if method == "getMe":
+            return 200, {"ok": True, "result": {
+                "id": self.settings.bot_id, "is_bot": True, "first_name": "Fake", "username": "fake_bot",
+            }}
+        if chat_id is not None and chat_id in self.settings.blocked:
+            return 403, {"ok": False, "error_code": 403, "description": "Forbidden: bot was blocked by the user"}
+        if method in LIMITED_METHODS:
+            wait = self._throttle(chat_id)
+            if wait:
+                self.rate_limited += 1
+                retry_after = max(1, math.ceil(wait))
+                return 429, {
+                    "ok": False,
+                    "error_code": 429,
+                    "description": f"Too Many Requests: retry after {retry_after}",
+                    "parameters": {"retry_after": retry_after},
+                }
+        if method in ("sendMessage", "sendPhoto", "sendDocument", "copyMessage", "forwardMessage"):
+            return 200, {"ok": True, "result": self._send(chat_id, params)}
+        if method in ("editMessageText", "editMessageReplyMarkup", "editMessageCaption"):
+            return self._edit(method, chat_id, params)
+        return 200, {"ok": True, "result": True}
+
+    def _throttle(self, chat_id: Optional[int]) -> float:
+        now = time.monotonic()
+        settings = self.settings
+        if self._global is None:
+            self._global = TokenBucket(settings.global_rate, settings.global_burst, now)
+        wait = 0.0
+        if chat_id is not None:
+            bucket = self._chats.get(chat_id)
+            if bucket is None:
+                group = chat_id < 0
+                bucket = self._chats[chat_id] = TokenBucket(
+                    settings.group_rate if group else settings.chat_rate,
+                    settings.group_burst if group else settings.chat_burst,
+                    now,
+                )
+            wait = bucket.take(now)
+        if wait:
+            return wait
+        return self._global.take(now)
+
+    def _message(self, chat_id: Optional[int], message_id: int, text: str) -> Dict[str, Any]:
+        return {
+            "message_id": message_id,
+            "date": int(time.time()),
+            "chat": {"id": chat_id, "type": "private" if (chat_id or 0) > 0 else "group", "title": "chat"},
+            "from": {"id": self.settings.bot_id, "is_bot": True, "first_name": "Fake"},
+            "text": text,
+        }
+
+    def _send(self, chat_id: Optional[int], params: Dict[str, Any]) -> Dict[str, Any]:
+        message_id = self._next_message_id
+        self._next_message_id += 1
+        text = str(params.get("text", ""))
+        self.messages[(chat_id, message_id)] = (text, json.dumps(params.get("reply_markup"), sort_keys=True))
+        return self._message(chat_id, message_id, text)
+
+    def _edit(self, method: str, chat_id: Optional[int], params: Dict[str, Any]):
+        try:
+            message_id = int(params["message_id"])
+        except (KeyError, TypeError, ValueError):
+            return 400, {"ok": False, "error_code": 400, "description": "Bad Request: message identifier is not specified"}
+        old_text, old_markup = self.messages.get((chat_id, message_id), ("", "null"))
+        text = str(params["text"]) if method == "editMessageText" and "text" in params else old_text
+        markup = json.dumps(params.get("reply_markup"), sort_keys=True)
+        if (text, markup) == (old_text, old_markup):
+            return 400, {"ok": False, "error_code": 400, "description": NOT_MODIFIED}
+        self.messages[(chat_id, message_id)] = (text, markup)
+        return 200, {"ok": True, "result": self._message(chat_id, message_id, text)}
+
+    async def _get_updates(self, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        offset = int(params.get("offset") or 0)
+        limit = int(params.get("limit") or 100)
+        timeout = float(params.get("timeout") or 0)
+        if offset:
+            self._updates = [update for update in self._updates if update["update_id"] >= offset]
+        if not self._updates and timeout:
+            self._updates_ready.clear()
+            try:
+                await asyncio.wait_for(self._updates_ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        return self._updates[:limit]
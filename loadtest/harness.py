@@ -0,0 +1,208 @@
+"""
+Стенд для прогона синтетических апдейтов через настоящий Dispatcher
+
+Бот, диспетчер (build_dispatcher из src.bot.main — те же middleware и роутеры,
+что в проде), Redis (fakeredis или реальный), фейковые Backend и Telegram.
+Задержка апдейта — время dp.feed_update, включая все HTTP-вызовы.
+"""
+import asyncio
+import logging
+import math
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+
+from aiogram import Bot
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware
+from aiogram.client.telegram import TelegramAPIServer
+from aiogram.types import Update
+
+from loadtest.fake_backend import FakeBackend
+from loadtest.fake_telegram import FakeTelegram
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+BOT_TOKEN = "42:loadtest"
+
+
+def percentile(values: List[float], p: float) -> float:
+    """Перцентиль по ближайшему рангу (values отсортированы)"""
+    if not values:
+        return 0.0
+    return values[max(0, math.ceil(p / 100 * len(values)) - 1)]
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Пиковый RSS процесса в МБ (ru_maxrss: КБ в Linux, байты в macOS)"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+@dataclass
+class ScenarioResult:
+    name: str
+    seconds: float
+    latencies: List[float] = field(default_factory=list)
+    errors: int = 0
+    extra: Dict[str, Any] = field(default_factory=dict)
+
+    def summary(self) -> Dict[str, Any]:
+        ordered = sorted(self.latencies)
+        return {
+            "operations": len(ordered),
+            "seconds": round(self.seconds, 3),
+            "ops_per_sec": round(len(ordered) / self.seconds, 1) if self.seconds else 0.0,
+            "p50_ms": round(percentile(ordered, 50) * 1000, 2),
+            "p95_ms": round(percentile(ordered, 95) * 1000, 2),
+            "p99_ms": round(percentile(ordered, 99) * 1000, 2),
+            "errors": self.errors,
+            "peak_rss_mb": peak_rss_mb(),
+            **self.extra,
+        }
+
+
+class ErrorCounter(logging.Handler):
+    """Считает записи ERROR: хендлеры бота глотают исключения и только логируют их"""
+
+    def __init__(self):
+        super().__init__(logging.ERROR)
+        self.count = 0
+        self.last: Optional[str] = None
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.count += 1
+        self.last = record.getMessage()
+
+
+class CallTimer(BaseRequestMiddleware):
+    """Middleware сессии бота: длительности вызовов выбранного метода Bot API"""
+
+    def __init__(self):
+        self.method: Optional[str] = None
+        self.durations: List[float] = []
+
+    async def __call__(self, make_request, bot, method):
+        if method.__api_method__ != self.method:
+            return await make_request(bot, method)
+        started = time.perf_counter()
+        try:
+            return await make_request(bot, method)
+        finally:
+            self.durations.append(time.perf_counter() - started)
+
+
+class UpdateFactory:
+    """Синтетические апдейты в формате Bot API"""
+
+    def __init__(self, bot: Bot):
+        self.bot = bot
+        self._update_id = 0
+        self._message_id = 0
+
+    def _next(self) -> int:
+        self._update_id += 1
+        return self._update_id
+
+    @staticmethod
+    def _user(user_id: int) -> Dict[str, Any]:
+        return {"id": user_id, "is_bot": False, "first_name": f"user{user_id}", "language_code": "ru"}
+
+    def _message_data(self, user_id: int, text: str, message_id: Optional[int] = None) -> Dict[str, Any]:
+        if message_id is None:
+            self._message_id += 1
+            message_id = self._message_id
+        return {
+            "message_id": message_id,
+            "date": int(time.time()),
+            "chat": {"id": user_id, "type": "private"},
+            "from": self._user(user_id),
+            "text": text,
+        }
+
+    def message(self, user_id: int, text: str) -> Update:
+        data = {"update_id": self._next(), "message": self._message_data(user_id, text)}
+        return Update.model_validate(data, context={"bot": self.bot})
+
+    def callback(self, user_id: int, callback_data: str, message_id: int = 1) -> Update:
+        update_id = self._next()
+        data = {
+            "update_id": update_id,
+            "callback_query": {
+                "id": str(update_id),
+                "from": self._user(user_id),
+                "chat_instance": str(user_id),
+                "data": callback_data,
+                "message": self._message_data(user_id, "…", message_id),
+            },
+        }
+        return Update.model_validate(data, context={"bot": self.bot})
+
+
+class Harness:
+    """Бот + диспетчер + фейки; feed() замеряет обработку одного апдейта"""
+
+    def __init__(self, redis, backend: FakeBackend, telegram: FakeTelegram, concurrency: int = 100):
+        self.redis = redis
+        self.backend = backend
+        self.telegram = telegram
+        self.concurrency = concurrency
+        self.errors = ErrorCounter()
+        self.call_timer = CallTimer()
+        self.bot: Optional[Bot] = None
+        self.dp = None
+        self.redis_helper = None
+        self.updates: Optional[UpdateFactory] = None
+        self._base_url: Optional[str] = None
+
+    async def start(self) -> None:
+        from src.bot.main import build_dispatcher
+        from src.clients.backend_api import api_client
+
+        self._base_url, api_client.base_url = api_client.base_url, self.backend.url
+        session = AiohttpSession(api=TelegramAPIServer.from_base(self.telegram.url))
+        self.bot = Bot(BOT_TOKEN, session=session, parse_mode="HTML")
+        self.bot.session.middleware(self.call_timer)
+        self.dp, self.redis_helper = build_dispatcher(self.bot, self.redis)
+        self.updates = UpdateFactory(self.bot)
+        logging.getLogger().addHandler(self.errors)
+
+    async def stop(self) -> None:
+        from src.clients.backend_api import api_client
+
+        logging.getLogger().removeHandler(self.errors)
+        if self._base_url is not None:
+            api_client.base_url = self._base_url
+        if self.bot is not None:
+            await self.bot.session.close()
+
+    async def feed(self, update: Update) -> float:
+        started = time.perf_counter()
+        try:
+            await self.dp.feed_update(self.bot, update)
+        except Exception as e:
+            self.errors.count += 1
+            self.errors.last = f"{type(e).__name__}: {e}"
+        return time.perf_counter() - started
+
+    async def run_users(
+        self,
+        user_ids: Iterable[int],
+        journey: Callable[[int], Awaitable[List[float]]],
+    ) -> List[float]:
+        """Сценарий пользователя для каждого id, не больше concurrency одновременно"""
+        semaphore = asyncio.Semaphore(self.concurrency)
+        latencies: List[float] = []
+
+        async def run(user_id: int) -> None:
+            async with semaphore:
+                latencies.extend(await journey(user_id))
+
+        await asyncio.gather(*(run(user_id) for user_id in user_ids))
+        return latencies
@@ -0,0 +1,165 @@
+"""
+Сценарии нагрузки: старт, просмотр списков, продление, уведомления об оплате, рассылка
+
+Каждый сценарий получает свой диапазон tg_id (RateLimitMiddleware считает
+апдейты пользователя за минуту) и возвращает ScenarioResult.
+"""
+import asyncio
+import time
+from typing import Awaitable, Callable, Dict, List
+
+import aiohttp
+from aiohttp import web
+
+from loadtest.harness import Harness, ScenarioResult
+from src.bot.config import config
+from src.i18n.translations import translations
+from src.keyboards.factories import (
+    PaymentCallback,
+    PaymentHistoryCallback,
+    RenewCallback,
+    SubscriptionCallback,
+)
+from src.states.admin import AdminSG
+
+Scenario = Callable[[Harness, List[int]], Awaitable[ScenarioResult]]
+
+
+async def start_storm(h: Harness, users: List[int]) -> ScenarioResult:
+    """Все пользователи одновременно отправляют /start"""
+
+    async def journey(user_id: int) -> List[float]:
+        return [await h.feed(h.updates.message(user_id, "/start"))]
+
+    return await _measure("start_storm", h, lambda: h.run_users(users, journey))
+
+
+async def pagination(h: Harness, users: List[int]) -> ScenarioResult:
+    """Листание списков: подписки (чётные пользователи) и история платежей (нечётные)"""
+    subscriptions = translations.get("menu.main.subscriptions", "ru")
+    history = translations.get("menu.main.payment_history", "ru")
+
+    async def journey(user_id: int) -> List[float]:
+        feed, updates = h.feed, h.updates
+        latencies = [await feed(updates.message(user_id, "/start"))]
+        if user_id % 2 == 0:
+            latencies.append(await feed(updates.message(user_id, subscriptions)))
+            pages = [SubscriptionCallback(action="list", page=page).pack() for page in (2, 3, 2, 1)]
+        else:
+            latencies.append(await feed(updates.message(user_id, history)))
+            pages = [PaymentHistoryCallback(page=page).pack() for page in (2, 3, 2, 1)]
+        for data in pages:
+            latencies.append(await feed(updates.callback(user_id, data)))
+        return latencies
+
+    return await _measure("pagination", h, lambda: h.run_users(users, journey))
+
+
+async def _renew_journey(h: Harness, user_id: int) -> List[float]:
+    """Список подписок → карточка → продление → выбор способа оплаты (создаёт платёж)"""
+    feed, updates = h.feed, h.updates
+    subscription_id = user_id * 100
+    steps = [
+        updates.message(user_id, "/start"),
+        updates.message(user_id, translations.get("menu.main.subscriptions", "ru")),
+        updates.callback(user_id, SubscriptionCallback(action="detail", subscription_id=subscription_id).pack()),
+        updates.callback(user_id, RenewCallback(subscription_id=subscription_id).pack()),
+        updates.callback(user_id, PaymentCallback(
+            action="select", subscription_id=subscription_id, provider="paypal", plan="m1",
+        ).pack()),
+    ]
+    return [await feed(update) for update in steps]
+
+
+async def renew_storm(h: Harness, users: List[int]) -> ScenarioResult:
+    """Массовое продление: путь до созданного счёта у каждого пользователя"""
+    before = len(h.backend.payments)
+    result = await _measure("renew_storm", h, lambda: h.run_users(users, lambda uid: _renew_journey(h, uid)))
+    result.extra["payments_created"] = len(h.backend.payments) - before
+    return result
+
+
+async def payment_notify_storm(h: Harness, users: List[int]) -> ScenarioResult:
+    """Backend присылает «paid» по всем открытым счетам; замер — POST во внутренний сервер"""
+    from src.bot.internal_server import _build_app
+
+    known = set(h.backend.payments)
+    await h.run_users(users, lambda uid: _renew_journey(h, uid))
+    payment_ids = [payment_id for payment_id in h.backend.payments if payment_id not in known]
+
+    runner = web.AppRunner(_build_app(h.bot, h.redis_helper), access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    url = f"http://127.0.0.1:{port}{config.internal_webhook_path}"
+    headers = {"X-Internal-Token": config.bot_internal_webhook_token}
+    semaphore = asyncio.Semaphore(h.concurrency)
+    statuses: Dict[int, int] = {}
+
+    async def notify(session: aiohttp.ClientSession, payment_id: str) -> float:
+        async with semaphore:
+            started = time.perf_counter()
+            async with session.post(url, json={"payment_id": payment_id, "status": "paid"}, headers=headers) as resp:
+                await resp.read()
+                statuses[resp.status] = statuses.get(resp.status, 0) + 1
+            return time.perf_counter() - started
+
+    async def run() -> List[float]:
+        async with aiohttp.ClientSession() as session:
+            return list(await asyncio.gather(*(notify(session, payment_id) for payment_id in payment_ids)))
+
+    try:
+        result = await _measure("payment_notify_storm", h, run)
+    finally:
+        await runner.cleanup()
+    result.errors += sum(count for status, count in statuses.items() if status != 200)
+    result.extra["statuses"] = {str(status): count for status, count in sorted(statuses.items())}
+    return result
+
+
+async def broadcast(h: Harness, users: List[int]) -> ScenarioResult:
+    """Рассылка всем получателям Backend; замер — вызовы sendMessage"""
+    admin_id = users[0]
+    if admin_id not in config.admin_user_ids:
+        config.admin_user_ids.append(admin_id)
+    # Бенчмарк меряет бота, а не паузы: порог RPS выше числа получателей
+    old_rps = config.telegram_delivery_rps
+    config.telegram_delivery_rps = h.backend.settings.users + 1
+    state = h.dp.fsm.get_context(h.bot, chat_id=admin_id, user_id=admin_id)
+    await state.set_state(AdminSG.STATE_ADMIN_BROADCAST_TEXT)
+    for text in ("Load test broadcast", "all"):
+        await h.feed(h.updates.message(admin_id, text))
+
+    timer = h.call_timer
+    timer.method, timer.durations = "sendMessage", []
+
+    async def run() -> List[float]:
+        await h.feed(h.updates.message(admin_id, "да"))
+        # Первое и последнее сообщения — админу («отправляю» и отчёт)
+        return timer.durations[1:-1]
+
+    try:
+        result = await _measure("broadcast", h, run)
+    finally:
+        timer.method = None
+        config.telegram_delivery_rps = old_rps
+    result.extra["recipients"] = h.backend.settings.users
+    return result
+
+
+async def _measure(name: str, h: Harness, run: Callable[[], Awaitable[List[float]]]) -> ScenarioResult:
+    errors = h.errors.count
+    started = time.perf_counter()
+    latencies = await run()
+    seconds = time.perf_counter() - started
+    return ScenarioResult(name, seconds, latencies, errors=h.errors.count - errors)
+
+
+SCENARIOS: Dict[str, Scenario] = {
+    "start_storm": start_storm,
+    "pagination": pagination,
+    "renew_storm": renew_storm,
+    "payment_notify_storm": payment_notify_storm,
+    "broadcast": broadcast,
+}
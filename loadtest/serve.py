@@ -0,0 +1,64 @@
+"""
+Запуск фейковых Backend API и Telegram Bot API как отдельных серверов
+
+Запуск: python -m loadtest.serve --latency 0.02 --error-rate 0.01
+Бот направляется на них через BACKEND_API_BASE_URL и TELEGRAM_API_BASE.
+"""
+import argparse
+import asyncio
+
+from loadtest.fake_backend import FakeBackend, FakeBackendSettings
+from loadtest.fake_telegram import FakeTelegram, FakeTelegramSettings
+
+
+async def _serve(args: argparse.Namespace) -> None:
+    backend = FakeBackend(FakeBackendSettings(
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        users=args.users,
+        subscriptions_per_user=args.subscriptions,
+        payments_per_user=args.payments,
+        token=args.token or None,
+    ))
+    telegram = FakeTelegram(FakeTelegramSettings(
+        latency=args.telegram_latency,
+        global_rate=args.global_rate,
+        chat_rate=args.chat_rate,
+    ))
+    backend_url = await backend.start(args.host, args.backend_port)
+    telegram_url = await telegram.start(args.host, args.telegram_port)
+    print(f"BACKEND_API_BASE_URL={backend_url}")
+    print(f"TELEGRAM_API_BASE={telegram_url}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await backend.stop()
+        await telegram.stop()
+        print(f"backend requests: {dict(backend.requests)}")
+        print(f"telegram calls: {dict(telegram.counts)}, rate limited: {telegram.rate_limited}")
+
+
+def _main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--backend-port", type=int, default=8081)
+    parser.add_argument("--telegram-port", type=int, default=8082)
+    parser.add_argument("--latency", type=float, default=0.005, help="задержка Backend, с")
+    parser.add_argument("--jitter", type=float, default=0.0, help="случайная добавка к задержке, с")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="доля ответов 500")
+    parser.add_argument("--users", type=int, default=1000, help="получателей рассылки")
+    parser.add_argument("--subscriptions", type=int, default=3, help="подписок на пользователя")
+    parser.add_argument("--payments", type=int, default=25, help="платежей в истории пользователя")
+    parser.add_argument("--token", default="", help="ожидаемый Bearer-токен (пусто — не проверять)")
+    parser.add_argument("--telegram-latency", type=float, default=0.0)
+    parser.add_argument("--global-rate", type=float, default=30.0, help="сообщений/с на бота")
+    parser.add_argument("--chat-rate", type=float, default=1.0, help="сообщений/с в личный чат")
+    try:
+        asyncio.run(_serve(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    _main()
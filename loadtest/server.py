@@ -0,0 +1,40 @@
+"""
+Общая часть фейковых серверов: запуск aiohttp-приложения на локальном порту
+"""
+from typing import Optional
+
+from aiohttp import web
+
+
+class FakeServer:
+    """Базовый класс: build_app() в наследнике, start()/stop() здесь"""
+
+    def __init__(self):
+        self.url: Optional[str] = None
+        self._runner: Optional[web.AppRunner] = None
+
+    def build_app(self) -> web.Application:
+        raise NotImplementedError
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Запустить сервер; port=0 — свободный порт. Вернуть базовый URL"""
+        self._runner = web.AppRunner(self.build_app(), access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        bound_port = site._server.sockets[0].getsockname()[1]
+        self.url = f"http://{host}:{bound_port}"
+        return self.url
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+            self.url = None
+
+    async def __aenter__(self) -> "FakeServer":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.stop()
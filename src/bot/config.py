@@ -38,6 +38,33 @@ class BotConfig(BaseSettings):
     broadcast_batch_size: int = Field(1000, env="BROADCAST_BATCH_SIZE")
     use_long_polling: bool = Field(True, env="USE_LONG_POLLING")
     idempotency_enabled: bool = Field(True, env="IDEMPOTENCY_ENABLED")
+    edit_coalesce_window: float = Field(0.7, env="EDIT_COALESCE_WINDOW")
+    render_hash_ttl: int = Field(86400, env="RENDER_HASH_TTL")
+    payment_idempotency_window: int = Field(300, env="PAYMENT_IDEMPOTENCY_WINDOW")
+    callback_lock_ttl: int = Field(10, env="CALLBACK_LOCK_TTL")
+    i18n_watch_interval: float = Field(5.0, env="I18N_WATCH_INTERVAL")
+    countdown_edit_rate: float = Field(20.0, env="COUNTDOWN_EDIT_RATE")
+    countdown_refresh_minutes: int = Field(1, env="COUNTDOWN_REFRESH_MINUTES")
+    page_ttl: int = Field(604800, env="PAGE_TTL")
+    navstack_ttl: int = Field(604800, env="NAVSTACK_TTL")
+    fsm_ttl: int = Field(2592000, env="FSM_TTL")
+    payment_context_grace: int = Field(3600, env="PAYMENT_CONTEXT_GRACE")
+    trace_slow_threshold: float = Field(1.0, env="TRACE_SLOW_THRESHOLD")
+    trace_buffer_size: int = Field(100, env="TRACE_BUFFER_SIZE")
+    trace_export_path: str = Field("", env="TRACE_EXPORT_PATH")
+    loop_lag_interval: float = Field(0.1, env="LOOP_LAG_INTERVAL")
+    loop_lag_threshold: float = Field(0.25, env="LOOP_LAG_THRESHOLD")
+    loop_lag_samples: int = Field(50, env="LOOP_LAG_SAMPLES")
+    log_level: str = Field("INFO", env="LOG_LEVEL")
+    log_format: str = Field("json", env="LOG_FORMAT")
+    log_rate_burst: int = Field(5, env="LOG_RATE_BURST")
+    log_rate_window: float = Field(10.0, env="LOG_RATE_WINDOW")
+    telegram_api_base: str = Field("", env="TELEGRAM_API_BASE")
+    backend_max_connections: int = Field(100, env="BACKEND_MAX_CONNECTIONS")
+    backend_max_keepalive: int = Field(20, env="BACKEND_MAX_KEEPALIVE")
+    backend_keepalive_expiry: float = Field(5.0, env="BACKEND_KEEPALIVE_EXPIRY")
+    backend_pool_timeout: float = Field(10.0, env="BACKEND_POOL_TIMEOUT")
+    backend_http2: bool = Field(False, env="BACKEND_HTTP2")
     
     # Internal webhook path
     internal_webhook_path: str = Field("/internal/payments/notify", env="INTERNAL_WEBHOOK_PATH")
@@ -0,0 +1,167 @@
+"""
+Индексированная диспетчеризация callback_query: префикс -> action -> состояние FSM
+"""
+import operator
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple, Type
+
+from aiogram import Router
+from aiogram.dispatcher.event.bases import UNHANDLED, SkipHandler
+from aiogram.dispatcher.event.handler import CallbackType, HandlerObject
+from aiogram.dispatcher.event.telegram import TelegramEventObserver
+from aiogram.filters import StateFilter
+from aiogram.filters.callback_data import CallbackData, CallbackQueryFilter
+from aiogram.fsm.state import State
+from aiogram.types import CallbackQuery, TelegramObject
+from magic_filter import MagicFilter
+from magic_filter.operations import ComparatorOperation, FunctionOperation, GetAttributeOperation
+
+# Значение, не встречающееся ни в одном фильтре: подходят только хендлеры без ограничения
+_OTHER = object()
+
+Route = Tuple[Optional[str], Optional[FrozenSet[str]], Optional[FrozenSet[str]]]
+LookupKey = Tuple[Any, Any, Any]
+
+
+def _rule_actions(rule: Optional[MagicFilter]) -> Optional[FrozenSet[str]]:
+    """Статически извлечь значения action из F.action == x / F.action.in_(...)"""
+    if not isinstance(rule, MagicFilter):
+        return None
+    ops = rule._operations
+    if len(ops) != 2 or not isinstance(ops[0], GetAttributeOperation) or ops[0].name != "action":
+        return None
+    op = ops[1]
+    if isinstance(op, ComparatorOperation) and op.comparator is operator.eq and isinstance(op.right, str):
+        return frozenset((op.right,))
+    if isinstance(op, FunctionOperation) and op.function.__name__ == "in_op" and len(op.args) == 1:
+        values = op.args[0]
+        if isinstance(values, (set, frozenset, list, tuple)) and all(isinstance(v, str) for v in values):
+            return frozenset(values)
+    return None
+
+
+def _state_names(state_filter: StateFilter) -> Optional[FrozenSet[str]]:
+    names = set()
+    for state in state_filter.states:
+        if isinstance(state, State) and state.state != "*":
+            names.add(state.state)
+        elif isinstance(state, str) and state != "*":
+            names.add(state)
+        else:
+            # "*", None, группы состояний — не индексируем
+            return None
+    return frozenset(names)
+
+
+def _route(handler: HandlerObject) -> Tuple[Route, Optional[Type[CallbackData]]]:
+    prefix = actions = states = None
+    callback_data = None
+    for filter_object in handler.filters or ():
+        event_filter = filter_object.callback
+        if isinstance(event_filter, CallbackQueryFilter):
+            callback_data = event_filter.callback_data
+            prefix = callback_data.__prefix__
+            actions = _rule_actions(event_filter.rule)
+        elif isinstance(event_filter, StateFilter):
+            states = _state_names(event_filter)
+    return (prefix, actions, states), callback_data
+
+
+class IndexedCallbackObserver(TelegramEventObserver):
+    """Observer callback_query, который проверяет только хендлеры нужного префикса/action/состояния.
+
+    Префикс разбирается один раз на апдейт; фильтры кандидатов всё равно выполняются
+    полностью, индекс лишь отсекает заведомо неподходящие хендлеры.
+    """
+
+    def __init__(self, router: Router, event_name: str = "callback_query") -> None:
+        super().__init__(router=router, event_name=event_name)
+        self._routes: Optional[List[Tuple[HandlerObject, Route]]] = None
+        self._classes: Dict[str, Type[CallbackData]] = {}
+        self._actions: Dict[str, FrozenSet[str]] = {}
+        self._states: FrozenSet[str] = frozenset()
+        self._lookup: Dict[LookupKey, Tuple[HandlerObject, ...]] = {}
+
+    def register(self, callback: CallbackType, *filters: CallbackType, **kwargs: Any) -> CallbackType:
+        result = super().register(callback, *filters, **kwargs)
+        self._routes = None
+        return result
+
+    def _build(self) -> None:
+        routes = []
+        classes: Dict[str, Type[CallbackData]] = {}
+        actions: Dict[str, set] = {}
+        states: set = set()
+        for handler in self.handlers:
+            route, callback_data = _route(handler)
+            prefix, handler_actions, handler_states = route
+            if callback_data is not None:
+                classes.setdefault(prefix, callback_data)
+                if handler_actions:
+                    actions.setdefault(prefix, set()).update(handler_actions)
+            if handler_states:
+                states.update(handler_states)
+            routes.append((handler, route))
+        self._routes = routes
+        self._classes = classes
+        self._actions = {prefix: frozenset(values) for prefix, values in actions.items()}
+        self._states = frozenset(states)
+        self._lookup = {}
+
+    def _key(self, event: CallbackQuery, raw_state: Optional[str]) -> LookupKey:
+        data = event.data or ""
+        prefix = data.split(":", 1)[0]
+        if prefix not in self._classes:
+            return _OTHER, _OTHER, raw_state if raw_state in self._states else _OTHER
+        action: Any = _OTHER
+        known_actions = self._actions.get(prefix)
+        if known_actions:
+            try:
+                value = getattr(self._classes[prefix].unpack(data), "action", None)
+            except (TypeError, ValueError):
+                value = None
+            if value in known_actions:
+                action = value
+        return prefix, action, raw_state if raw_state in self._states else _OTHER
+
+    def _candidates(self, key: LookupKey) -> Tuple[HandlerObject, ...]:
+        candidates = self._lookup.get(key)
+        if candidates is None:
+            prefix, action, state = key
+            candidates = tuple(
+                handler
+                for handler, (h_prefix, h_actions, h_states) in self._routes
+                if (h_prefix is None or h_prefix == prefix)
+                and (h_actions is None or action in h_actions)
+                and (h_states is None or state in h_states)
+            )
+            self._lookup[key] = candidates
+        return candidates
+
+    async def trigger(self, event: TelegramObject, **kwargs: Any) -> Any:
+        if not isinstance(event, CallbackQuery):
+            return await super().trigger(event, **kwargs)
+        if self._routes is None:
+            self._build()
+        for handler in self._candidates(self._key(event, kwargs.get("raw_state"))):
+            kwargs["handler"] = handler
+            result, data = await handler.check(event, **kwargs)
+            if result:
+                kwargs.update(data)
+                try:
+                    wrapped_inner = self.outer_middleware.wrap_middlewares(
+                        self._resolve_middlewares(),
+                        handler.call,
+                    )
+                    return await wrapped_inner(event, kwargs)
+                except SkipHandler:
+                    continue
+        return UNHANDLED
+
+
+class IndexedRouter(Router):
+    """Router с индексированным observer для callback_query"""
+
+    def __init__(self, *, name: Optional[str] = None) -> None:
+        super().__init__(name=name)
+        self.callback_query = IndexedCallbackObserver(router=self, event_name="callback_query")
+        self.observers["callback_query"] = self.callback_query
@@ -4,14 +4,21 @@
 import asyncio
 import json
 import logging
-from typing import Optional
+import time
+from typing import Any, Dict, Optional
 from aiohttp import web
 from aiogram import Bot
 
 from src.bot.config import config
 from src.storage.redis_helper import RedisHelper
-from src.i18n.translations import translations
+from src.i18n.reload import reloader
+from src.i18n.translations import TranslationError, translations
 from src.clients.backend_api import api_client
+from src.monitoring.loop_lag import loop_monitor
+from src.monitoring.metrics import notify_snapshots, registry
+from src.monitoring.profiler import ProfilerBusyError, cpu_profiler, memory_snapshots
+from src.services.countdown import payment_countdown
+from src.services.edit_coalescer import EditCoalescer
 from src.keyboards.inline import (
 	get_payment_waiting_keyboard,
 	get_payment_failed_keyboard,
@@ -21,6 +28,16 @@ from src.utils.formatters import calculate_minutes_until_expiry, format_date
 
 logger = logging.getLogger(__name__)
 
+# Версия контракта вложенных снимков payment/subscription в notify
+NOTIFY_SNAPSHOT_VERSION = 1
+# Формат выдачи /metrics (Prometheus text exposition)
+METRICS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+# Попадания/промахи по вложенным снимкам (сколько запросов к API сэкономлено)
+_payment_snapshot_hit = notify_snapshots.labels("payment", "hit")
+_payment_snapshot_miss = notify_snapshots.labels("payment", "miss")
+_subscription_snapshot_hit = notify_snapshots.labels("subscription", "hit")
+_subscription_snapshot_miss = notify_snapshots.labels("subscription", "miss")
+
 
 def _unauthorized() -> web.Response:
 	return web.Response(status=401, text="unauthorized")
@@ -31,32 +48,71 @@ def _bad_request(msg: str) -> web.Response:
 
 
 async def _edit_or_send(
-	bot: Bot,
+	coalescer: EditCoalescer,
 	redis_helper: RedisHelper,
 	tg_id: int,
 	payment_id: str,
 	text: str,
 	reply_markup,
+	final: bool = False,
 ) -> None:
 	"""Редактировать сохранённое сообщение ожидания или отправить новое"""
 	context = await redis_helper.get_payment_context(payment_id)
 	message_id: Optional[int] = context.get("message_id") if context else None
-	try:
-		if message_id:
-			await bot.edit_message_text(
-				chat_id=tg_id,
-				message_id=message_id,
-				text=text,
-				reply_markup=reply_markup,
-			)
-		else:
-			msg = await bot.send_message(chat_id=tg_id, text=text, reply_markup=reply_markup)
-			await redis_helper.update_payment_message_id(payment_id, msg.message_id)
-	except Exception:
+
+	async def send_new(_: Optional[Exception] = None) -> None:
 		# Если редактирование не удалось (удалено/устарело) — отправляем новое
-		msg = await bot.send_message(chat_id=tg_id, text=text, reply_markup=reply_markup)
+		msg = await coalescer.bot.send_message(chat_id=tg_id, text=text, reply_markup=reply_markup)
 		await redis_helper.update_payment_message_id(payment_id, msg.message_id)
 
+	if not message_id:
+		await send_new()
+		return
+	# Промежуточные статусы склеиваются в окне, финальные применяются сразу
+	await coalescer.edit(
+		tg_id,
+		message_id,
+		text,
+		reply_markup=reply_markup,
+		on_error=send_new,
+		immediate=final,
+	)
+
+
+def _embedded(payload: dict, name: str) -> Dict[str, Any]:
+	"""Вложенный снимок из уведомления; неизвестная версия контракта игнорируется"""
+	if payload.get("version") != NOTIFY_SNAPSHOT_VERSION:
+		return {}
+	value = payload.get(name)
+	return value if isinstance(value, dict) else {}
+
+
+async def _payment_snapshot(payload: dict, payment_id: str) -> Dict[str, Any]:
+	"""Детали платежа из уведомления, при нехватке полей — из Backend API"""
+	payment = _embedded(payload, "payment")
+	if "expires_at" in payment:
+		_payment_snapshot_hit.inc()
+		return payment
+	_payment_snapshot_miss.inc()
+	try:
+		return await api_client.get_payment(payment_id)
+	except Exception as e:
+		logger.error("get_payment failed: %s", e)
+		return {}
+
+
+async def _subscription_snapshot(payload: dict, subscription_id: int) -> Dict[str, Any]:
+	"""Подписка из уведомления, при нехватке полей — из Backend API"""
+	subscription = _embedded(payload, "subscription")
+	if "until_date" in subscription:
+		_subscription_snapshot_hit.inc()
+		return subscription
+	_subscription_snapshot_miss.inc()
+	try:
+		return await api_client.get_subscription(subscription_id)
+	except Exception:
+		return {}
+
 
 async def _handle_payment_notify(request: web.Request) -> web.Response:
 	"""Обработка уведомления об изменении статуса платежа"""
@@ -70,52 +126,58 @@ async def _handle_payment_notify(request: web.Request) -> web.Response:
 			return _bad_request("missing fields")
 		# Получаем контекст
 		redis_helper: RedisHelper = request.app["redis_helper"]
-		bot: Bot = request.app["bot"]
+		coalescer: EditCoalescer = request.app["edit_coalescer"]
 		context = await redis_helper.get_payment_context(payment_id)
 		if not context:
 			# Нет сохранённого контекста — ничего не делаем
 			return web.Response(status=202, text="no-context")
 		tg_id = int(context["tg_id"])
 		subscription_id = int(context["subscription_id"]) if context.get("subscription_id") else None
-		# Получаем детали платежа, чтобы иметь expires_at/pay_link
-		try:
-			payment = await api_client.get_payment(payment_id)
-		except Exception as e:
-			logger.error(f"get_payment failed: {e}")
-			payment = {}
-		expires_at = payment.get("expires_at")
-		pay_link = payment.get("pay_link") or payment.get("link")
-		qr_url = payment.get("qr") or payment.get("qr_url")
 		language = request.app.get("default_language", config.default_language)
 		# В зависимости от статуса обновляем UI
 		if status in ("created", "pending"):
+			payment = await _payment_snapshot(payload, payment_id)
+			expires_at = payment.get("expires_at")
+			pay_link = payment.get("pay_link") or payment.get("link")
+			qr_url = payment.get("qr") or payment.get("qr_url")
 			minutes = calculate_minutes_until_expiry(expires_at) if expires_at else 0
 			text = translations.get("payment.waiting.title", language, minutes=minutes)
 			kb = get_payment_waiting_keyboard(payment_id, pay_link=pay_link, qr_url=qr_url, language=language)
-			await _edit_or_send(bot, redis_helper, tg_id, payment_id, text, kb)
+			await _edit_or_send(coalescer, redis_helper, tg_id, payment_id, text, kb)
+			if expires_at:
+				payment_countdown.track(
+					payment_id,
+					tg_id,
+					context.get("message_id"),
+					expires_at,
+					language=context.get("language") or language,
+					pay_link=pay_link,
+					qr_url=qr_url,
+				)
 		elif status == "paid":
+			payment_countdown.untrack(payment_id)
+			await redis_helper.end_payment_intent(payment_id)
 			# Переходим к карточке подписки
 			until_text = "—"
-			try:
-				if subscription_id:
-					sub = await api_client.get_subscription(subscription_id)
-					until = sub.get("until_date")
-					until_text = format_date(until, language) if until else "—"
-			except Exception:
-				pass
+			if subscription_id:
+				sub = await _subscription_snapshot(payload, subscription_id)
+				until = sub.get("until_date")
+				until_text = format_date(until, language) if until else "—"
 			text = translations.get("payment.success.title", language, until_date=until_text)
 			kb = get_subscription_detail_keyboard(subscription_id, language) if subscription_id else None
-			await _edit_or_send(bot, redis_helper, tg_id, payment_id, text, kb)
+			await _edit_or_send(coalescer, redis_helper, tg_id, payment_id, text, kb, final=True)
 			# Чистим контекст
 			await redis_helper.clear_payment_context(payment_id)
 		else:
-			# Неуспехи/прочее
+			# Неуспехи/прочее: «Повторить» должно создать новый счёт, а не вернуть этот
+			payment_countdown.untrack(payment_id)
+			await redis_helper.end_payment_intent(payment_id)
 			text = translations.get("payment.failed.title", language)
 			kb = get_payment_failed_keyboard(payment_id, subscription_id, language) if subscription_id else None
-			await _edit_or_send(bot, redis_helper, tg_id, payment_id, text, kb)
+			await _edit_or_send(coalescer, redis_helper, tg_id, payment_id, text, kb, final=True)
 		return web.Response(status=200, text="ok")
 	except Exception as e:
-		logger.error(f"notify error: {e}")
+		logger.error("notify error: %s", e)
 		return web.Response(status=500, text="error")
 
 
@@ -138,18 +200,113 @@ async def _handle_notification_renew(request: web.Request) -> web.Response:
 		await bot.send_message(chat_id=tg_id, text=text, reply_markup=kb)
 		return web.Response(status=200, text="ok")
 	except Exception as e:
-		logger.error(f"renew error: {e}")
+		logger.error("renew error: %s", e)
 		return web.Response(status=500, text="error")
 
 
+async def _handle_i18n_reload(request: web.Request) -> web.Response:
+	"""Перечитать каталоги переводов и разослать сигнал остальным репликам"""
+	if request.headers.get("X-Internal-Token") != config.bot_internal_webhook_token:
+		return _unauthorized()
+	try:
+		languages = await reloader.reload()
+	except TranslationError as e:
+		# Текущие каталоги остаются в силе
+		return _bad_request(str(e))
+	return web.json_response({"status": "ok", "languages": list(languages)})
+
+
+async def _handle_loop_stalls(request: web.Request) -> web.Response:
+	"""Снимки стека при зависаниях event loop (новые первыми)"""
+	if request.headers.get("X-Internal-Token") != config.bot_internal_webhook_token:
+		return _unauthorized()
+	try:
+		limit = int(request.query.get("limit", 20))
+	except ValueError:
+		return _bad_request("invalid limit")
+	return web.json_response({"threshold": loop_monitor.threshold, "stalls": loop_monitor.stalls(limit)})
+
+
+async def _handle_cpu_profile(request: web.Request) -> web.Response:
+	"""Сэмплирующий профиль на ?seconds=N; ответ — collapsed stacks для flamegraph"""
+	if request.headers.get("X-Internal-Token") != config.bot_internal_webhook_token:
+		return _unauthorized()
+	try:
+		seconds = float(request.query.get("seconds", 10))
+		interval = float(request.query.get("interval", 0.005))
+	except ValueError:
+		return _bad_request("invalid seconds/interval")
+	try:
+		folded = await cpu_profiler.profile(seconds, interval=interval)
+	except ProfilerBusyError as e:
+		return web.Response(status=409, text=str(e))
+	filename = f"profile-{int(time.time())}.folded"
+	return web.Response(
+		text=folded,
+		content_type="text/plain",
+		headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+	)
+
+
+async def _handle_memory_snapshot(request: web.Request) -> web.Response:
+	"""Снимок tracemalloc (первый вызов включает трассировку аллокаций)"""
+	if request.headers.get("X-Internal-Token") != config.bot_internal_webhook_token:
+		return _unauthorized()
+	return web.json_response(await memory_snapshots.take())
+
+
+async def _handle_memory_diff(request: web.Request) -> web.Response:
+	"""Рост аллокаций между снимками ?base=&target= (target по умолчанию — последний)"""
+	if request.headers.get("X-Internal-Token") != config.bot_internal_webhook_token:
+		return _unauthorized()
+	try:
+		base = int(request.query["base"])
+		target = int(request.query["target"]) if "target" in request.query else None
+		limit = int(request.query.get("limit", 25))
+		result = await memory_snapshots.diff(base, target, key=request.query.get("key", "lineno"), limit=limit)
+	except (KeyError, ValueError) as e:
+		return _bad_request(f"invalid request: {e}")
+	return web.json_response(result)
+
+
+async def _handle_memory_stop(request: web.Request) -> web.Response:
+	"""Выключить tracemalloc и удалить снимки"""
+	if request.headers.get("X-Internal-Token") != config.bot_internal_webhook_token:
+		return _unauthorized()
+	memory_snapshots.stop()
+	return web.json_response({"status": "ok"})
+
+
+async def _handle_metrics(request: web.Request) -> web.Response:
+	"""Метрики процесса в текстовом формате Prometheus"""
+	return web.Response(body=registry.render().encode("utf-8"), headers={"Content-Type": METRICS_CONTENT_TYPE})
+
+
+async def _close_edit_coalescer(app: web.Application) -> None:
+	await app["edit_coalescer"].aclose()
+
+
 def _build_app(bot: Bot, redis_helper: RedisHelper) -> web.Application:
 	app = web.Application()
 	app["bot"] = bot
 	app["redis_helper"] = redis_helper
 	app["default_language"] = config.default_language
+	app["edit_coalescer"] = EditCoalescer(
+		bot,
+		window=config.edit_coalesce_window,
+		render_store=redis_helper,
+	)
+	app.on_cleanup.append(_close_edit_coalescer)
 	# Роуты
 	app.router.add_post(config.internal_webhook_path, _handle_payment_notify)
 	app.router.add_post("/internal/notifications/renew", _handle_notification_renew)
+	app.router.add_post("/internal/i18n/reload", _handle_i18n_reload)
+	app.router.add_get("/metrics", _handle_metrics)
+	app.router.add_get("/internal/loop/stalls", _handle_loop_stalls)
+	app.router.add_post("/internal/profile/cpu", _handle_cpu_profile)
+	app.router.add_post("/internal/memory/snapshot", _handle_memory_snapshot)
+	app.router.add_get("/internal/memory/diff", _handle_memory_diff)
+	app.router.add_post("/internal/memory/stop", _handle_memory_stop)
 	return app
 
 
@@ -160,7 +317,7 @@ async def start_internal_server(bot: Bot, redis_helper: RedisHelper):
 	await runner.setup()
 	site = web.TCPSite(runner, host=config.internal_server_host, port=config.internal_server_port)
 	await site.start()
-	logger.info(f"Internal server started at {config.internal_server_host}:{config.internal_server_port}")
+	logger.info("Internal server started at %s:%s", config.internal_server_host, config.internal_server_port)
 	# Держим сервер живым
 	stop_event = asyncio.Event()
 	try:
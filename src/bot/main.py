@@ -4,42 +4,71 @@
 import asyncio
 import contextlib
 import logging
+from typing import TYPE_CHECKING, Tuple
 
 from aiogram import Bot, Dispatcher
-from aiogram.fsm.storage.redis import RedisStorage
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.telegram import TelegramAPIServer
+from aiogram.fsm.storage.redis import DefaultKeyBuilder, RedisStorage
 from aiogram.enums import ParseMode
 from redis.asyncio import Redis
 
 from src.bot.config import config
 from src.clients.backend_api import api_client
 from src.i18n.translations import translations
+from src.monitoring.log_pipeline import setup_logging
+from src.storage.fsm import CachedRedisStorage
+
+if TYPE_CHECKING:
+    from src.storage.redis_helper import RedisHelper
 
-# Настройка логирования
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
 logger = logging.getLogger(__name__)
 
 
-async def main():
-    """Основная функция запуска бота"""
-    logger.info("Starting R3lax3 Bot...")
-    
-    # Инициализация Redis
-    redis = Redis.from_url(config.fsm_storage_url)
-    storage = RedisStorage(redis=redis, prefix=config.redis_key_prefix)
-    
-    # Инициализация бота и диспетчера
-    bot = Bot(token=config.bot_token, parse_mode=ParseMode.HTML)
+def build_dispatcher(bot: Bot, redis: Redis) -> Tuple[Dispatcher, "RedisHelper"]:
+    """Диспетчер со всеми middleware и роутерами (общий для main() и бенчмарков)"""
+    # FSM: чтение одним пайплайном, запись только изменений, TTL продлевается при активности
+    storage = CachedRedisStorage(
+        RedisStorage(redis=redis, key_builder=DefaultKeyBuilder(prefix=f"{config.redis_key_prefix}fsm")),
+        idle_ttl=config.fsm_ttl,
+    )
     dp = Dispatcher(storage=storage)
     
     # Регистрация middleware
-    from src.bot.middleware import LanguageMiddleware, ErrorHandlingMiddleware, RateLimitMiddleware
+    from src.bot.middleware import (
+        LanguageMiddleware,
+        ErrorHandlingMiddleware,
+        RateLimitMiddleware,
+        CallbackDedupMiddleware,
+        CallbackPayloadMiddleware,
+        FSMWriteBackMiddleware,
+        UpdateMetricsMiddleware,
+        HandlerMetricsMiddleware,
+        TracingMiddleware,
+    )
+    from src.monitoring.tracing import TelegramTracingMiddleware, tracer
+    from src.keyboards.codec import payload_store
     from src.storage.redis_helper import RedisHelper
     
     redis_helper = RedisHelper(redis)
     
+    # Трасса апдейта, время всей цепочки (включая сброс FSM) и кеш FSM на апдейт
+    dp.update.outer_middleware(TracingMiddleware(tracer))
+    dp.update.outer_middleware(UpdateMetricsMiddleware())
+    dp.update.outer_middleware(FSMWriteBackMiddleware(storage))
+    bot.session.middleware(TelegramTracingMiddleware())
+    # Длинные callback_data хранятся за токеном; раскрываем их до фильтров
+    payload_store.bind(redis_helper)
+    dp.callback_query.outer_middleware(CallbackPayloadMiddleware(payload_store))
+    # Метрики хендлеров — первыми среди inner middleware, чтобы учесть их время
+    dp.callback_query.middleware(HandlerMetricsMiddleware("callback_query"))
+    dp.message.middleware(HandlerMetricsMiddleware("message"))
+    # Повторные нажатия отбрасываем до любых запросов к Redis/API
+    dp.callback_query.middleware(CallbackDedupMiddleware(
+        redis_helper,
+        use_redis=not config.use_long_polling,
+        ttl=config.callback_lock_ttl,
+    ))
     dp.message.middleware(LanguageMiddleware(redis_helper))
     dp.callback_query.middleware(LanguageMiddleware(redis_helper))
     dp.message.middleware(ErrorHandlingMiddleware())
@@ -50,7 +79,58 @@ async def main():
     # Регистрация роутеров (агрегированный роутер)
     from src.routers import router as app_router
     dp.include_router(app_router)
+
+    # Статические клавиатуры собираем заранее для всех языков
+    from src.keyboards.cache import prebuild_keyboards
+    prebuild_keyboards(translations.languages)
+    return dp, redis_helper
+
+
+async def main():
+    """Основная функция запуска бота"""
+    # Логи пишет отдельный поток: loop не ждёт stderr даже при шквале ошибок
+    log_pipeline = setup_logging(
+        config.log_level,
+        json_output=config.log_format == "json",
+        burst=config.log_rate_burst,
+        window=config.log_rate_window,
+    )
+    logger.info("Starting R3lax3 Bot...")
     
+    # Инициализация Redis
+    redis = Redis.from_url(config.fsm_storage_url)
+    
+    # Инициализация бота и диспетчера
+    # TELEGRAM_API_BASE — локальный Bot API или фейковый сервер из loadtest/
+    session = AiohttpSession(api=TelegramAPIServer.from_base(config.telegram_api_base)) if config.telegram_api_base else None
+    bot = Bot(token=config.bot_token, session=session, parse_mode=ParseMode.HTML)
+    dp, redis_helper = build_dispatcher(bot, redis)
+
+    from src.keyboards.cache import clear_keyboard_caches, prebuild_keyboards
+    from src.keyboards.menu import menu_index
+    from src.monitoring.tracing import tracer
+
+    def on_translations_reloaded() -> None:
+        clear_keyboard_caches()
+        prebuild_keyboards(translations.languages)
+        menu_index.rebuild()
+
+    # Горячая перезагрузка переводов: файлы, /internal/i18n/reload и другие реплики
+    from src.i18n.reload import reloader
+    translations.add_reload_validator(menu_index.validate)
+    translations.add_reload_listener(on_translations_reloaded)
+    reloader.bind(redis, f"{config.redis_key_prefix}i18n:reload")
+    await reloader.start(poll_interval=config.i18n_watch_interval)
+
+    # Обратный отсчёт на экранах ожидания оплаты (восстанавливается из контекстов в Redis)
+    from src.services.countdown import payment_countdown
+    payment_countdown.bind(bot, redis_helper)
+    await payment_countdown.start()
+
+    # Лаг event loop и снимки стека при зависаниях
+    from src.monitoring.loop_lag import loop_monitor
+    await loop_monitor.start()
+
     # Внутренний HTTP-сервер для уведомлений запускаем в фоне
     from src.bot.internal_server import start_internal_server
     internal_task = asyncio.create_task(start_internal_server(bot, redis_helper))
@@ -69,9 +149,12 @@ async def main():
             return
             
     except Exception as e:
-        logger.error(f"Error starting bot: {e}")
+        logger.error("Error starting bot: %s", e)
         raise
     finally:
+        await reloader.stop()
+        await payment_countdown.stop()
+        await loop_monitor.stop()
         await bot.session.close()
         await redis.close()
         # Закрываем HTTP-клиент backend_api
@@ -81,6 +164,9 @@ async def main():
         internal_task.cancel()
         with contextlib.suppress(Exception):
             await internal_task
+        # Дописываем очередь экспорта трасс и логов
+        tracer.close()
+        log_pipeline.stop()
 
 
 if __name__ == "__main__":
@@ -89,5 +175,5 @@ if __name__ == "__main__":
     except KeyboardInterrupt:
         logger.info("Bot stopped by user")
     except Exception as e:
-        logger.error(f"Fatal error: {e}")
+        logger.error("Fatal error: %s", e)
         raise
@@ -1,13 +1,29 @@
 """
 Middleware для бота
 """
-from typing import Any, Awaitable, Callable, Dict
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Set, Tuple
 from aiogram import BaseMiddleware
 from aiogram.types import TelegramObject, Message, CallbackQuery
 from src.bot.config import config
 from src.clients.backend_api import api_client
 from src.storage.redis_helper import RedisHelper
 from src.i18n.translations import translations
+from src.keyboards.codec import CallbackPayloadStore, TOKEN_MARK
+from src.storage.fsm import CachedRedisStorage
+from src.monitoring.metrics import handler_duration, handler_errors, update_duration
+from src.monitoring.tracing import Tracer
+
+logger = logging.getLogger(__name__)
+
+
+def _event_type(event: TelegramObject) -> str:
+    if isinstance(event, Message):
+        return "message"
+    if isinstance(event, CallbackQuery):
+        return "callback_query"
+    return "other"
 
 
 class LanguageMiddleware(BaseMiddleware):
@@ -70,10 +86,9 @@ class ErrorHandlingMiddleware(BaseMiddleware):
         try:
             return await handler(event, data)
         except Exception as e:
+            handler_errors.labels(_event_type(event)).inc()
             # Логируем ошибку
-            import logging
-            logger = logging.getLogger(__name__)
-            logger.error(f"Error in handler: {e}", exc_info=True)
+            logger.error("Error in handler: %s", e, exc_info=True)
             
             # Отправляем сообщение об ошибке пользователю
             language = data.get("language", "ru")
@@ -128,3 +143,157 @@ class RateLimitMiddleware(BaseMiddleware):
             await self.redis_helper.redis.expire(rate_key, 60)  # TTL 1 минута
         
         return await handler(event, data)
+
+
+class CallbackDedupMiddleware(BaseMiddleware):
+    """Middleware для отбрасывания повторных нажатий, пока первое ещё обрабатывается"""
+    
+    def __init__(self, redis_helper: RedisHelper, use_redis: bool = False, ttl: int = 10):
+        super().__init__()
+        self.redis_helper = redis_helper
+        # В polling один процесс — хватает памяти; в webhook реплик несколько — Redis
+        self.use_redis = use_redis
+        self.ttl = ttl
+        self._in_flight: Set[Tuple[int, str]] = set()
+    
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any]
+    ) -> Any:
+        if not isinstance(event, CallbackQuery) or not event.data:
+            return await handler(event, data)
+        
+        lock = (event.from_user.id, event.data)
+        token = await self._acquire(lock)
+        if token is None:
+            # Дубликат: гасим "часики" на кнопке и не запускаем хендлер
+            await event.answer()
+            return None
+        
+        try:
+            return await handler(event, data)
+        finally:
+            await self._release(lock, token)
+    
+    async def _acquire(self, lock: Tuple[int, str]) -> Optional[str]:
+        """Токен владельца блокировки или None, если нажатие уже в обработке"""
+        if self.use_redis:
+            return await self.redis_helper.acquire_callback_lock(*lock, ttl=self.ttl)
+        if lock in self._in_flight:
+            return None
+        self._in_flight.add(lock)
+        return ""
+    
+    async def _release(self, lock: Tuple[int, str], token: str) -> None:
+        if self.use_redis:
+            await self.redis_helper.release_callback_lock(*lock, token)
+        else:
+            self._in_flight.discard(lock)
+
+
+class CallbackPayloadMiddleware(BaseMiddleware):
+    """Outer middleware: подменяет токен длинного callback_data на исходный payload до фильтров"""
+    
+    def __init__(self, store: CallbackPayloadStore):
+        super().__init__()
+        self.store = store
+    
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any]
+    ) -> Any:
+        if isinstance(event, CallbackQuery) and event.data and event.data.startswith(TOKEN_MARK):
+            payload = await self.store.resolve(event.data)
+            if payload is None:
+                # Токен протух — кнопка устарела
+                await event.answer()
+                return None
+            event = event.model_copy(update={"data": payload})
+        return await handler(event, data)
+
+
+class FSMWriteBackMiddleware(BaseMiddleware):
+    """Outer middleware апдейта: кеш FSM на время обработки, изменения пишутся одной транзакцией"""
+    
+    def __init__(self, storage: CachedRedisStorage):
+        super().__init__()
+        self.storage = storage
+    
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any]
+    ) -> Any:
+        # Регистрируется после FSMContextMiddleware: прочитанное им состояние подхватывается кешем
+        async with self.storage.scope():
+            return await handler(event, data)
+
+
+class UpdateMetricsMiddleware(BaseMiddleware):
+    """Outer middleware апдейта: время всей цепочки middleware и хендлера по типу события"""
+    
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any]
+    ) -> Any:
+        started = time.perf_counter()
+        try:
+            return await handler(event, data)
+        finally:
+            update_duration.labels(getattr(event, "event_type", "unknown")).observe(time.perf_counter() - started)
+
+
+class HandlerMetricsMiddleware(BaseMiddleware):
+    """Первая inner middleware: время хендлера (с остальными inner middleware) по имени хендлера или действию меню"""
+    
+    def __init__(self, event_type: str):
+        super().__init__()
+        self.event_type = event_type
+    
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any]
+    ) -> Any:
+        # Кнопки главного меню идут через один хендлер: метка — ключ действия из фильтра MenuButton
+        name = data.get("menu_action")
+        if name is None:
+            handler_object = data.get("handler")
+            name = getattr(handler_object.callback, "__name__", "unknown") if handler_object else "unknown"
+        series = handler_duration.labels(self.event_type, name)
+        started = time.perf_counter()
+        try:
+            return await handler(event, data)
+        finally:
+            series.observe(time.perf_counter() - started)
+
+
+class TracingMiddleware(BaseMiddleware):
+    """Outer middleware апдейта: трасса со спанами Redis/Backend/Telegram на время обработки"""
+    
+    def __init__(self, tracer: Tracer):
+        super().__init__()
+        self.tracer = tracer
+    
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any]
+    ) -> Any:
+        user = data.get("event_from_user")
+        event_type = getattr(event, "event_type", "unknown")
+        with self.tracer.trace(
+            f"update {event_type}",
+            update_id=getattr(event, "update_id", None),
+            user_id=user.id if user else None,
+        ):
+            return await handler(event, data)
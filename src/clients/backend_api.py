@@ -3,25 +3,184 @@ HTTP клиент для Backend API
 """
 import httpx
 import asyncio
+import logging
+import time
 from typing import Dict, Any, Optional, List
 from src.bot.config import config
+from src.monitoring.metrics import (
+    backend_bytes,
+    backend_duration,
+    backend_errors,
+    backend_in_flight,
+    backend_pool_connections,
+    backend_pool_wait,
+    backend_requests,
+    backend_retries,
+    registry,
+)
+from src.monitoring.tracing import current_trace_id, span
+
+logger = logging.getLogger(__name__)
+
+# События httpcore, с которых запрос уже получил соединение: новое (connect) или из пула (send headers)
+_CONNECTION_ACQUIRED = ("connect_tcp.started", "send_request_headers.started")
+
+# Ошибки Backend API. Наследуют ValueError: существующие `except ValueError` продолжают работать
+class BackendAPIError(ValueError):
+    """Ошибка вызова Backend API"""
+
+    kind = "error"
+
+    def __init__(self, message: str, status: Optional[int] = None, endpoint: Optional[str] = None):
+        super().__init__(message)
+        self.status = status
+        self.endpoint = endpoint
+
+
+class BackendTimeoutError(BackendAPIError):
+    """Таймаут подключения/чтения"""
+
+    kind = "timeout"
+
+
+class BackendNetworkError(BackendAPIError):
+    """Сетевая ошибка (соединение, DNS, разрыв)"""
+
+    kind = "network"
+
+
+class BackendInvalidResponseError(BackendAPIError):
+    """Ответ не является JSON"""
+
+    kind = "invalid_response"
+
+
+class BackendClientError(BackendAPIError):
+    """Ответ 4xx"""
+
+    kind = "client"
+
+
+class BackendBadRequestError(BackendClientError):
+    kind = "bad_request"
+
+
+class BackendUnauthorizedError(BackendClientError):
+    kind = "unauthorized"
+
+
+class BackendNotFoundError(BackendClientError):
+    kind = "not_found"
+
+
+class BackendRateLimitError(BackendClientError):
+    """429 после исчерпания ретраев; retry_after — из заголовка Retry-After"""
+
+    kind = "rate_limited"
+
+    def __init__(self, message: str, status: Optional[int] = None, endpoint: Optional[str] = None,
+                 retry_after: Optional[float] = None):
+        super().__init__(message, status, endpoint)
+        self.retry_after = retry_after
+
+
+class BackendServerError(BackendAPIError):
+    """Ответ 5xx"""
+
+    kind = "server"
+
+
+def _status_error(response: httpx.Response, template: str) -> BackendAPIError:
+    """Исключение для неуспешного ответа; сообщения прежние"""
+    code = response.status_code
+    if code == 400:
+        return BackendBadRequestError(f"Bad request: {response.text}", code, template)
+    if code == 401:
+        return BackendUnauthorizedError("Unauthorized", code, template)
+    if code == 404:
+        return BackendNotFoundError("Not found", code, template)
+    if code == 429:
+        retry_after = response.headers.get("Retry-After")
+        try:
+            retry_after = float(retry_after) if retry_after is not None else None
+        except ValueError:
+            retry_after = None
+        return BackendRateLimitError("Rate limit exceeded", code, template, retry_after=retry_after)
+    error_class = BackendServerError if code >= 500 else BackendClientError
+    return error_class(f"HTTP error {code}: {response.text}", code, template)
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class _PoolWaitTrace:
+    """Trace-расширение httpx: время от отправки запроса до получения соединения из пула"""
+
+    __slots__ = ("started", "done")
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.done = False
+
+    async def __call__(self, event_name: str, info: Dict[str, Any]) -> None:
+        if not self.done and event_name.endswith(_CONNECTION_ACQUIRED):
+            self.done = True
+            backend_pool_wait.observe(time.perf_counter() - self.started)
 
 
 class BackendAPIClient:
     """Клиент для работы с Backend API"""
     
-    def __init__(self):
+    def __init__(
+        self,
+        max_connections: Optional[int] = None,
+        max_keepalive: Optional[int] = None,
+        keepalive_expiry: Optional[float] = None,
+        pool_timeout: Optional[float] = None,
+        http2: Optional[bool] = None,
+    ):
         self.base_url = config.backend_api_base_url.rstrip('/')
         self.token = config.backend_api_token
-        self.timeout = httpx.Timeout(connect=2.0, read=5.0, write=5.0, pool=10.0)
-        # Реиспользуем один AsyncClient для всех запросов
-        self.client = httpx.AsyncClient(timeout=self.timeout)
+        self.timeout = httpx.Timeout(
+            connect=2.0,
+            read=5.0,
+            write=5.0,
+            pool=config.backend_pool_timeout if pool_timeout is None else pool_timeout,
+        )
+        self.limits = httpx.Limits(
+            max_connections=config.backend_max_connections if max_connections is None else max_connections,
+            max_keepalive_connections=config.backend_max_keepalive if max_keepalive is None else max_keepalive,
+            keepalive_expiry=config.backend_keepalive_expiry if keepalive_expiry is None else keepalive_expiry,
+        )
+        self.http2 = config.backend_http2 if http2 is None else http2
+        if self.http2 and not _http2_available():
+            logger.warning("HTTP/2 requested for Backend API but h2 is not installed; using HTTP/1.1")
+            self.http2 = False
         
-        # Заголовки по умолчанию
+        # Заголовки по умолчанию задаются клиенту один раз, а не копируются в каждый запрос
         self.default_headers = {
             "Authorization": f"Bearer {self.token}",
             "Content-Type": "application/json"
         }
+        # Реиспользуем один AsyncClient для всех запросов
+        self.client = httpx.AsyncClient(
+            timeout=self.timeout, limits=self.limits, http2=self.http2, headers=self.default_headers
+        )
+    
+    def collect_pool_metrics(self) -> None:
+        """Соединения пула по состояниям (вызывается при выдаче /metrics)"""
+        pool = getattr(self.client._transport, "_pool", None)
+        connections = getattr(pool, "connections", None)
+        if connections is None:
+            return
+        idle = sum(1 for connection in connections if connection.is_idle())
+        backend_pool_connections.labels("active").set(len(connections) - idle)
+        backend_pool_connections.labels("idle").set(idle)
     
     async def _make_request(
         self, 
@@ -29,59 +188,99 @@ class BackendAPIClient:
         endpoint: str, 
         data: Optional[Dict[str, Any]] = None,
         params: Optional[Dict[str, Any]] = None,
-        idempotency_key: Optional[str] = None
+        idempotency_key: Optional[str] = None,
+        route: Optional[str] = None,
     ) -> Dict[str, Any]:
-        """Выполнить HTTP запрос к API"""
+        """Выполнить HTTP запрос к API.
+
+        route — шаблон пути для меток метрик и спанов (/users/{id}); обязателен, если в
+        endpoint подставлены идентификаторы, иначе каждый id станет отдельной серией.
+        """
         url = f"{self.base_url}{endpoint}"
-        headers = self.default_headers.copy()
+        # Только заголовки запроса; Authorization и Content-Type уже заданы клиенту
+        headers = {}
         
         if idempotency_key and config.idempotency_enabled:
             headers["X-Idempotency-Key"] = idempotency_key
         
+        # Связка апдейта с логами Backend: ID трассы уходит как X-Request-Id
+        trace_id = current_trace_id()
+        if trace_id:
+            headers["X-Request-Id"] = trace_id
+        
+        template = route or endpoint
+        status = "error"
+        attempts = 0
+        started = time.perf_counter()
+        backend_in_flight.inc()
         try:
-            # Простая политика ретраев для GET: до 2 повторов
-            attempts = 0
-            backoffs = [0.2, 0.6]
-            while True:
-                response = await self.client.request(
-                    method=method,
-                    url=url,
-                    json=data,
-                    params=params,
-                    headers=headers
-                )
-                if response.status_code == 429 and method.upper() == "GET":
-                    retry_after = response.headers.get("Retry-After")
-                    if retry_after is not None:
-                        await asyncio.sleep(float(retry_after))
-                    elif attempts < len(backoffs):
-                        await asyncio.sleep(backoffs[attempts])
-                    else:
-                        break
-                    attempts += 1
-                    continue
-                break
+            with span(f"{method} {template}", "backend", **{"http.method": method, "http.route": template}) as current:
+                # Простая политика ретраев для GET: до 2 повторов
+                backoffs = [0.2, 0.6]
+                while True:
+                    response = await self.client.request(
+                        method=method,
+                        url=url,
+                        json=data,
+                        params=params,
+                        headers=headers,
+                        extensions={"trace": _PoolWaitTrace()},
+                    )
+                    self._count_bytes(method, template, response)
+                    if response.status_code == 429 and method.upper() == "GET":
+                        retry_after = response.headers.get("Retry-After")
+                        if retry_after is not None:
+                            await asyncio.sleep(float(retry_after))
+                        elif attempts < len(backoffs):
+                            await asyncio.sleep(backoffs[attempts])
+                        else:
+                            break
+                        attempts += 1
+                        continue
+                    break
+                if current is not None:
+                    current.attributes["http.status_code"] = response.status_code
+                    current.attributes["http.retries"] = attempts
             
-            response.raise_for_status()
+            status = str(response.status_code)
+            if response.is_error:
+                raise _status_error(response, template)
             
             if response.status_code == 204:  # No Content
                 return {}
             
-            return response.json()
+            try:
+                return response.json()
+            except ValueError:
+                raise BackendInvalidResponseError(
+                    f"Invalid JSON from {template}", response.status_code, template
+                ) from None
             
-        except httpx.HTTPStatusError as e:
-            if e.response.status_code == 400:
-                raise ValueError(f"Bad request: {e.response.text}")
-            elif e.response.status_code == 401:
-                raise ValueError("Unauthorized")
-            elif e.response.status_code == 404:
-                raise ValueError("Not found")
-            elif e.response.status_code == 429:
-                raise ValueError("Rate limit exceeded")
-            else:
-                raise ValueError(f"HTTP error {e.response.status_code}: {e.response.text}")
+        # Исключение, поднятое в одном except, соседние except не ловят — считаем ошибку в каждой ветке
+        except httpx.TimeoutException as e:
+            status = "timeout"
+            backend_errors.labels(method, template, BackendTimeoutError.kind).inc()
+            raise BackendTimeoutError(f"Network error: {str(e)}", endpoint=template) from e
         except httpx.RequestError as e:
-            raise ValueError(f"Network error: {str(e)}")
+            status = "network"
+            backend_errors.labels(method, template, BackendNetworkError.kind).inc()
+            raise BackendNetworkError(f"Network error: {str(e)}", endpoint=template) from e
+        except BackendAPIError as e:
+            backend_errors.labels(method, template, e.kind).inc()
+            raise
+        finally:
+            backend_in_flight.dec()
+            backend_duration.labels(method, template).observe(time.perf_counter() - started)
+            backend_requests.labels(method, template, status).inc()
+            if attempts:
+                backend_retries.labels(method, template).inc(attempts)
+
+    @staticmethod
+    def _count_bytes(method: str, template: str, response: httpx.Response) -> None:
+        request_body = response.request.content if response.request is not None else b""
+        if request_body:
+            backend_bytes.labels(method, template, "sent").inc(len(request_body))
+        backend_bytes.labels(method, template, "received").inc(len(response.content))
 
     async def aclose(self) -> None:
         """Закрыть HTTP клиент"""
@@ -93,33 +292,33 @@ class BackendAPIClient:
     # Пользователи
     async def get_user(self, tg_id: int) -> Dict[str, Any]:
         """Получить пользователя"""
-        return await self._make_request("GET", f"/users/{tg_id}")
+        return await self._make_request("GET", f"/users/{tg_id}", route="/users/{id}")
     
     async def update_user_language(self, tg_id: int, language: str) -> None:
         """Обновить язык пользователя"""
-        await self._make_request("POST", f"/users/{tg_id}/language", {"language": language})
+        await self._make_request("POST", f"/users/{tg_id}/language", {"language": language}, route="/users/{id}/language")
     
     async def update_user(self, tg_id: int, **kwargs) -> None:
         """Обновить пользователя"""
-        await self._make_request("PATCH", f"/users/{tg_id}", kwargs)
+        await self._make_request("PATCH", f"/users/{tg_id}", kwargs, route="/users/{id}")
     
     # Подписки
     async def get_user_subscriptions(self, tg_id: int, page: int = 1) -> Dict[str, Any]:
         """Получить подписки пользователя"""
-        return await self._make_request("GET", f"/users/{tg_id}/subscriptions", params={"page": page})
+        return await self._make_request("GET", f"/users/{tg_id}/subscriptions", params={"page": page}, route="/users/{id}/subscriptions")
     
     async def get_subscription(self, subscription_id: int) -> Dict[str, Any]:
         """Получить подписку по ID"""
-        return await self._make_request("GET", f"/subscriptions/{subscription_id}")
+        return await self._make_request("GET", f"/subscriptions/{subscription_id}", route="/subscriptions/{id}")
     
     # Сервисы
     async def get_service(self, service_id: int) -> Dict[str, Any]:
         """Получить сервис по ID"""
-        return await self._make_request("GET", f"/services/{service_id}")
+        return await self._make_request("GET", f"/services/{service_id}", route="/services/{id}")
     
     async def get_service_payment_options(self, service_id: int) -> Dict[str, Any]:
         """Получить варианты оплаты для сервиса"""
-        return await self._make_request("GET", f"/services/{service_id}/payment-options")
+        return await self._make_request("GET", f"/services/{service_id}/payment-options", route="/services/{id}/payment-options")
     
     # Платежи
     async def create_payment(
@@ -141,11 +340,11 @@ class BackendAPIClient:
     
     async def get_user_payments(self, tg_id: int, page: int = 1) -> Dict[str, Any]:
         """Получить платежи пользователя"""
-        return await self._make_request("GET", f"/users/{tg_id}/payments", params={"page": page})
+        return await self._make_request("GET", f"/users/{tg_id}/payments", params={"page": page}, route="/users/{id}/payments")
     
     async def get_payment(self, payment_id: str) -> Dict[str, Any]:
         """Получить платеж по ID"""
-        return await self._make_request("GET", f"/payments/{payment_id}")
+        return await self._make_request("GET", f"/payments/{payment_id}", route="/payments/{id}")
     
     # Админ функции
     async def search_users(self, query: str) -> List[Dict[str, Any]]:
@@ -155,7 +354,7 @@ class BackendAPIClient:
     
     async def get_admin_user(self, tg_id: int) -> Dict[str, Any]:
         """Получить пользователя для админа"""
-        return await self._make_request("GET", f"/admin/users/{tg_id}")
+        return await self._make_request("GET", f"/admin/users/{tg_id}", route="/admin/users/{id}")
 
     async def get_admin_stats(self) -> Dict[str, Any]:
         """Получить базовую статистику для админа"""
@@ -163,7 +362,7 @@ class BackendAPIClient:
     
     async def extend_subscription(self, subscription_id: int, plan: str) -> None:
         """Продлить подписку (админ)"""
-        await self._make_request("POST", f"/admin/subscriptions/{subscription_id}/extend", {"plan": plan})
+        await self._make_request("POST", f"/admin/subscriptions/{subscription_id}/extend", {"plan": plan}, route="/admin/subscriptions/{id}/extend")
     
     async def create_subscription(
         self, 
@@ -180,15 +379,15 @@ class BackendAPIClient:
     
     async def start_service(self, service_id: int) -> None:
         """Запустить сервис"""
-        await self._make_request("POST", f"/admin/services/{service_id}/start")
+        await self._make_request("POST", f"/admin/services/{service_id}/start", route="/admin/services/{id}/start")
     
     async def pause_service(self, service_id: int) -> None:
         """Остановить сервис"""
-        await self._make_request("POST", f"/admin/services/{service_id}/pause")
+        await self._make_request("POST", f"/admin/services/{service_id}/pause", route="/admin/services/{id}/pause")
     
     async def resume_service(self, service_id: int) -> None:
         """Возобновить сервис"""
-        await self._make_request("POST", f"/admin/services/{service_id}/resume")
+        await self._make_request("POST", f"/admin/services/{service_id}/resume", route="/admin/services/{id}/resume")
     
     async def get_broadcast_recipients(
         self, 
@@ -217,3 +416,4 @@ class BackendAPIClient:
 
 # Глобальный экземпляр клиента
 api_client = BackendAPIClient()
+registry.on_collect(api_client.collect_pool_metrics)
@@ -0,0 +1,125 @@
+"""
+Горячая перезагрузка каталогов переводов: слежение за файлами и рассылка по репликам через Redis
+"""
+import asyncio
+import contextlib
+import json
+import logging
+import uuid
+from typing import List, Optional, Tuple
+
+from redis.asyncio import Redis
+
+from src.i18n.translations import TranslationError, Translations, translations
+
+logger = logging.getLogger(__name__)
+
+Signature = Tuple[Tuple[str, int, int], ...]
+
+
+class TranslationReloader:
+    """Перечитывает каталоги и подменяет их в Translations без рестарта бота.
+
+    Источники сигнала: изменение файлов (опрос mtime), внутренний HTTP-эндпоинт
+    и сообщения других реплик в канале Redis pub/sub.
+    """
+
+    def __init__(self, source: Translations):
+        self.source = source
+        self.instance_id = uuid.uuid4().hex
+        self.redis: Optional[Redis] = None
+        self.channel: Optional[str] = None
+        self.poll_interval = 0.0
+        self._signature: Optional[Signature] = None
+        self._tasks: List[asyncio.Task] = []
+
+    def bind(self, redis: Redis, channel: str) -> None:
+        """Подключить Redis для рассылки сигнала другим репликам"""
+        self.redis = redis
+        self.channel = channel
+
+    async def start(self, poll_interval: float = 0.0) -> None:
+        """Запустить слежение за файлами (poll_interval > 0) и подписку на канал"""
+        self.poll_interval = poll_interval
+        self._signature = await asyncio.to_thread(self._snapshot)
+        if poll_interval > 0:
+            self._tasks.append(asyncio.create_task(self._watch()))
+        if self.redis is not None:
+            self._tasks.append(asyncio.create_task(self._listen()))
+
+    async def stop(self) -> None:
+        tasks, self._tasks = self._tasks, []
+        for task in tasks:
+            task.cancel()
+        for task in tasks:
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+
+    async def reload(self, broadcast: bool = True) -> Tuple[str, ...]:
+        """Перечитать каталоги (в отдельном потоке) и подменить их; вернуть список языков"""
+        signature = await asyncio.to_thread(self._snapshot)
+        available, catalogs = await asyncio.to_thread(self.source.build)
+        self.source.swap(available, catalogs)
+        self._signature = signature
+        if broadcast and self.redis is not None:
+            message = json.dumps({"origin": self.instance_id})
+            await self.redis.publish(self.channel, message)
+        return available
+
+    def _snapshot(self) -> Signature:
+        return tuple(
+            (path.name, stat.st_mtime_ns, stat.st_size)
+            for path in sorted(self.source.locales_dir.glob("*.json"))
+            for stat in (path.stat(),)
+        )
+
+    async def _watch(self) -> None:
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            try:
+                signature = await asyncio.to_thread(self._snapshot)
+                if signature == self._signature:
+                    continue
+                # Запоминаем до загрузки: битый файл не перечитываем каждые N секунд
+                self._signature = signature
+                languages = await self.reload()
+                logger.info("Translations reloaded from files: %s", ", ".join(languages))
+            except TranslationError as e:
+                logger.error("Translations reload rejected, keeping previous catalogs: %s", e)
+            except Exception as e:
+                logger.error("Translations watcher error: %s", e)
+
+    async def _listen(self) -> None:
+        while True:
+            pubsub = self.redis.pubsub()
+            try:
+                await pubsub.subscribe(self.channel)
+                async for message in pubsub.listen():
+                    if message.get("type") != "message":
+                        continue
+                    await self._on_message(message.get("data"))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("Translations reload subscription error: %s", e)
+                await asyncio.sleep(5)
+            finally:
+                with contextlib.suppress(Exception):
+                    await pubsub.aclose()
+
+    async def _on_message(self, data) -> None:
+        try:
+            origin = json.loads(data).get("origin")
+        except (TypeError, ValueError, AttributeError):
+            return
+        if origin == self.instance_id:
+            return
+        try:
+            languages = await self.reload(broadcast=False)
+            logger.info("Translations reloaded by replica %s: %s", origin, ", ".join(languages))
+        except TranslationError as e:
+            logger.error("Translations reload rejected, keeping previous catalogs: %s", e)
+
+
+# Глобальный загрузчик переводов
+reloader = TranslationReloader(translations)
@@ -1,286 +1,258 @@
 """
 Локализация бота
 """
-from typing import Dict, Any
+import copy
+import json
+import logging
+from pathlib import Path
+from string import Formatter
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Каталоги переводов: <язык>.json с плоским словарём ключ -> шаблон
+LOCALES_DIR = Path(__file__).parent / "locales"
+
+DEFAULT_LANGUAGE = "ru"
+
+_formatter = Formatter()
+
+_CONVERSIONS: Dict[str, Callable[[Any], str]] = {"r": repr, "s": str, "a": ascii}
+
+
+class TranslationError(ValueError):
+    """Ошибка каталога переводов, обнаруженная при загрузке"""
+
+
+class CompiledTemplate:
+    """Шаблон, разобранный один раз на сегменты (литерал, поле, спецификация, конверсия)"""
+
+    __slots__ = ("source", "fields", "_segments")
+
+    def __init__(self, source: str):
+        self.source = source
+        segments: List[Tuple[str, Optional[str], str, Optional[str]]] = []
+        fields = []
+        try:
+            for literal, field, spec, conversion in _formatter.parse(source):
+                if field is None:
+                    segments.append((literal, None, "", None))
+                    continue
+                if not field.isidentifier():
+                    # Позиционные и составные поля ({0}, {a.b}, {a[0]}) не поддерживаются
+                    raise TranslationError(f"Unsupported placeholder {{{field}}} in {source!r}")
+                if conversion and conversion not in _CONVERSIONS:
+                    raise TranslationError(f"Unsupported conversion !{conversion} in {source!r}")
+                fields.append(field)
+                if "{" in spec:
+                    # Вложенная спецификация ({y:{width}}) подставляется при рендере
+                    for _, nested, _, _ in _formatter.parse(spec):
+                        if nested is not None:
+                            if not nested.isidentifier():
+                                raise TranslationError(f"Unsupported placeholder {{{nested}}} in {source!r}")
+                            fields.append(nested)
+                segments.append((literal, field, spec, conversion))
+        except TranslationError:
+            raise
+        except ValueError as e:
+            raise TranslationError(f"Malformed template {source!r}: {e}")
+        self.fields: FrozenSet[str] = frozenset(fields)
+        self._segments: Tuple[Tuple[str, Optional[str], str, Optional[str]], ...] = tuple(segments)
+
+    def render(self, **kwargs: Any) -> str:
+        parts = []
+        for literal, field, spec, conversion in self._segments:
+            parts.append(literal)
+            if field is None:
+                continue
+            value = kwargs[field]
+            if conversion:
+                value = _CONVERSIONS[conversion](value)
+            if "{" in spec:
+                spec = spec.format(**kwargs)
+            parts.append(format(value, spec))
+        return "".join(parts)
 
 
 class Translations:
     """Класс для управления переводами"""
-    
-    def __init__(self):
-        self.translations = {
-            "ru": self._get_russian_translations(),
-            "en": self._get_english_translations()
-        }
-    
+
+    def __init__(
+        self,
+        locales_dir: Path = LOCALES_DIR,
+        default_language: str = DEFAULT_LANGUAGE,
+        fallbacks: Optional[Dict[str, List[str]]] = None,
+    ):
+        self.locales_dir = Path(locales_dir)
+        self.default_language = default_language
+        # Явные цепочки, например {"uk": ["ru"]}; в конце всегда язык по умолчанию
+        self.fallbacks = fallbacks or {}
+        self._catalogs: Dict[str, Dict[str, CompiledTemplate]] = {}
+        self._chains: Dict[str, Tuple[Dict[str, CompiledTemplate], ...]] = {}
+        self._available = self._discover()
+        self._listeners: List[Callable[[], None]] = []
+        self._validators: List[Callable[["Translations"], None]] = []
+        if default_language not in self._available:
+            raise TranslationError(f"Default catalog {default_language!r} not found in {self.locales_dir}")
+
+    @property
+    def languages(self) -> Tuple[str, ...]:
+        """Доступные языки (по файлам каталогов, без загрузки)"""
+        return self._available
+
     def get(self, key: str, language: str = "ru", **kwargs) -> str:
         """Получить перевод по ключу"""
-        if language not in self.translations:
-            language = "ru"
-        
-        text = self.translations[language].get(key, key)
-        
-        # Подставляем плейсхолдеры
-        if kwargs:
-            text = text.format(**kwargs)
-        
-        return text
-    
-    def _get_russian_translations(self) -> Dict[str, str]:
-        """Русские переводы"""
-        return {
-            # Главное меню
-            "menu.main.title": "Главное меню. Выберите действие.",
-            "menu.main.subscriptions": "Подписки",
-            "menu.main.payment_history": "История платежей",
-            "menu.main.language": "Смена языка",
-            "menu.main.support": "Техподдержка",
-            "menu.main.faq": "FAQ",
-            "menu.main.admin_panel": "Админ-панель",
-            
-            # Подписки
-            "subscriptions.list.title": "Список текущих подписок.\n\nНажмите на подписку для управления",
-            "subscriptions.list.empty": "У вас пока нет активных подписок",
-            "subscriptions.detail.title": "Название услуги: {service_name}\nПодписка активна: {until_date}",
-            "subscriptions.detail.expired": "Название услуги: {service_name}\nПодписка активна: Нет",
-            "subscriptions.detail.renew": "Продлить подписку",
-            "subscriptions.detail.back": "Назад",
-            
-            # Платежи
-            "payment.method_select.title": "Выберите способ оплаты и период",
-            "payment.waiting.title": "Мы создали счёт. Оплатите его в течение {minutes} минут. После оплаты статус обновится автоматически.",
-            "payment.success.title": "Оплата получена. Подписка активна до {until_date}.",
-            "payment.failed.title": "Оплата не завершена. Попробуйте снова или выберите другой способ.",
-            "payment.open_invoice": "Открыть счёт",
-            "payment.check_status": "Проверить статус",
-            "payment.cancel": "Отмена",
-            "payment.retry": "Повторить",
-            "payment.change_method": "Сменить способ",
-            "payment.terms_pdf": "Оферта (PDF)",
-            
-            # История платежей
-            "payments.history.title": "История платежей (последние {n}). Выберите платеж для подробностей.",
-            "payments.history.empty": "История платежей пуста",
-            "payments.detail.title": "Платёж {payment_id}\nПровайдер: {provider}\nСумма: {amount} {currency}\nСтатус: {status}\nДата: {date}\nОписание: {description}\nВнешний ID: {external_id}",
-            "payments.detail.no_description": "Платёж {payment_id}\nПровайдер: {provider}\nСумма: {amount} {currency}\nСтатус: {status}\nДата: {date}\nОписание: —\nВнешний ID: {external_id}",
-            "payments.detail.no_external_id": "Платёж {payment_id}\nПровайдер: {provider}\nСумма: {amount} {currency}\nСтатус: {status}\nДата: {date}\nОписание: {description}\nВнешний ID: —",
-            "payments.detail.no_description_no_external": "Платёж {payment_id}\nПровайдер: {provider}\nСумма: {amount} {currency}\nСтатус: {status}\nДата: {date}\nОписание: —\nВнешний ID: —",
-            
-            # Язык
-            "language.switched.ru": "Язык переключен на русский.",
-            "language.switched.en": "Language switched to English.",
-            
-            # Поддержка
-            "support.title": "По вопросам — {support_link}",
-            
-            # FAQ
-            "faq.title": "Часто задаваемые вопросы",
-            "faq.back": "Назад",
-            
-            # Оферта
-            "offers.pdf.title": "Нажмите, чтобы получить оферту (PDF)",
-            "offers.pdf.unavailable": "Оферта недоступна",
-            
-            # Навигация
-            "nav.back": "Назад",
-            "nav.main": "Главное меню",
-            
-            # Пагинация
-            "pagination.page": "◀️ {page}/{pages} ▶️",
-            
-            # Статусы
-            "status.active": "Активна",
-            "status.expired": "Истекла",
-            "status.paused": "Пауза",
-            "status.pending": "Ожидание",
-            "status.paid": "Оплачен",
-            "status.failed": "Не завершён",
-            "status.canceled": "Отменён",
-            "status.refunded": "Возврат",
-            "status.chargeback": "Чарджбэк",
-            
-            # Ошибки
-            "error.service_unavailable": "Сервис недоступен, попробуйте позже",
-            "error.network_error": "Ошибка сети, попробуйте позже",
-            "error.retry": "Повторить",
-            "error.too_many_requests": "Слишком много запросов. Попробуйте позже",
-            
-            # Админ
-            "admin.broadcast.title": "Рассылка",
-            "admin.broadcast.enter_text": "Введите текст рассылки (до 3500 символов):",
-            "admin.broadcast.select_segment": "Выберите сегмент получателей:",
-            "admin.broadcast.segment.all": "Все пользователи",
-            "admin.broadcast.segment.active_subs": "С активными подписками",
-            "admin.broadcast.segment.no_active_subs": "Без активных подписок",
-            "admin.broadcast.segment.service": "Пользователи сервиса {service_id}",
-            "admin.broadcast.preview": "Предпросмотр:\n\n{text}\n\nСегмент: {segment}\n\nОтправить всем?",
-            "admin.broadcast.confirm.yes": "Да",
-            "admin.broadcast.confirm.no": "Нет",
-            "admin.broadcast.sending": "Отправка рассылки...",
-            "admin.broadcast.complete": "Рассылка завершена\nДоставлено: {delivered}\nОшибки: {failed}\nПропущено: {skipped}",
-            "admin.extend.select_plan": "Выберите план:",
-            
-            "admin.stats.title": "Статистика",
-            "admin.stats.users_total": "Всего пользователей: {total}",
-            "admin.stats.users_active": "Активных пользователей: {active}",
-            "admin.stats.subscriptions_active": "Активных подписок: {active}",
-            "admin.stats.monthly_revenue": "Месячный доход: {amount} {currency}",
-            
-            "admin.users.title": "Пользователи",
-            "admin.users.search": "Поиск пользователя (по @username, tg_id или части имени):",
-            "admin.users.not_found": "Пользователь не найден",
-            "admin.users.profile": "Профиль пользователя {tg_id}\nЯзык: {language}\nПодписок: {subscriptions_count}",
-            "admin.users.extend": "Продлить",
-            "admin.users.edit_subscription": "Изменить подписку",
-            
-            "admin.services.title": "Сервисы",
-            "admin.services.list": "Список сервисов:",
-            "admin.services.status.running": "Запущена",
-            "admin.services.status.paused": "Пауза",
-            "admin.services.status.stopped": "Остановлена",
-            "admin.services.status.error": "Ошибка",
-            "admin.services.start": "Запустить",
-            "admin.services.pause": "Пауза",
-            "admin.services.resume": "Возобновить",
-            "admin.services.stop": "Остановить",
-            "admin.services.update_config": "Обновить конфигурацию",
-            
-            # Приветствие
-            "welcome.first_time": "Добро пожаловать! Это ваш первый запуск бота.\n\nЗдесь вы можете:\n• Просматривать и управлять подписками\n• Продлевать подписки\n• Видеть историю платежей\n• Получить поддержку\n\nВыберите действие в главном меню.",
-            "welcome.returning": "С возвращением! Выберите действие в главном меню.",
-            
-            # Уведомления
-            "notification.subscription_expiring": "Подписка заканчивается {date}. Нажмите «Продлить» для продления.",
-            "notification.subscription_expired": "Подписка истекла. Нажмите «Продлить» для возобновления.",
-        }
-    
-    def _get_english_translations(self) -> Dict[str, str]:
-        """Английские переводы"""
-        return {
-            # Main Menu
-            "menu.main.title": "Main menu. Choose an action.",
-            "menu.main.subscriptions": "Subscriptions",
-            "menu.main.payment_history": "Payment history",
-            "menu.main.language": "Language",
-            "menu.main.support": "Support",
-            "menu.main.faq": "FAQ",
-            "menu.main.admin_panel": "Admin Panel",
-            
-            # Subscriptions
-            "subscriptions.list.title": "Your active subscriptions.\n\nTap a subscription to manage",
-            "subscriptions.list.empty": "You don't have any active subscriptions yet",
-            "subscriptions.detail.title": "Service name: {service_name}\nSubscription active: {until_date}",
-            "subscriptions.detail.expired": "Service name: {service_name}\nSubscription active: No",
-            "subscriptions.detail.renew": "Renew",
-            "subscriptions.detail.back": "Back",
-            
-            # Payments
-            "payment.method_select.title": "Choose payment method and period",
-            "payment.waiting.title": "Invoice created. Please pay within {minutes} minutes. Status will update automatically after payment.",
-            "payment.success.title": "Payment received. Subscription is active until {until_date}.",
-            "payment.failed.title": "Payment not completed. Try again or choose a different method.",
-            "payment.open_invoice": "Open Invoice",
-            "payment.check_status": "Check Status",
-            "payment.cancel": "Cancel",
-            "payment.retry": "Retry",
-            "payment.change_method": "Change Method",
-            "payment.terms_pdf": "Terms (PDF)",
-            
-            # Payment History
-            "payments.history.title": "Payment history (last {n}). Choose a payment for details.",
-            "payments.history.empty": "Payment history is empty",
-            "payments.detail.title": "Payment {payment_id}\nProvider: {provider}\nAmount: {amount} {currency}\nStatus: {status}\nDate: {date}\nDescription: {description}\nExternal ID: {external_id}",
-            "payments.detail.no_description": "Payment {payment_id}\nProvider: {provider}\nAmount: {amount} {currency}\nStatus: {status}\nDate: {date}\nDescription: —\nExternal ID: {external_id}",
-            "payments.detail.no_external_id": "Payment {payment_id}\nProvider: {provider}\nAmount: {amount} {currency}\nStatus: {status}\nDate: {date}\nDescription: {description}\nExternal ID: —",
-            "payments.detail.no_description_no_external": "Payment {payment_id}\nProvider: {provider}\nAmount: {amount} {currency}\nStatus: {status}\nDate: {date}\nDescription: —\nExternal ID: —",
-            
-            # Language
-            "language.switched.ru": "Language switched to Russian.",
-            "language.switched.en": "Language switched to English.",
-            
-            # Support
-            "support.title": "Support — {support_link}",
-            
-            # FAQ
-            "faq.title": "Frequently Asked Questions",
-            "faq.back": "Back",
-            
-            # Terms
-            "offers.pdf.title": "Tap to get the Terms (PDF)",
-            "offers.pdf.unavailable": "Terms unavailable",
-            
-            # Navigation
-            "nav.back": "Back",
-            "nav.main": "Main Menu",
-            
-            # Pagination
-            "pagination.page": "◀️ {page}/{pages} ▶️",
-            
-            # Statuses
-            "status.active": "Active",
-            "status.expired": "Expired",
-            "status.paused": "Paused",
-            "status.pending": "Pending",
-            "status.paid": "Paid",
-            "status.failed": "Failed",
-            "status.canceled": "Canceled",
-            "status.refunded": "Refunded",
-            "status.chargeback": "Chargeback",
-            
-            # Errors
-            "error.service_unavailable": "Service unavailable, try later",
-            "error.network_error": "Network error, try later",
-            "error.retry": "Retry",
-            "error.too_many_requests": "Too many requests. Please try again later",
-            
-            # Admin
-            "admin.broadcast.title": "Broadcast",
-            "admin.broadcast.enter_text": "Enter broadcast text (up to 3500 characters):",
-            "admin.broadcast.select_segment": "Select recipient segment:",
-            "admin.broadcast.segment.all": "All users",
-            "admin.broadcast.segment.active_subs": "With active subscriptions",
-            "admin.broadcast.segment.no_active_subs": "Without active subscriptions",
-            "admin.broadcast.segment.service": "Service {service_id} users",
-            "admin.broadcast.preview": "Preview:\n\n{text}\n\nSegment: {segment}\n\nSend to all?",
-            "admin.broadcast.confirm.yes": "Yes",
-            "admin.broadcast.confirm.no": "No",
-            "admin.broadcast.sending": "Sending broadcast...",
-            "admin.broadcast.complete": "Broadcast completed\nDelivered: {delivered}\nFailed: {failed}\nSkipped: {skipped}",
-            "admin.extend.select_plan": "Select plan:",
-            
-            "admin.stats.title": "Statistics",
-            "admin.stats.users_total": "Total users: {total}",
-            "admin.stats.users_active": "Active users: {active}",
-            "admin.stats.subscriptions_active": "Active subscriptions: {active}",
-            "admin.stats.monthly_revenue": "Monthly revenue: {amount} {currency}",
-            
-            "admin.users.title": "Users",
-            "admin.users.search": "Search user (by @username, tg_id or part of name):",
-            "admin.users.not_found": "User not found",
-            "admin.users.profile": "User profile {tg_id}\nLanguage: {language}\nSubscriptions: {subscriptions_count}",
-            "admin.users.extend": "Extend",
-            "admin.users.edit_subscription": "Edit subscription",
-            
-            "admin.services.title": "Services",
-            "admin.services.list": "Services list:",
-            "admin.services.status.running": "Running",
-            "admin.services.status.paused": "Paused",
-            "admin.services.status.stopped": "Stopped",
-            "admin.services.status.error": "Error",
-            "admin.services.start": "Start",
-            "admin.services.pause": "Pause",
-            "admin.services.resume": "Resume",
-            "admin.services.stop": "Stop",
-            "admin.services.update_config": "Update config",
-            
-            # Welcome
-            "welcome.first_time": "Welcome! This is your first time using the bot.\n\nHere you can:\n• View and manage subscriptions\n• Renew subscriptions\n• See payment history\n• Get support\n\nChoose an action in the main menu.",
-            "welcome.returning": "Welcome back! Choose an action in the main menu.",
-            
-            # Notifications
-            "notification.subscription_expiring": "Subscription expires {date}. Tap 'Renew' to extend.",
-            "notification.subscription_expired": "Subscription expired. Tap 'Renew' to renew.",
-        }
+        chain = self._chains.get(language)
+        if chain is None:
+            chain = self._chain(language)
+        for catalog in chain:
+            template = catalog.get(key)
+            if template is not None:
+                break
+        else:
+            return key
+
+        # Без аргументов возвращаем исходный шаблон (плейсхолдеры остаются как есть)
+        if not kwargs:
+            return template.source
+        try:
+            return template.render(**kwargs)
+        except KeyError:
+            # Не передан плейсхолдер шаблона — та же ошибка, что и при загрузке каталога
+            missing = template.fields - kwargs.keys()
+            if not missing:
+                raise
+            raise TranslationError(f"{language}:{key} requires placeholders {sorted(missing)}")
+
+    def catalog(self, language: str) -> Dict[str, CompiledTemplate]:
+        """Скомпилированный каталог языка (загружается при первом обращении)"""
+        catalog = self._catalogs.get(language)
+        if catalog is None:
+            catalog = self._load(language)
+        return catalog
+
+    def _discover(self) -> Tuple[str, ...]:
+        return tuple(sorted(path.stem for path in self.locales_dir.glob("*.json")))
+
+    def _chain(self, language: str) -> Tuple[Dict[str, CompiledTemplate], ...]:
+        names = [language, *self.fallbacks.get(language, ())]
+        if "-" in language:
+            names.append(language.split("-", 1)[0])
+        names.append(self.default_language)
+        chain = []
+        for name in dict.fromkeys(names):
+            if name in self._available:
+                chain.append(self.catalog(name))
+        chain = tuple(chain)
+        self._chains[language] = chain
+        return chain
+
+    def _load(self, language: str) -> Dict[str, CompiledTemplate]:
+        catalog = self._read(language)
+        if language != self.default_language:
+            self._validate(catalog, self.catalog(self.default_language), language)
+        self._catalogs[language] = catalog
+        logger.info("Loaded %d translations for %r", len(catalog), language)
+        return catalog
+
+    def _read(self, language: str) -> Dict[str, CompiledTemplate]:
+        path = self.locales_dir / f"{language}.json"
+        try:
+            with open(path, encoding="utf-8") as f:
+                raw = json.load(f)
+        except (OSError, ValueError) as e:
+            raise TranslationError(f"Cannot load catalog {path}: {e}")
+        return self.compile(raw, language)
+
+    # Перезагрузка
+    def add_reload_listener(self, callback: Callable[[], None]) -> None:
+        """Вызвать callback после каждой подмены каталогов (сброс кешей клавиатур и т.п.)"""
+        self._listeners.append(callback)
+
+    def add_reload_validator(self, callback: Callable[["Translations"], None]) -> None:
+        """Проверять новые каталоги до подмены: callback получает кандидата и бросает TranslationError"""
+        self._validators.append(callback)
+
+    def build(self) -> Tuple[Tuple[str, ...], Dict[str, Dict[str, CompiledTemplate]]]:
+        """Заново прочитать и проверить все каталоги, не трогая текущее состояние.
+
+        Безопасно вызывать из отдельного потока; ошибка каталога — TranslationError.
+        """
+        available = self._discover()
+        if self.default_language not in available:
+            raise TranslationError(f"Default catalog {self.default_language!r} not found in {self.locales_dir}")
+        reference = self._read(self.default_language)
+        catalogs = {self.default_language: reference}
+        for language in available:
+            if language != self.default_language:
+                catalog = self._read(language)
+                self._validate(catalog, reference, language)
+                catalogs[language] = catalog
+        if self._validators:
+            # Кандидат с новыми каталогами: те же цепочки fallback, текущее состояние не меняется
+            candidate = copy.copy(self)
+            candidate._catalogs = catalogs
+            candidate._available = available
+            candidate._chains = {}
+            for validate in self._validators:
+                validate(candidate)
+        return available, catalogs
+
+    def swap(
+        self,
+        available: Tuple[str, ...],
+        catalogs: Dict[str, Dict[str, CompiledTemplate]],
+    ) -> None:
+        """Атомарно подменить каталоги; get() читает их без блокировок"""
+        self._catalogs = catalogs
+        self._available = available
+        self._chains = {}
+        logger.info("Translations swapped: %s", ", ".join(available))
+        for callback in self._listeners:
+            try:
+                callback()
+            except Exception as e:
+                logger.error("Translations reload listener failed: %s", e)
+
+    def reload(self) -> None:
+        """Синхронная перезагрузка (для вызова вне event loop)"""
+        self.swap(*self.build())
+
+    @staticmethod
+    def compile(raw: Dict[str, Any], language: str) -> Dict[str, CompiledTemplate]:
+        """Скомпилировать словарь ключ -> шаблон"""
+        if not isinstance(raw, dict):
+            raise TranslationError(f"Catalog {language!r} must be a JSON object")
+        catalog = {}
+        for key, source in raw.items():
+            if not isinstance(source, str):
+                raise TranslationError(f"{language}:{key} must be a string")
+            try:
+                catalog[key] = CompiledTemplate(source)
+            except TranslationError as e:
+                raise TranslationError(f"{language}:{key}: {e}")
+        return catalog
+
+    @staticmethod
+    def _validate(
+        catalog: Dict[str, CompiledTemplate],
+        reference: Dict[str, CompiledTemplate],
+        language: str,
+    ) -> None:
+        # Набор плейсхолдеров перевода должен совпадать с эталонным языком в обе стороны:
+        # лишний упадёт при рендере, пропущенный молча потеряет данные в тексте
+        for key, template in catalog.items():
+            expected = reference.get(key)
+            if expected is None or template.fields == expected.fields:
+                continue
+            extra = template.fields - expected.fields
+            if extra:
+                raise TranslationError(
+                    f"{language}:{key} uses unknown placeholders {sorted(extra)}"
+                )
+            raise TranslationError(
+                f"{language}:{key} is missing placeholders {sorted(expected.fields - template.fields)}"
+            )
 
 
 # Глобальный экземпляр переводов
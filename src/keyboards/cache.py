@@ -0,0 +1,47 @@
+"""
+Мемоизация клавиатур: статические собираются один раз на язык, параметризованные — в LRU
+"""
+import functools
+from typing import Callable, Iterable, List, Optional, TypeVar
+
+BuilderT = TypeVar("BuilderT", bound=Callable)
+
+# Все мемоизированные билдеры: (функция с lru_cache, статическая ли)
+_registry: List[tuple] = []
+
+
+def memoized_keyboard(maxsize: Optional[int] = 512, static: bool = False) -> Callable[[BuilderT], BuilderT]:
+    """Кешировать результат билдера по аргументам.
+
+    static=True — клавиатура зависит только от языка, кеш без ограничения
+    и заполняется заранее через prebuild_keyboards().
+    Аргументы билдера должны быть hashable; возвращаемую клавиатуру нельзя изменять.
+    """
+    def decorator(func: BuilderT) -> BuilderT:
+        cached = functools.lru_cache(maxsize=None if static else maxsize)(func)
+        _registry.append((cached, static))
+        return cached
+
+    return decorator
+
+
+def prebuild_keyboards(languages: Iterable[str]) -> int:
+    """Собрать статические клавиатуры для всех языков (вызывается при старте)"""
+    built = 0
+    for language in languages:
+        for builder, static in _registry:
+            if static:
+                builder(language)
+                built += 1
+    return built
+
+
+def clear_keyboard_caches() -> None:
+    """Сбросить все кеши клавиатур (после изменения переводов)"""
+    for builder, _ in _registry:
+        builder.cache_clear()
+
+
+def keyboard_cache_info() -> dict:
+    """Статистика попаданий по каждому билдеру"""
+    return {builder.__name__: builder.cache_info()._asdict() for builder, _ in _registry}
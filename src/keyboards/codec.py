@@ -0,0 +1,244 @@
+"""
+Компактный бинарный кодек callback данных (base64url) и хранилище длинных payload
+"""
+import asyncio
+import base64
+import hashlib
+import logging
+import time
+import typing
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type, TypeVar
+
+from aiogram.filters.callback_data import MAX_CALLBACK_LENGTH
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Префикс токена в callback_data, за которым в хранилище лежит длинный payload
+TOKEN_MARK = "~"
+
+Encoder = Callable[[bytearray, Any], None]
+Decoder = Callable[[bytes, int], Tuple[Any, int]]
+
+
+def _write_varint(buf: bytearray, value: int) -> None:
+    # zigzag: небольшие отрицательные числа тоже занимают 1 байт
+    value = (value << 1) ^ (value >> 63)
+    while value > 0x7F:
+        buf.append((value & 0x7F) | 0x80)
+        value >>= 7
+    buf.append(value)
+
+
+def _read_varint(data: bytes, pos: int) -> Tuple[int, int]:
+    byte = data[pos]
+    if byte < 0x80:
+        return (byte >> 1) ^ -(byte & 1), pos + 1
+    result = 0
+    shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return (result >> 1) ^ -(result & 1), pos
+        shift += 7
+
+
+def _write_str(buf: bytearray, value: str) -> None:
+    raw = value.encode("utf-8")
+    _write_varint(buf, len(raw))
+    buf += raw
+
+
+def _read_str(data: bytes, pos: int) -> Tuple[str, int]:
+    size = data[pos]
+    if size < 0x80:
+        size, pos = size >> 1, pos + 1
+    else:
+        size, pos = _read_varint(data, pos)
+    end = pos + size
+    if end > len(data):
+        raise ValueError("truncated string")
+    return data[pos:end].decode("utf-8"), end
+
+
+def _write_bool(buf: bytearray, value: bool) -> None:
+    buf.append(1 if value else 0)
+
+
+def _read_bool(data: bytes, pos: int) -> Tuple[bool, int]:
+    return bool(data[pos]), pos + 1
+
+
+def _literal_codec(choices: Tuple[str, ...]) -> Tuple[Encoder, Decoder]:
+    """Literal-поле кодируется индексом варианта (1 байт вместо строки)"""
+    index = {choice: i for i, choice in enumerate(choices)}
+
+    def encode(buf: bytearray, value: str) -> None:
+        buf.append(index[value])
+
+    def decode(data: bytes, pos: int) -> Tuple[str, int]:
+        return choices[data[pos]], pos + 1
+
+    return encode, decode
+
+
+_SCALAR_CODECS: Dict[type, Tuple[Encoder, Decoder]] = {
+    bool: (_write_bool, _read_bool),
+    int: (_write_varint, _read_varint),
+    str: (_write_str, _read_str),
+}
+
+
+def _field_codec(name: str, annotation: Any) -> Tuple[Encoder, Decoder]:
+    if typing.get_origin(annotation) is typing.Literal:
+        choices = typing.get_args(annotation)
+        if len(choices) > 256 or not all(isinstance(c, str) for c in choices):
+            raise TypeError(f"Literal field {name!r} must have <= 256 str choices")
+        return _literal_codec(choices)
+    if annotation in _SCALAR_CODECS:
+        return _SCALAR_CODECS[annotation]
+    raise TypeError(f"Field {name!r} of type {annotation!r} is not supported by compact codec")
+
+
+_plans: Dict[type, List[Tuple[str, Encoder, Decoder]]] = {}
+_unpack_cache: Dict[type, "OrderedDict[str, Any]"] = {}
+UNPACK_CACHE_SIZE = 4096
+
+
+def _plan(cls: type) -> List[Tuple[str, Encoder, Decoder]]:
+    plan = _plans.get(cls)
+    if plan is None:
+        plan = [
+            (name, *_field_codec(name, field.annotation))
+            for name, field in cls.model_fields.items()
+        ]
+        _plans[cls] = plan
+    return plan
+
+
+class CallbackPayloadStore:
+    """Хранит payload длиннее 64 байт за коротким токеном (память + Redis)"""
+
+    def __init__(self, max_local: int = 10000, ttl: int = 7 * 86400):
+        self.max_local = max_local
+        self.ttl = ttl
+        self.redis_helper = None
+        self._local: "OrderedDict[str, str]" = OrderedDict()
+        # Когда токен последний раз записан в Redis (monotonic); нет записи — писать заново
+        self._persisted: Dict[str, float] = {}
+        self._tasks: set = set()
+
+    def bind(self, redis_helper) -> None:
+        """Подключить Redis, чтобы токены переживали рестарт и были видны репликам"""
+        self.redis_helper = redis_helper
+
+    def put(self, payload: str) -> str:
+        """Сохранить payload, вернуть токен (детерминированный: одинаковый payload -> один токен)"""
+        digest = hashlib.blake2b(payload.encode("utf-8"), digest_size=12).digest()
+        token = TOKEN_MARK + base64.urlsafe_b64encode(digest).decode("ascii")
+        # Мемоизированные клавиатуры раздают тот же токен неделями: продлеваем TTL в Redis
+        # после половины срока, неудачную запись повторяем при следующем put
+        persisted = self._persisted.get(token)
+        now = time.monotonic()
+        if persisted is None or now - persisted >= self.ttl / 2:
+            self._schedule_persist(token, payload, now)
+        self._local[token] = payload
+        self._local.move_to_end(token)
+        while len(self._local) > self.max_local:
+            evicted, _ = self._local.popitem(last=False)
+            self._persisted.pop(evicted, None)
+        return token
+
+    async def resolve(self, token: str) -> Optional[str]:
+        """Получить payload по токену"""
+        payload = self._local.get(token)
+        if payload is None and self.redis_helper is not None:
+            payload = await self.redis_helper.get_callback_payload(token)
+        return payload
+
+    def _schedule_persist(self, token: str, payload: str, now: float) -> None:
+        # pack() синхронный — запись в Redis уходит фоновой задачей
+        if self.redis_helper is None:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._persisted[token] = now
+        task = loop.create_task(self.redis_helper.set_callback_payload(token, payload, self.ttl))
+        self._tasks.add(task)
+        task.add_done_callback(lambda done: self._on_persisted(token, done))
+
+    def _on_persisted(self, token: str, task: asyncio.Task) -> None:
+        self._tasks.discard(task)
+        if task.cancelled() or task.exception() is not None:
+            # Запись не прошла — следующий put() запишет токен снова
+            self._persisted.pop(token, None)
+            if not task.cancelled():
+                logger.error("callback payload persist failed: %s", task.exception())
+
+
+# Глобальное хранилище длинных payload
+payload_store = CallbackPayloadStore()
+
+
+class CompactCallbackMixin:
+    """Бинарная упаковка полей CallbackData в base64url вместо текста через разделитель.
+
+    Использование: class X(CompactCallbackMixin, CallbackData, prefix="x").
+    Поддерживаются int, str, bool и Literal[str, ...] (кодируется индексом).
+    """
+
+    def pack(self) -> str:
+        buf = bytearray()
+        for name, encode, _ in _plan(type(self)):
+            encode(buf, getattr(self, name))
+        payload = base64.urlsafe_b64encode(bytes(buf)).rstrip(b"=").decode("ascii")
+        callback_data = f"{self.__prefix__}{self.__separator__}{payload}"
+        if len(callback_data.encode()) > MAX_CALLBACK_LENGTH:
+            return payload_store.put(callback_data)
+        return callback_data
+
+    @classmethod
+    def unpack(cls: Type[T], value: str) -> T:
+        # Одна и та же кнопка проверяется несколькими фильтрами и нажимается повторно
+        cache = _unpack_cache.get(cls)
+        if cache is None:
+            cache = _unpack_cache[cls] = OrderedDict()
+        result = cache.get(value)
+        if result is None:
+            result = cls._compact_unpack(value)
+            cache[value] = result
+            if len(cache) > UNPACK_CACHE_SIZE:
+                cache.popitem(last=False)
+        return result
+
+    @classmethod
+    def _compact_unpack(cls: Type[T], value: str) -> T:
+        prefix, sep, payload = value.partition(cls.__separator__)
+        if prefix != cls.__prefix__ or not sep:
+            raise ValueError(f"Bad prefix ({prefix!r} != {cls.__prefix__!r})")
+        if cls.__separator__ in payload:
+            # Кнопки, отправленные до перехода на компактный формат
+            return cls._legacy_unpack(value)
+        try:
+            padded = payload + "=" * (-len(payload) % 4)
+            data = base64.b64decode(padded, altchars=b"-_", validate=True)
+            fields = {}
+            pos = 0
+            for name, _, decode in _plan(cls):
+                fields[name], pos = decode(data, pos)
+        except (ValueError, IndexError):
+            raise ValueError(f"Malformed compact callback data {value!r}")
+        if pos != len(data):
+            raise ValueError(f"Trailing bytes in compact callback data {value!r}")
+        return cls(**fields)
+
+    @classmethod
+    def _legacy_unpack(cls: Type[T], value: str) -> T:
+        """Текстовый формат aiogram; переопределяется, если с тех пор менялся набор полей"""
+        return super(CompactCallbackMixin, cls).unpack(value)
@@ -1,8 +1,12 @@
 """
 Фабрики для callback данных
 """
+from typing import Literal
+
 from aiogram.filters.callback_data import CallbackData
 
+from src.keyboards.codec import CompactCallbackMixin
+
 
 class SubscriptionCallback(CallbackData, prefix="sub"):
     """Callback для подписок"""
@@ -11,11 +15,29 @@ class SubscriptionCallback(CallbackData, prefix="sub"):
     subscription_id: int = 0  # id - ID подписки
 
 
-class PaymentCallback(CallbackData, prefix="pay"):
+class PaymentCallback(CompactCallbackMixin, CallbackData, prefix="pay"):
     """Callback для платежей"""
-    action: str  # t - тип действия
+    action: Literal["select", "change_method", "check", "cancel", "terms"]  # t - тип действия
     payment_id: str = ""  # id - ID платежа
     page: int = 1  # p - страница
+    subscription_id: int = 0  # sid - ID подписки (select/change_method/terms)
+    provider: str = ""  # pr - платёжный провайдер (select)
+    plan: str = ""  # pl - код плана (select)
+
+    @classmethod
+    def _legacy_unpack(cls, value: str) -> "PaymentCallback":
+        # Старые кнопки "pay:<action>:<payment_id>:<page>" (проверка статуса, отмена);
+        # у change_method/terms в payment_id лежал subscription_id
+        parts = value.split(cls.__separator__)
+        if len(parts) != 4:
+            raise TypeError(f"Legacy callback data {value!r} takes 3 arguments but {len(parts) - 1} were given")
+        _, action, payment_id, page = parts
+        fields = {"action": action, "page": int(page) if page else 1}
+        if action in ("change_method", "terms"):
+            fields["subscription_id"] = int(payment_id)
+        else:
+            fields["payment_id"] = payment_id
+        return cls(**fields)
 
 
 class PaymentHistoryCallback(CallbackData, prefix="ph"):
@@ -40,9 +62,9 @@ class AdminCallback(CallbackData, prefix="admin"):
     page: int = 1  # p - страница
 
 
-class AdminExtendCallback(CallbackData, prefix="aex"):
+class AdminExtendCallback(CompactCallbackMixin, CallbackData, prefix="aex"):
     """Callback для продления подписки (админ)"""
-    action: str  # select_plan | confirm | cancel
+    action: Literal["select_plan", "confirm", "cancel"]
     subscription_id: int
     plan: str = ""
 
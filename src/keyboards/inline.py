@@ -8,8 +8,10 @@ from src.keyboards.factories import (
     PaymentDetailCallback, RenewCallback, AdminCallback,
     NavigationCallback, LanguageCallback
 )
-from typing import Optional
-from src.utils.formatters import format_status, truncate_service_name, format_date
+from typing import Optional, Tuple
+from src.keyboards.cache import memoized_keyboard
+from src.services.date_formatter import date_formatter
+from src.utils.formatters import format_status, truncate_service_name
 
 
 def get_subscriptions_list_keyboard(
@@ -55,8 +57,8 @@ def get_subscriptions_list_keyboard(
         
         pagination_row.append(
             InlineKeyboardButton(
-                text=translations.get("pagination.page", language).format(
-                    page=current_page, pages=total_pages
+                text=translations.get(
+                    "pagination.page", language, page=current_page, pages=total_pages
                 ),
                 callback_data="no_action"
             )
@@ -86,6 +88,7 @@ def get_subscriptions_list_keyboard(
     return InlineKeyboardMarkup(inline_keyboard=keyboard)
 
 
+@memoized_keyboard()
 def get_subscription_detail_keyboard(
     subscription_id: int,
     language: str = "ru"
@@ -116,15 +119,27 @@ def get_payment_method_select_keyboard(
     language: str = "ru"
 ) -> InlineKeyboardMarkup:
     """Клавиатура для выбора способа оплаты"""
+    # Списки из API приводим к кортежам, чтобы использовать их как ключ кеша
+    return _build_payment_method_select_keyboard(
+        tuple(providers),
+        tuple((plan["code"], plan["amount"], plan["currency"]) for plan in plans),
+        subscription_id,
+        language
+    )
+
+
+@memoized_keyboard()
+def _build_payment_method_select_keyboard(
+    providers: Tuple[str, ...],
+    plans: Tuple[tuple, ...],
+    subscription_id: int,
+    language: str
+) -> InlineKeyboardMarkup:
     keyboard = []
     
     # Кнопки провайдеров и планов
     for provider in providers:
-        for plan in plans:
-            plan_code = plan["code"]
-            amount = plan["amount"]
-            currency = plan["currency"]
-            
+        for plan_code, amount, currency in plans:
             button_text = f"{provider.upper()} - {plan_code} ({amount} {currency})"
             
             keyboard.append([
@@ -132,7 +147,9 @@ def get_payment_method_select_keyboard(
                     text=button_text,
                     callback_data=PaymentCallback(
                         action="select",
-                        payment_id=f"{subscription_id}:{provider}:{plan_code}"
+                        subscription_id=subscription_id,
+                        provider=provider,
+                        plan=plan_code
                     ).pack()
                 )
             ])
@@ -143,7 +160,7 @@ def get_payment_method_select_keyboard(
             text=translations.get("payment.terms_pdf", language),
             callback_data=PaymentCallback(
                 action="terms",
-                payment_id=str(subscription_id)
+                subscription_id=subscription_id
             ).pack()
         )
     ])
@@ -162,6 +179,7 @@ def get_payment_method_select_keyboard(
     return InlineKeyboardMarkup(inline_keyboard=keyboard)
 
 
+@memoized_keyboard()
 def get_payment_waiting_keyboard(
     payment_id: str,
     pay_link: Optional[str] = None,
@@ -203,6 +221,7 @@ def get_payment_waiting_keyboard(
     return InlineKeyboardMarkup(inline_keyboard=keyboard)
 
 
+@memoized_keyboard()
 def get_payment_failed_keyboard(
     payment_id: str,
     subscription_id: int,
@@ -219,7 +238,7 @@ def get_payment_failed_keyboard(
         [
             InlineKeyboardButton(
                 text=translations.get("payment.change_method", language),
-                callback_data=PaymentCallback(action="change_method", payment_id=str(subscription_id)).pack()
+                callback_data=PaymentCallback(action="change_method", subscription_id=subscription_id).pack()
             )
         ],
         [
@@ -245,14 +264,13 @@ def get_payments_history_keyboard(
     """Клавиатура для истории платежей"""
     keyboard = []
     
-    # Кнопки платежей
-    for payment in payments:
-        date = payment.get("date", "")
+    # Кнопки платежей; даты форматируем одним проходом
+    dates = date_formatter.format_many([payment.get("date", "") for payment in payments], language)
+    for payment, formatted_date in zip(payments, dates):
         amount = payment.get("amount", 0)
         currency = payment.get("currency", "")
         provider = payment.get("provider", "")
         status = payment.get("status", "")
-        formatted_date = format_date(date, language)
         status_text = format_status(status, language)
         button_text = f"{formatted_date} — {amount}{currency} — {provider} — {status_text}"
         
@@ -279,8 +297,8 @@ def get_payments_history_keyboard(
         
         pagination_row.append(
             InlineKeyboardButton(
-                text=translations.get("pagination.page", language).format(
-                    page=current_page, pages=total_pages
+                text=translations.get(
+                    "pagination.page", language, page=current_page, pages=total_pages
                 ),
                 callback_data="no_action"
             )
@@ -307,6 +325,7 @@ def get_payments_history_keyboard(
     return InlineKeyboardMarkup(inline_keyboard=keyboard)
 
 
+@memoized_keyboard(static=True)
 def get_language_select_keyboard(language: str = "ru") -> InlineKeyboardMarkup:
     """Клавиатура для выбора языка"""
     keyboard = [
@@ -327,6 +346,7 @@ def get_language_select_keyboard(language: str = "ru") -> InlineKeyboardMarkup:
     return InlineKeyboardMarkup(inline_keyboard=keyboard)
 
 
+@memoized_keyboard(static=True)
 def get_admin_main_keyboard(language: str = "ru") -> InlineKeyboardMarkup:
     """Главная клавиатура админа"""
     keyboard = [
@@ -0,0 +1,70 @@
+"""
+Обратный индекс подписей reply-кнопок: текст на любом языке -> ключ действия
+"""
+from typing import Any, Dict, Iterable, Optional, Union
+
+from aiogram.filters import Filter
+from aiogram.types import Message
+
+from src.i18n.translations import TranslationError, Translations, translations
+
+# Ключи переводов кнопок главного меню; ключ перевода и есть ключ действия
+MAIN_MENU_KEYS = (
+    "menu.main.subscriptions",
+    "menu.main.payment_history",
+    "menu.main.language",
+    "menu.main.support",
+    "menu.main.faq",
+    "menu.main.admin_panel",
+)
+
+
+class MenuTextIndex:
+    """Словарь подпись -> ключ, собранный один раз из всех языков Translations"""
+
+    def __init__(self, source: Translations, keys: Iterable[str]):
+        self.source = source
+        self.keys = tuple(keys)
+        self._index: Dict[str, str] = {}
+        self.rebuild()
+
+    def rebuild(self) -> None:
+        """Пересобрать индекс (после добавления языка или перезагрузки переводов)"""
+        self._index = self._collect(self.source)
+
+    def validate(self, candidate: Translations) -> None:
+        """Проверка новых каталогов до подмены (Translations.add_reload_validator)"""
+        self._collect(candidate)
+
+    def _collect(self, source: Translations) -> Dict[str, str]:
+        index = {}
+        for language in source.languages:
+            for key in self.keys:
+                label = source.get(key, language)
+                owner = index.setdefault(label, key)
+                if owner != key:
+                    raise TranslationError(f"Menu label {label!r} is shared by {owner!r} and {key!r}")
+        return index
+
+    def resolve(self, text: Optional[str]) -> Optional[str]:
+        """Ключ действия по тексту кнопки или None"""
+        if not text:
+            return None
+        return self._index.get(text)
+
+
+# Глобальный индекс главного меню
+menu_index = MenuTextIndex(translations, MAIN_MENU_KEYS)
+
+
+class MenuButton(Filter):
+    """Пропускает сообщения с подписью кнопки меню и передаёт в хендлер menu_action"""
+
+    def __init__(self, index: MenuTextIndex = menu_index):
+        self.index = index
+
+    async def __call__(self, message: Message) -> Union[bool, Dict[str, Any]]:
+        action = self.index.resolve(message.text)
+        if action is None:
+            return False
+        return {"menu_action": action}
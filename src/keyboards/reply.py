@@ -3,8 +3,10 @@ Reply клавиатуры
 """
 from aiogram.types import ReplyKeyboardMarkup, KeyboardButton
 from src.i18n.translations import translations
+from src.keyboards.cache import memoized_keyboard
 
 
+@memoized_keyboard(static=True)
 def get_main_keyboard(language: str = "ru") -> ReplyKeyboardMarkup:
     """Главная клавиатура"""
     keyboard = [
@@ -28,6 +30,7 @@ def get_main_keyboard(language: str = "ru") -> ReplyKeyboardMarkup:
     )
 
 
+@memoized_keyboard(static=True)
 def get_admin_main_reply_keyboard(language: str = "ru") -> ReplyKeyboardMarkup:
     """Главная клавиатура для админа"""
     keyboard = [
@@ -54,6 +57,7 @@ def get_admin_main_reply_keyboard(language: str = "ru") -> ReplyKeyboardMarkup:
     )
 
 
+@memoized_keyboard(static=True)
 def get_back_keyboard(language: str = "ru") -> ReplyKeyboardMarkup:
     """Клавиатура с кнопкой назад"""
     keyboard = [
@@ -0,0 +1,230 @@
+"""
+Неблокирующее логирование: очередь + поток записи, JSON-вывод, ограничение повторов
+
+Из event loop запись лога — это проверка лимита и put в очередь; форматирование
+сообщения (%-аргументы, traceback) и запись в поток выполняются в отдельном
+потоке. Похожие сообщения (логгер + уровень + шаблон, аргументы могут отличаться)
+сверх burst за окно подавляются; вместо них выводится одна строка с их числом
+и последним подавленным сообщением.
+"""
+import json
+import logging
+import queue
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, TextIO, Tuple
+
+from src.monitoring.tracing import current_trace_id
+
+# Стандартные атрибуты LogRecord: всё остальное из extra попадает в JSON
+_RECORD_FIELDS = frozenset(logging.makeLogRecord({}).__dict__) | {"message", "asctime", "suppressed", "request_id"}
+
+_Key = Tuple[str, int, str]
+
+
+class JsonFormatter(logging.Formatter):
+    """Одна JSON-строка на запись"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": _message(record),
+        }
+        request_id = getattr(record, "request_id", None)
+        if request_id:
+            data["request_id"] = request_id
+        suppressed = getattr(record, "suppressed", 0)
+        if suppressed:
+            data["suppressed"] = suppressed
+        if record.exc_info:
+            data["exc"] = self.formatException(record.exc_info)
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_FIELDS and not key.startswith("_"):
+                data[key] = value
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    """Прежний текстовый формат; сводка подавленных записей — тем же форматом"""
+
+    def __init__(self):
+        super().__init__("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+
+    def formatMessage(self, record: logging.LogRecord) -> str:
+        record.message = _message(record)
+        return super().formatMessage(record)
+
+
+def _message(record: logging.LogRecord) -> str:
+    message = record.getMessage()
+    suppressed = getattr(record, "suppressed", 0)
+    if suppressed:
+        return f"{suppressed} similar records suppressed, last: {message}"
+    return message
+
+
+class RepeatLimiter:
+    """Не больше burst записей с одним шаблоном за window секунд; остальные считаются"""
+
+    def __init__(self, burst: int = 5, window: float = 10.0):
+        self.burst = burst
+        self.window = window
+        self._lock = threading.Lock()
+        # ключ -> [начало окна, пропущено записей, подавлено записей, последняя подавленная]
+        self._state: Dict[_Key, list] = {}
+
+    def allow(self, record: logging.LogRecord) -> Tuple[bool, Optional[logging.LogRecord]]:
+        """(пропустить ли запись, сводка по подавленным в прошлом окне или None)"""
+        if self.burst <= 0:
+            return True, None
+        key = (record.name, record.levelno, str(record.msg))
+        now = record.created
+        with self._lock:
+            state = self._state.get(key)
+            if state is None or now - state[0] >= self.window:
+                summary = _summary(state[3], state[2]) if state and state[2] else None
+                self._state[key] = [now, 1, 0, None]
+                return True, summary
+            if state[1] < self.burst:
+                state[1] += 1
+                return True, None
+            state[2] += 1
+            state[3] = record
+            return False, None
+
+    def drain(self, now: Optional[float] = None) -> List[logging.LogRecord]:
+        """Сводки по окнам, которые закончились, и очистка неактивных ключей"""
+        now = time.time() if now is None else now
+        summaries = []
+        with self._lock:
+            for key, state in list(self._state.items()):
+                if now - state[0] < self.window:
+                    continue
+                if state[2]:
+                    summaries.append(_summary(state[3], state[2]))
+                del self._state[key]
+        return summaries
+
+
+def _summary(record: logging.LogRecord, count: int) -> logging.LogRecord:
+    summary = logging.makeLogRecord(record.__dict__)
+    summary.suppressed = count
+    return summary
+
+
+class QueueLogHandler(logging.Handler):
+    """Handler для event loop: лимит повторов и put_nowait в ограниченную очередь"""
+
+    def __init__(self, log_queue: "queue.Queue", limiter: RepeatLimiter):
+        super().__init__()
+        self.queue = log_queue
+        self.limiter = limiter
+        self.dropped = 0
+
+    def emit(self, record: logging.LogRecord) -> None:
+        allowed, summary = self.limiter.allow(record)
+        if summary is not None:
+            self._put(summary)
+        if not allowed:
+            return
+        # ID трассы берём здесь: contextvar доступен только в потоке апдейта
+        record.request_id = current_trace_id()
+        self._put(record)
+
+    def _put(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            # Лучше потерять строку лога, чем остановить loop
+            self.dropped += 1
+
+
+class LogPipeline:
+    """Поток записи: забирает записи из очереди, форматирует и пишет в stream"""
+
+    def __init__(
+        self,
+        stream: TextIO = None,
+        json_output: bool = True,
+        burst: int = 5,
+        window: float = 10.0,
+        queue_size: int = 10000,
+    ):
+        self.queue: "queue.Queue[Optional[logging.LogRecord]]" = queue.Queue(maxsize=queue_size)
+        self.limiter = RepeatLimiter(burst, window)
+        self.handler = QueueLogHandler(self.queue, self.limiter)
+        self.target = logging.StreamHandler(stream or sys.stderr)
+        self.target.setFormatter(JsonFormatter() if json_output else TextFormatter())
+        self._thread: Optional[threading.Thread] = None
+        self._reported_drops = 0
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Дописать очередь, остановить поток и писать дальше напрямую (завершение процесса)"""
+        if self._thread is None:
+            return
+        self.queue.put(None)
+        self._thread.join(timeout=5)
+        self._thread = None
+        self._flush_summaries(float("inf"))
+        root = logging.getLogger()
+        if self.handler in root.handlers:
+            root.removeHandler(self.handler)
+            root.addHandler(self.target)
+
+    def _run(self) -> None:
+        # Сводки по подавленным выводим не реже раза в секунду
+        interval = min(1.0, self.limiter.window)
+        next_drain = time.monotonic() + interval
+        while True:
+            try:
+                record = self.queue.get(timeout=interval)
+            except queue.Empty:
+                record = False
+            if record is None:
+                return
+            if record:
+                self.target.handle(record)
+            if time.monotonic() >= next_drain:
+                self._flush_summaries()
+                next_drain = time.monotonic() + interval
+
+    def _flush_summaries(self, now: Optional[float] = None) -> None:
+        for summary in self.limiter.drain(now):
+            self.target.handle(summary)
+        dropped = self.handler.dropped
+        if dropped > self._reported_drops:
+            record = logging.makeLogRecord({
+                "name": __name__,
+                "levelno": logging.WARNING,
+                "levelname": "WARNING",
+                "msg": "log queue full, dropped %d records",
+                "args": (dropped - self._reported_drops,),
+            })
+            self._reported_drops = dropped
+            self.target.handle(record)
+
+
+def setup_logging(
+    level: str = "INFO",
+    json_output: bool = True,
+    burst: int = 5,
+    window: float = 10.0,
+    queue_size: int = 10000,
+) -> LogPipeline:
+    """Заменить обработчики корневого логгера на очередь с потоком записи"""
+    pipeline = LogPipeline(json_output=json_output, burst=burst, window=window, queue_size=queue_size)
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(pipeline.handler)
+    root.setLevel(level.upper())
+    pipeline.start()
+    return pipeline
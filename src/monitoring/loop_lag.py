@@ -0,0 +1,113 @@
+"""
+Монитор задержки event loop: метрика лага и снимки стека при зависаниях
+
+Задача-проба в loop раз в interval отмечает «пульс» и измеряет, насколько
+позже запланированного она проснулась. Сторожевой поток следит за пульсом:
+если loop не отвечает дольше threshold, он снимает стек потока loop —
+это и есть код, который держит loop синхронной работой.
+"""
+import asyncio
+import contextlib
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+
+from src.bot.config import config
+from src.monitoring.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+loop_lag = registry.histogram(
+    "bot_event_loop_lag_seconds",
+    "Event loop scheduling delay",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+loop_lag_last = registry.gauge("bot_event_loop_lag_last_seconds", "Last measured event loop delay")
+loop_stalls = registry.counter("bot_event_loop_stalls_total", "Event loop stalls longer than the threshold")
+
+# Сколько внутренних кадров стека хранить в снимке
+STACK_LIMIT = 30
+
+
+class LoopLagMonitor:
+    """Измерение лага event loop и снимки стека при превышении порога"""
+
+    def __init__(self, interval: float = 0.1, threshold: float = 0.25, max_samples: int = 50):
+        self.interval = interval
+        self.threshold = threshold
+        self.samples: Deque[Dict[str, Any]] = deque(maxlen=max_samples)
+        self._heartbeat = time.monotonic()
+        self._loop_thread_id: Optional[int] = None
+        self._stall: Optional[Dict[str, Any]] = None
+        self._task: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+
+    async def start(self) -> None:
+        """Запустить пробу в текущем loop и сторожевой поток"""
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._stopped.clear()
+        self._task = asyncio.create_task(self._probe())
+        self._thread = threading.Thread(target=self._watch, name="loop-lag-watchdog", daemon=True)
+        self._thread.start()
+
+    async def stop(self) -> None:
+        self._stopped.set()
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        if self._thread is not None:
+            await asyncio.to_thread(self._thread.join, 1)
+            self._thread = None
+
+    def stalls(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Снимки зависаний, новые первыми"""
+        return list(self.samples)[::-1][:limit]
+
+    async def _probe(self) -> None:
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            self._heartbeat = now
+            self.record(max(0.0, now - expected))
+
+    def record(self, lag: float) -> None:
+        loop_lag.observe(lag)
+        loop_lag_last.set(lag)
+        stall = self._stall
+        if stall is not None:
+            # Loop снова отвечает: фиксируем полную длительность зависания
+            stall["lag"] = round(lag, 4)
+            self._stall = None
+            logger.warning("Event loop stalled for %.3fs", lag)
+
+    def _watch(self) -> None:
+        period = max(self.interval / 2, 0.01)
+        while not self._stopped.wait(period):
+            behind = time.monotonic() - self._heartbeat - self.interval
+            if behind >= self.threshold and self._stall is None:
+                self._sample(behind)
+
+    def _sample(self, behind: float) -> None:
+        frame = sys._current_frames().get(self._loop_thread_id)
+        stack = traceback.format_stack(frame)[-STACK_LIMIT:] if frame is not None else []
+        entry = {"at": time.time(), "lag": round(behind, 4), "stack": "".join(stack)}
+        self.samples.append(entry)
+        self._stall = entry
+        loop_stalls.inc()
+
+
+# Глобальный монитор loop основного процесса
+loop_monitor = LoopLagMonitor(
+    interval=config.loop_lag_interval,
+    threshold=config.loop_lag_threshold,
+    max_samples=config.loop_lag_samples,
+)
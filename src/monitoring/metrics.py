@@ -0,0 +1,296 @@
+"""
+Метрики в памяти процесса и их выдача в текстовом формате Prometheus
+
+Дочерние серии (конкретные значения меток) создаются один раз и кешируются:
+на горячем пути запись — это поиск в словаре и сложение, без аллокаций.
+"""
+import inspect
+import time
+from bisect import bisect_left
+from functools import wraps
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Границы по умолчанию для задержек в секундах
+DEFAULT_BUCKETS: Tuple[float, ...] = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class _CounterChild:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+
+class _GaugeChild(_CounterChild):
+    __slots__ = ()
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.value -= amount
+
+
+class _HistogramChild:
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def time(self) -> "_Timer":
+        return _Timer(self)
+
+
+class _Timer:
+    """Контекстный менеджер: наблюдение длительности блока"""
+
+    __slots__ = ("child", "started")
+
+    def __init__(self, child: _HistogramChild):
+        self.child = child
+
+    def __enter__(self) -> "_Timer":
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.child.observe(time.perf_counter() - self.started)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        if not self.labelnames:
+            self._children[()] = self._new_child()
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, *values: str):
+        """Серия для значений меток; повторный вызов возвращает тот же объект"""
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name}: expected labels {self.labelnames}, got {values}")
+            child = self._children[values] = self._new_child()
+        return child
+
+    def _label_str(self, values: Tuple[str, ...], extra: Optional[Tuple[str, str]] = None) -> str:
+        pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(self.labelnames, values)]
+        if extra:
+            pairs.append(f'{extra[0]}="{extra[1]}"')
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+    def collect(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for values, child in list(self._children.items()):
+            lines.append(f"{self.name}{self._label_str(values)} {_format_value(child.value)}")
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_child(self) -> _CounterChild:
+        return _CounterChild()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._children[()].inc(amount)
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def _new_child(self) -> _GaugeChild:
+        return _GaugeChild()
+
+    def set(self, value: float) -> None:
+        self._children[()].set(value)
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._children[()].inc(amount)
+
+    def dec(self, amount: float = 1.0) -> None:
+        self._children[()].dec(amount)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Iterable[float] = DEFAULT_BUCKETS,
+    ):
+        self.bounds = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self) -> _HistogramChild:
+        return _HistogramChild(self.bounds)
+
+    def observe(self, value: float) -> None:
+        self._children[()].observe(value)
+
+    def collect(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for values, child in list(self._children.items()):
+            cumulative = 0
+            for bound, count in zip(self.bounds + (float("inf"),), child.counts):
+                cumulative += count
+                labels = self._label_str(values, ("le", _format_value(bound)))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = self._label_str(values)
+            lines.append(f"{self.name}_sum{labels} {_format_value(child.sum)}")
+            lines.append(f"{self.name}_count{labels} {child.count}")
+        return lines
+
+
+class Registry:
+    """Набор метрик процесса"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Callable[[], None]] = []
+
+    def _register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"metric {metric.name} already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Iterable[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def on_collect(self, callback: Callable[[], None]) -> None:
+        """Вызывать callback перед каждой выдачей: для значений, которые дорого обновлять на горячем пути"""
+        self._collectors.append(callback)
+
+    def render(self) -> str:
+        """Все метрики в текстовом формате Prometheus 0.0.4"""
+        for callback in self._collectors:
+            callback()
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.collect())
+        return "\n".join(lines) + "\n"
+
+
+def timed_methods(histogram: Histogram, prefix: str = ""):
+    """Декоратор класса: длительность каждого публичного async-метода в histogram{op=<имя>}"""
+
+    def decorate(cls):
+        for name, method in list(vars(cls).items()):
+            if name.startswith("_") or not inspect.iscoroutinefunction(method):
+                continue
+            setattr(cls, name, _timed(method, histogram.labels(prefix + name)))
+        return cls
+
+    return decorate
+
+
+def _timed(method, child: _HistogramChild):
+    @wraps(method)
+    async def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return await method(*args, **kwargs)
+        finally:
+            child.observe(time.perf_counter() - started)
+
+    return wrapper
+
+
+# Глобальный реестр и метрики бота
+registry = Registry()
+
+update_duration = registry.histogram(
+    "bot_update_duration_seconds", "Update processing time, whole middleware chain", ("event_type",)
+)
+handler_duration = registry.histogram(
+    "bot_handler_duration_seconds", "Handler time including inner middlewares", ("event_type", "handler")
+)
+handler_errors = registry.counter(
+    "bot_handler_errors_total", "Exceptions caught by ErrorHandlingMiddleware", ("event_type",)
+)
+backend_requests = registry.counter(
+    "bot_backend_requests_total", "Backend API calls by endpoint template and status", ("method", "endpoint", "status")
+)
+backend_duration = registry.histogram(
+    "bot_backend_request_duration_seconds", "Backend API call time including retries", ("method", "endpoint")
+)
+backend_retries = registry.counter(
+    "bot_backend_retries_total", "Backend API retries after 429", ("method", "endpoint")
+)
+backend_bytes = registry.counter(
+    "bot_backend_bytes_total", "Backend API body bytes by direction (sent/received)", ("method", "endpoint", "direction")
+)
+backend_errors = registry.counter(
+    "bot_backend_errors_total", "Backend API failures by error class", ("method", "endpoint", "error")
+)
+backend_pool_wait = registry.histogram(
+    "bot_backend_pool_wait_seconds",
+    "Time a Backend API request waited for a pooled connection",
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0, 2.5, 10.0),
+)
+backend_in_flight = registry.gauge("bot_backend_requests_in_flight", "Backend API requests in progress")
+backend_pool_connections = registry.gauge(
+    "bot_backend_pool_connections", "Backend API pool connections by state (active/idle)", ("state",)
+)
+notify_snapshots = registry.counter(
+    "bot_notify_snapshots_total",
+    "Payment notify snapshots used as-is (hit) or fetched from Backend API (miss)",
+    ("snapshot", "result"),
+)
+redis_duration = registry.histogram(
+    "bot_redis_operation_duration_seconds",
+    "RedisHelper operation time",
+    ("op",),
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0),
+)
+broadcast_messages = registry.counter(
+    "bot_broadcast_messages_total", "Broadcast deliveries by result", ("result",)
+)
+broadcast_queue_depth = registry.gauge(
+    "bot_broadcast_queue_depth", "Recipients left in the current broadcast batch"
+)
+broadcast_active = registry.gauge("bot_broadcast_active", "Broadcasts in progress")
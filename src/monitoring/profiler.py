@@ -0,0 +1,165 @@
+"""
+Профилирование по запросу: сэмплирующий CPU-профилировщик и снимки tracemalloc
+
+CPU: отдельный поток раз в interval снимает стеки всех потоков процесса и
+агрегирует их в формат collapsed stacks (вход для flamegraph.pl / speedscope).
+Память: снимки tracemalloc с идентификаторами и сравнение двух снимков.
+"""
+import asyncio
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+# Ограничения запросов профилирования
+MAX_PROFILE_SECONDS = 120.0
+MIN_PROFILE_INTERVAL = 0.001
+
+
+class ProfilerBusyError(RuntimeError):
+    """Профилирование уже выполняется"""
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    filename = code.co_filename
+    cwd = os.getcwd()
+    if filename.startswith(cwd):
+        filename = filename[len(cwd) + 1:]
+    else:
+        filename = os.path.basename(filename)
+    return f"{code.co_name} ({filename})".replace(";", ":")
+
+
+class SamplingProfiler:
+    """Сэмплирующий профилировщик: стек каждого потока раз в interval секунд"""
+
+    def __init__(self):
+        self._lock = asyncio.Lock()
+        self._labels: Dict[Any, str] = {}
+
+    @property
+    def running(self) -> bool:
+        return self._lock.locked()
+
+    async def profile(self, seconds: float, interval: float = 0.005) -> str:
+        """Профилировать seconds секунд; вернуть collapsed stacks («кадр;кадр;… число»)"""
+        if self._lock.locked():
+            raise ProfilerBusyError("profiler is already running")
+        seconds = min(max(seconds, 0.0), MAX_PROFILE_SECONDS)
+        interval = max(interval, MIN_PROFILE_INTERVAL)
+        async with self._lock:
+            stacks: Counter = Counter()
+            stop = threading.Event()
+            thread = threading.Thread(
+                target=self._sample_loop, args=(stacks, interval, stop), name="sampling-profiler", daemon=True
+            )
+            thread.start()
+            try:
+                await asyncio.sleep(seconds)
+            finally:
+                stop.set()
+                await asyncio.to_thread(thread.join)
+                self._labels.clear()
+            return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+
+    def _sample_loop(self, stacks: Counter, interval: float, stop: threading.Event) -> None:
+        own = threading.get_ident()
+        while not stop.wait(interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own:
+                    continue
+                stacks[self._collapse(names.get(thread_id, str(thread_id)), frame)] += 1
+
+    def _collapse(self, thread_name: str, frame) -> str:
+        frames: List[str] = []
+        labels = self._labels
+        while frame is not None:
+            code = frame.f_code
+            label = labels.get(code)
+            if label is None:
+                label = labels[code] = _frame_label(frame)
+            frames.append(label)
+            frame = frame.f_back
+        frames.append(thread_name.replace(";", ":"))
+        return ";".join(reversed(frames))
+
+
+class MemorySnapshots:
+    """Снимки tracemalloc по идентификаторам и их сравнение"""
+
+    def __init__(self, max_snapshots: int = 5, frames: int = 10):
+        self.max_snapshots = max_snapshots
+        self.frames = frames
+        self._snapshots: Dict[int, tracemalloc.Snapshot] = {}
+        self._taken_at: Dict[int, float] = {}
+        self._next_id = 1
+
+    @property
+    def tracing(self) -> bool:
+        return tracemalloc.is_tracing()
+
+    async def take(self) -> Dict[str, Any]:
+        """Снять снимок (при первом вызове включает tracemalloc: учёт только с этого момента)"""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+        snapshot = await asyncio.to_thread(self._take)
+        snapshot_id = self._next_id
+        self._next_id += 1
+        self._snapshots[snapshot_id] = snapshot
+        self._taken_at[snapshot_id] = time.time()
+        while len(self._snapshots) > self.max_snapshots:
+            oldest = min(self._snapshots)
+            del self._snapshots[oldest], self._taken_at[oldest]
+        current, peak = tracemalloc.get_traced_memory()
+        return {"id": snapshot_id, "traced_bytes": current, "peak_bytes": peak, "snapshots": sorted(self._snapshots)}
+
+    async def diff(
+        self, base_id: int, target_id: Optional[int] = None, key: str = "lineno", limit: int = 25
+    ) -> Dict[str, Any]:
+        """Рост аллокаций от снимка base_id до target_id (по умолчанию — последнего)"""
+        if key not in ("lineno", "filename", "traceback"):
+            raise ValueError(f"unsupported key: {key}")
+        target_id = target_id if target_id is not None else max(self._snapshots, default=None)
+        if base_id not in self._snapshots or target_id not in self._snapshots:
+            raise KeyError(f"unknown snapshot: {base_id if base_id not in self._snapshots else target_id}")
+        base, target = self._snapshots[base_id], self._snapshots[target_id]
+        stats = await asyncio.to_thread(target.compare_to, base, key)
+        return {
+            "base": base_id,
+            "target": target_id,
+            "seconds": round(self._taken_at[target_id] - self._taken_at[base_id], 3),
+            "size_diff_total": sum(stat.size_diff for stat in stats),
+            "top": [
+                {
+                    "where": str(stat.traceback[0]) if key != "traceback" else stat.traceback.format(),
+                    "size_diff": stat.size_diff,
+                    "size": stat.size,
+                    "count_diff": stat.count_diff,
+                }
+                for stat in stats[:limit]
+            ],
+        }
+
+    def stop(self) -> None:
+        """Выключить tracemalloc и удалить снимки"""
+        self._snapshots.clear()
+        self._taken_at.clear()
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    def _take(self) -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            tracemalloc.Filter(False, "<unknown>"),
+        ))
+
+
+# Глобальные профилировщики процесса
+cpu_profiler = SamplingProfiler()
+memory_snapshots = MemorySnapshots()
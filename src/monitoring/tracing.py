@@ -0,0 +1,290 @@
+"""
+Трассировка апдейтов: спаны Redis, Backend API и Telegram API в рамках одного апдейта
+
+Трасса открывается в middleware апдейта и живёт в contextvar, поэтому спаны
+создаются без передачи контекста через аргументы. Медленные трассы попадают
+в кольцевой буфер и (если задан путь) выгружаются в файл в формате OTLP JSON.
+"""
+import contextlib
+import inspect
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from functools import wraps
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Optional
+
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware
+
+from src.bot.config import config
+
+logger = logging.getLogger(__name__)
+
+SERVICE_NAME = "r3lax3-bot"
+# SpanKind в OTLP: внутренние операции и исходящие вызовы
+_OTLP_KIND = {"update": 2, "backend": 3, "redis": 3, "telegram": 3}
+
+
+@dataclass
+class Span:
+    name: str
+    kind: str
+    span_id: str
+    parent_id: Optional[str]
+    start_ns: int
+    end_ns: int = 0
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    error: Optional[str] = None
+
+    @property
+    def duration(self) -> float:
+        return (self.end_ns - self.start_ns) / 1e9
+
+
+@dataclass
+class Trace:
+    trace_id: str
+    root: Span
+    spans: List[Span] = field(default_factory=list)
+    max_spans: int = 256
+    dropped: int = 0
+    exported: bool = False  # уже отправлена в файл экспорта
+
+    @property
+    def duration(self) -> float:
+        return self.root.duration
+
+
+_trace: ContextVar[Optional[Trace]] = ContextVar("trace", default=None)
+_parent: ContextVar[Optional[Span]] = ContextVar("trace_parent", default=None)
+
+
+def _new_id(size: int) -> str:
+    return os.urandom(size).hex()
+
+
+def current_trace_id() -> Optional[str]:
+    """ID текущей трассы (передаётся в Backend как X-Request-Id)"""
+    trace = _trace.get()
+    return trace.trace_id if trace is not None else None
+
+
+@contextlib.contextmanager
+def span(name: str, kind: str = "internal", **attributes: Any) -> Iterator[Optional[Span]]:
+    """Спан внутри текущей трассы; вне трассы ничего не записывает и отдаёт None"""
+    trace = _trace.get()
+    if trace is None:
+        yield None
+        return
+    if len(trace.spans) >= trace.max_spans:
+        trace.dropped += 1
+        yield None
+        return
+    parent = _parent.get()
+    current = Span(name, kind, _new_id(8), parent.span_id if parent else None, time.time_ns(), attributes=attributes)
+    trace.spans.append(current)
+    token = _parent.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        current.end_ns = time.time_ns()
+        _parent.reset(token)
+
+
+def traced_methods(kind: str):
+    """Декоратор класса: спан на каждый публичный async-метод"""
+
+    def decorate(cls):
+        for name, method in list(vars(cls).items()):
+            if name.startswith("_") or not inspect.iscoroutinefunction(method):
+                continue
+            setattr(cls, name, _traced(method, name, kind))
+        return cls
+
+    return decorate
+
+
+def _traced(method, name: str, kind: str):
+    @wraps(method)
+    async def wrapper(*args, **kwargs):
+        if _trace.get() is None:
+            return await method(*args, **kwargs)
+        with span(name, kind):
+            return await method(*args, **kwargs)
+
+    return wrapper
+
+
+class TelegramTracingMiddleware(BaseRequestMiddleware):
+    """Middleware сессии бота: спан на каждый вызов Telegram Bot API"""
+
+    async def __call__(self, make_request, bot, method):
+        if _trace.get() is None:
+            return await make_request(bot, method)
+        with span(method.__api_method__, "telegram"):
+            return await make_request(bot, method)
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_span(trace: Trace, item: Span) -> Dict[str, Any]:
+    data = {
+        "traceId": trace.trace_id,
+        "spanId": item.span_id,
+        "name": item.name,
+        "kind": _OTLP_KIND.get(item.kind, 1),
+        "startTimeUnixNano": str(item.start_ns),
+        "endTimeUnixNano": str(item.end_ns),
+        "attributes": [
+            {"key": key, "value": _otlp_value(value)}
+            for key, value in {"span.kind": item.kind, **item.attributes}.items()
+            if value is not None
+        ],
+        "status": {"code": 2, "message": item.error} if item.error else {"code": 1},
+    }
+    if item.parent_id:
+        data["parentSpanId"] = item.parent_id
+    return data
+
+
+def to_otlp(traces: Iterable[Trace]) -> Dict[str, Any]:
+    """Трассы в формате OTLP JSON (ExportTraceServiceRequest)"""
+    spans = [_otlp_span(trace, item) for trace in traces for item in [trace.root, *trace.spans]]
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": SERVICE_NAME}}]},
+            "scopeSpans": [{"scope": {"name": __name__}, "spans": spans}],
+        }]
+    }
+
+
+class TraceFileExporter:
+    """Запись трасс в файл (JSON Lines, по документу OTLP на строку) в отдельном потоке"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._queue: "queue.SimpleQueue[Optional[List[Trace]]]" = queue.SimpleQueue()
+        self._thread: Optional[threading.Thread] = None
+
+    def submit(self, traces: List[Trace]) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="trace-exporter", daemon=True)
+            self._thread.start()
+        self._queue.put(traces)
+
+    def close(self) -> None:
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _run(self) -> None:
+        while True:
+            traces = self._queue.get()
+            if traces is None:
+                return
+            try:
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(to_otlp(traces), ensure_ascii=False) + "\n")
+            except OSError as e:
+                logger.error("Trace export to %s failed: %s", self.path, e)
+
+
+class Tracer:
+    """Трассы апдейтов и кольцевой буфер медленных"""
+
+    def __init__(
+        self,
+        slow_threshold: float = 1.0,
+        buffer_size: int = 100,
+        export_path: Optional[str] = None,
+        max_spans: int = 256,
+    ):
+        self.slow_threshold = slow_threshold
+        self.max_spans = max_spans
+        self.slow: Deque[Trace] = deque(maxlen=buffer_size)
+        self.exporter = TraceFileExporter(export_path) if export_path else None
+
+    @contextlib.contextmanager
+    def trace(self, name: str, trace_id: Optional[str] = None, **attributes: Any) -> Iterator[Trace]:
+        """Открыть трассу на время блока (обработка одного апдейта)"""
+        root = Span(name, "update", _new_id(8), None, time.time_ns(), attributes=attributes)
+        current = Trace(trace_id or _new_id(16), root, max_spans=self.max_spans)
+        trace_token = _trace.set(current)
+        parent_token = _parent.set(root)
+        try:
+            yield current
+        except BaseException as e:
+            root.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            root.end_ns = time.time_ns()
+            _parent.reset(parent_token)
+            _trace.reset(trace_token)
+            self._finish(current)
+
+    def _finish(self, trace: Trace) -> None:
+        if trace.duration < self.slow_threshold:
+            return
+        self.slow.append(trace)
+        if self.exporter is not None:
+            trace.exported = True
+            self.exporter.submit([trace])
+
+    def slow_traces(self, limit: int = 10) -> List[Trace]:
+        """Последние медленные трассы, новые первыми"""
+        return list(self.slow)[::-1][:limit]
+
+    def export(self) -> int:
+        """Выгрузить в файл ещё не выгруженные трассы буфера; вернуть их число"""
+        if self.exporter is None:
+            return 0
+        traces = [trace for trace in self.slow if not trace.exported]
+        for trace in traces:
+            trace.exported = True
+        if traces:
+            self.exporter.submit(traces)
+        return len(traces)
+
+    def close(self) -> None:
+        if self.exporter is not None:
+            self.exporter.close()
+
+
+def format_trace(trace: Trace, top: int = 5) -> str:
+    """Краткое описание трассы для админа: корневой спан и самые долгие дочерние"""
+    attrs = " ".join(f"{key}={value}" for key, value in trace.root.attributes.items() if value is not None)
+    started = time.strftime("%H:%M:%S", time.gmtime(trace.root.start_ns / 1e9))
+    lines = [f"{started} {trace.duration:.3f}s {trace.root.name} {attrs} [{trace.trace_id[:8]}]"]
+    if trace.root.error:
+        lines.append(f"  ! {trace.root.error}")
+    for item in sorted(trace.spans, key=lambda s: s.end_ns - s.start_ns, reverse=True)[:top]:
+        mark = " !" if item.error else ""
+        lines.append(f"  {item.duration:.3f}s {item.kind} {item.name}{mark}")
+    if trace.dropped:
+        lines.append(f"  (+{trace.dropped} spans dropped)")
+    return "\n".join(lines)
+
+
+# Глобальный трассировщик
+tracer = Tracer(
+    slow_threshold=config.trace_slow_threshold,
+    buffer_size=config.trace_buffer_size,
+    export_path=config.trace_export_path or None,
+)
@@ -3,7 +3,7 @@ Admin router package aggregator
 """
 from aiogram import Router
 
-from . import entry, main, broadcast, users, services
+from . import entry, main, broadcast, users, services, keyspace, traces
 
 router = Router()
 
@@ -12,3 +12,5 @@ router.include_router(main.router)
 router.include_router(broadcast.router)
 router.include_router(users.router)
 router.include_router(services.router)
+router.include_router(keyspace.router)
+router.include_router(traces.router)
@@ -14,6 +14,7 @@ from src.keyboards.inline import get_admin_main_keyboard
 from src.storage.redis_helper import RedisHelper
 from src.clients.backend_api import api_client
 from src.bot.config import config
+from src.monitoring.metrics import broadcast_active, broadcast_messages, broadcast_queue_depth
 
 logger = logging.getLogger(__name__)
 router = Router()
@@ -54,6 +55,9 @@ async def confirm_broadcast_yes(message: Message, state: FSMContext, is_admin: b
     failed = 0
     cursor = None
     limit = config.broadcast_batch_size
+    delivered_total = broadcast_messages.labels("delivered")
+    failed_total = broadcast_messages.labels("failed")
+    broadcast_active.inc()
     try:
         while True:
             resp = await api_client.get_broadcast_recipients(segment, cursor=cursor, limit=limit)
@@ -62,18 +66,24 @@ async def confirm_broadcast_yes(message: Message, state: FSMContext, is_admin: b
                 break
             rps = config.telegram_delivery_rps
             for i, uid in enumerate(ids):
+                broadcast_queue_depth.set(len(ids) - i)
                 try:
                     await message.bot.send_message(chat_id=uid, text=text)
                     delivered += 1
+                    delivered_total.inc()
                 except Exception:
                     failed += 1
+                    failed_total.inc()
                 if (i + 1) % rps == 0:
                     await asyncio.sleep(1)
             cursor = resp.get("next_cursor")
             if not cursor:
                 break
     except Exception as e:
-        logger.error(f"broadcast error: {e}")
+        logger.error("broadcast error: %s", e)
+    finally:
+        broadcast_queue_depth.set(0)
+        broadcast_active.dec()
     await redis_helper.clear_broadcast_draft(message.from_user.id)
     report = translations.get("admin.broadcast.complete", language, delivered=delivered, failed=failed, skipped=0)
     await message.answer(report, reply_markup=get_admin_main_keyboard(language))
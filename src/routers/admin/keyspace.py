@@ -0,0 +1,44 @@
+"""
+Admin keyspace report: memory and TTL per Redis namespace
+"""
+import asyncio
+import html
+import logging
+from aiogram import Router
+from aiogram.filters import Command
+from aiogram.types import Message
+
+from src.i18n.translations import translations
+from src.storage.keyspace import KeyspaceAnalyzer, format_report
+from src.storage.redis_helper import RedisHelper
+from src.utils.render import edit_text_if_changed
+
+logger = logging.getLogger(__name__)
+router = Router()
+
+# Лимит длины сообщения Telegram с запасом на <pre>
+MAX_REPORT_LENGTH = 3900
+
+# Один обход за раз: повторное нажатие не должно удваивать нагрузку на Redis
+_scan_lock = asyncio.Lock()
+
+
+@router.message(Command("admin_keyspace"))
+async def admin_keyspace_cmd(message: Message, is_admin: bool, language: str, redis_helper: RedisHelper):
+    if not is_admin:
+        return
+    if _scan_lock.locked():
+        await message.answer("Scan already running" if language == "en" else "Анализ уже выполняется")
+        return
+    async with _scan_lock:
+        progress = await message.answer("Scanning Redis..." if language == "en" else "Анализ Redis...")
+        try:
+            report = await KeyspaceAnalyzer(redis_helper.redis, prefix=redis_helper.prefix).analyze()
+        except Exception as e:
+            logger.error("admin keyspace error: %s", e)
+            await edit_text_if_changed(progress, redis_helper, translations.get("error.service_unavailable", language))
+            return
+        text = format_report(report)
+        if len(text) > MAX_REPORT_LENGTH:
+            text = text[:MAX_REPORT_LENGTH].rsplit("\n", 1)[0] + "\n…"
+        await edit_text_if_changed(progress, redis_helper, f"<pre>{html.escape(text)}</pre>")
@@ -2,41 +2,44 @@
 Admin main menu actions via MagicFilter
 """
 import logging
-from aiogram import Router, F
+from aiogram import F
 from aiogram.filters import StateFilter
 from aiogram.fsm.context import FSMContext
 from aiogram.types import CallbackQuery
 
+from src.bot.dispatch import IndexedRouter
 from src.states.admin import AdminSG
 from src.i18n.translations import translations
 from src.keyboards.inline import get_admin_main_keyboard
 from src.keyboards.factories import AdminCallback
 from src.clients.backend_api import api_client
+from src.storage.redis_helper import RedisHelper
+from src.utils.render import edit_text_if_changed
 
 logger = logging.getLogger(__name__)
-router = Router()
+router = IndexedRouter()
 
 
 @router.callback_query(StateFilter(AdminSG.STATE_ADMIN_MAIN), AdminCallback.filter(F.action == "broadcast"))
-async def on_broadcast_selected(callback: CallbackQuery, is_admin: bool, language: str, state: FSMContext):
+async def on_broadcast_selected(callback: CallbackQuery, is_admin: bool, language: str, state: FSMContext, redis_helper: RedisHelper):
     if not is_admin:
         return
     await state.set_state(AdminSG.STATE_ADMIN_BROADCAST_TEXT)
-    await callback.message.edit_text(translations.get("admin.broadcast.enter_text", language))
+    await edit_text_if_changed(callback.message, redis_helper, translations.get("admin.broadcast.enter_text", language))
     await callback.answer()
 
 
 @router.callback_query(StateFilter(AdminSG.STATE_ADMIN_MAIN), AdminCallback.filter(F.action == "users"))
-async def on_users_selected(callback: CallbackQuery, is_admin: bool, language: str, state: FSMContext):
+async def on_users_selected(callback: CallbackQuery, is_admin: bool, language: str, state: FSMContext, redis_helper: RedisHelper):
     if not is_admin:
         return
     await state.set_state(AdminSG.STATE_ADMIN_USER_SEARCH)
-    await callback.message.edit_text(translations.get("admin.users.search", language))
+    await edit_text_if_changed(callback.message, redis_helper, translations.get("admin.users.search", language))
     await callback.answer()
 
 
 @router.callback_query(StateFilter(AdminSG.STATE_ADMIN_MAIN), AdminCallback.filter(F.action == "stats"))
-async def on_stats_selected(callback: CallbackQuery, is_admin: bool, language: str):
+async def on_stats_selected(callback: CallbackQuery, is_admin: bool, language: str, redis_helper: RedisHelper):
     if not is_admin:
         return
     try:
@@ -48,19 +51,19 @@ async def on_stats_selected(callback: CallbackQuery, is_admin: bool, language: s
         text += "\n" + translations.get(
             "admin.stats.monthly_revenue", language, amount=stats.get("mrr_amount", 0), currency=stats.get("currency", "USD")
         )
-        await callback.message.edit_text(text, reply_markup=get_admin_main_keyboard(language))
+        await edit_text_if_changed(callback.message, redis_helper, text, reply_markup=get_admin_main_keyboard(language))
         await callback.answer()
     except Exception as e:
-        logger.error(f"admin stats error: {e}")
+        logger.error("admin stats error: %s", e)
         await callback.answer(translations.get("error.service_unavailable", language), show_alert=True)
 
 
 @router.callback_query(StateFilter(AdminSG.STATE_ADMIN_MAIN), AdminCallback.filter(F.action == "services"))
-async def on_services_selected(callback: CallbackQuery, is_admin: bool, language: str):
+async def on_services_selected(callback: CallbackQuery, is_admin: bool, language: str, redis_helper: RedisHelper):
     if not is_admin:
         return
     hint = "/admin_service <service_id>" if language == "en" else "/admin_service <service_id> — посмотреть и управлять"
-    await callback.message.edit_text(hint, reply_markup=get_admin_main_keyboard(language))
+    await edit_text_if_changed(callback.message, redis_helper, hint, reply_markup=get_admin_main_keyboard(language))
     await callback.answer()
 
 
@@ -2,16 +2,17 @@
 Admin service info and actions
 """
 import logging
-from aiogram import Router, F
+from aiogram import F
 from aiogram.filters import Command
 from aiogram.types import Message, CallbackQuery, InlineKeyboardMarkup, InlineKeyboardButton
 
+from src.bot.dispatch import IndexedRouter
 from src.i18n.translations import translations
 from src.keyboards.factories import AdminServiceCallback
 from src.clients.backend_api import api_client
 
 logger = logging.getLogger(__name__)
-router = Router()
+router = IndexedRouter()
 
 
 @router.message(Command("admin_service"))
@@ -38,7 +39,7 @@ async def admin_service_cmd(message: Message, is_admin: bool, language: str):
         )
         await message.answer(text, reply_markup=kb)
     except Exception as e:
-        logger.error(f"admin service cmd error: {e}")
+        logger.error("admin service cmd error: %s", e)
         await message.answer(translations.get("error.service_unavailable", language))
 
 
@@ -50,7 +51,7 @@ async def admin_service_start(callback: CallbackQuery, callback_data: AdminServi
         await api_client.start_service(callback_data.service_id)
         await callback.answer(translations.get("admin.services.start", language))
     except Exception as e:
-        logger.error(f"admin service action error: {e}")
+        logger.error("admin service action error: %s", e)
         await callback.answer(translations.get("error.service_unavailable", language), show_alert=True)
 
 
@@ -62,7 +63,7 @@ async def admin_service_pause(callback: CallbackQuery, callback_data: AdminServi
         await api_client.pause_service(callback_data.service_id)
         await callback.answer(translations.get("admin.services.pause", language))
     except Exception as e:
-        logger.error(f"admin service action error: {e}")
+        logger.error("admin service action error: %s", e)
         await callback.answer(translations.get("error.service_unavailable", language), show_alert=True)
 
 
@@ -74,7 +75,7 @@ async def admin_service_resume(callback: CallbackQuery, callback_data: AdminServ
         await api_client.resume_service(callback_data.service_id)
         await callback.answer(translations.get("admin.services.resume", language))
     except Exception as e:
-        logger.error(f"admin service action error: {e}")
+        logger.error("admin service action error: %s", e)
         await callback.answer(translations.get("error.service_unavailable", language), show_alert=True)
 
 
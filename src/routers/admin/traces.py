@@ -0,0 +1,38 @@
+"""
+Admin slow-update traces: recent slow updates and OTLP export
+"""
+import html
+import logging
+from aiogram import Router
+from aiogram.filters import Command
+from aiogram.types import Message
+
+from src.monitoring.tracing import format_trace, tracer
+
+logger = logging.getLogger(__name__)
+router = Router()
+
+# Лимит длины сообщения Telegram с запасом на <pre>
+MAX_REPORT_LENGTH = 3900
+
+
+@router.message(Command("admin_traces"))
+async def admin_traces_cmd(message: Message, is_admin: bool, language: str):
+    if not is_admin:
+        return
+    parts = message.text.strip().split()
+    if len(parts) > 1 and parts[1] == "export":
+        if tracer.exporter is None:
+            await message.answer("TRACE_EXPORT_PATH is not set" if language == "en" else "TRACE_EXPORT_PATH не задан")
+            return
+        count = tracer.export()
+        await message.answer(f"{count} → {tracer.exporter.path}")
+        return
+    traces = tracer.slow_traces(limit=10)
+    if not traces:
+        await message.answer("No slow updates" if language == "en" else "Медленных апдейтов нет")
+        return
+    text = "\n\n".join(format_trace(trace) for trace in traces)
+    if len(text) > MAX_REPORT_LENGTH:
+        text = text[:MAX_REPORT_LENGTH].rsplit("\n", 1)[0] + "\n…"
+    await message.answer(f"<pre>{html.escape(text)}</pre>")
@@ -2,20 +2,23 @@
 Admin utilities: user profile, search, create/extend subscription
 """
 import logging
-from aiogram import Router
+from aiogram import F
 from aiogram.filters import Command, StateFilter
 from aiogram.types import Message, CallbackQuery
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
 from aiogram.fsm.context import FSMContext
 
+from src.bot.dispatch import IndexedRouter
 from src.i18n.translations import translations
 from src.clients.backend_api import api_client
 from src.keyboards.factories import AdminExtendCallback
 from src.utils.formatters import format_date
 from src.states.admin import AdminSG
+from src.storage.redis_helper import RedisHelper
+from src.utils.render import edit_text_if_changed
 
 logger = logging.getLogger(__name__)
-router = Router()
+router = IndexedRouter()
 
 
 @router.message(Command("admin_user"))
@@ -37,7 +40,7 @@ async def admin_user_profile_cmd(message: Message, is_admin: bool, language: str
             text += f"\n - sub#{s.get('id')} {s.get('service_name')} until: {format_date(s.get('until_date'), language) if s.get('until_date') else '-'}"
         await message.answer(text)
     except Exception as e:
-        logger.error(f"admin user profile error: {e}")
+        logger.error("admin user profile error: %s", e)
         await message.answer(translations.get("error.service_unavailable", language))
 
 
@@ -69,12 +72,12 @@ async def admin_extend_cmd(message: Message, is_admin: bool, language: str):
         kb = InlineKeyboardMarkup(inline_keyboard=rows)
         await message.answer(translations.get("admin.extend.select_plan", language), reply_markup=kb)
     except Exception as e:
-        logger.error(f"admin extend cmd error: {e}")
+        logger.error("admin extend cmd error: %s", e)
         await message.answer(translations.get("error.service_unavailable", language))
 
 
-@router.callback_query(AdminExtendCallback.filter(lambda d: d.action == "select_plan"))
-async def admin_extend_select_plan(callback: CallbackQuery, callback_data: AdminExtendCallback, is_admin: bool, language: str):
+@router.callback_query(AdminExtendCallback.filter(F.action == "select_plan"))
+async def admin_extend_select_plan(callback: CallbackQuery, callback_data: AdminExtendCallback, is_admin: bool, language: str, redis_helper: RedisHelper):
     if not is_admin:
         return
     text = ("Extend subscription" if language == "en" else "Подтвердите продление") + f" #{callback_data.subscription_id} plan {callback_data.plan}?"
@@ -94,28 +97,28 @@ async def admin_extend_select_plan(callback: CallbackQuery, callback_data: Admin
             ],
         ]
     )
-    await callback.message.edit_text(text, reply_markup=kb)
+    await edit_text_if_changed(callback.message, redis_helper, text, reply_markup=kb)
     await callback.answer()
 
 
-@router.callback_query(AdminExtendCallback.filter(lambda d: d.action == "confirm"))
-async def admin_extend_confirm(callback: CallbackQuery, callback_data: AdminExtendCallback, is_admin: bool, language: str):
+@router.callback_query(AdminExtendCallback.filter(F.action == "confirm"))
+async def admin_extend_confirm(callback: CallbackQuery, callback_data: AdminExtendCallback, is_admin: bool, language: str, redis_helper: RedisHelper):
     if not is_admin:
         return
     try:
         await api_client.extend_subscription(callback_data.subscription_id, callback_data.plan)
-        await callback.message.edit_text("Extended" if language == "en" else "Продлено")
+        await edit_text_if_changed(callback.message, redis_helper, "Extended" if language == "en" else "Продлено")
         await callback.answer()
     except Exception as e:
-        logger.error(f"admin extend confirm error: {e}")
+        logger.error("admin extend confirm error: %s", e)
         await callback.answer(translations.get("error.service_unavailable", language), show_alert=True)
 
 
-@router.callback_query(AdminExtendCallback.filter(lambda d: d.action == "cancel"))
-async def admin_extend_cancel(callback: CallbackQuery, is_admin: bool, language: str):
+@router.callback_query(AdminExtendCallback.filter(F.action == "cancel"))
+async def admin_extend_cancel(callback: CallbackQuery, is_admin: bool, language: str, redis_helper: RedisHelper):
     if not is_admin:
         return
-    await callback.message.edit_text("Canceled" if language == "en" else "Отменено")
+    await edit_text_if_changed(callback.message, redis_helper, "Canceled" if language == "en" else "Отменено")
     await callback.answer()
 
 
@@ -134,7 +137,7 @@ async def admin_create_subscription_cmd(message: Message, is_admin: bool, langua
         await api_client.create_subscription(tg_id=tg_id, service_id=service_id, plan=plan)
         await message.answer("Done" if language == "en" else "Готово")
     except Exception as e:
-        logger.error(f"admin create sub error: {e}")
+        logger.error("admin create sub error: %s", e)
         await message.answer(translations.get("error.service_unavailable", language))
 
 
@@ -153,7 +156,7 @@ async def admin_user_search(message: Message, is_admin: bool, language: str, sta
             lines.append(line)
         await message.answer("\n".join(lines))
     except Exception as e:
-        logger.error(f"admin user search error: {e}")
+        logger.error("admin user search error: %s", e)
         await message.answer(translations.get("error.service_unavailable", language))
 
 
@@ -2,24 +2,27 @@
 Роутер истории платежей: пагинация списка и деталь платежа
 """
 import logging
-from aiogram import Router, F
+from aiogram import F
 from aiogram.filters import StateFilter
 from aiogram.fsm.context import FSMContext
 from aiogram.types import CallbackQuery
 
+from src.bot.dispatch import IndexedRouter
 from src.states.user import UserSG
 from src.i18n.translations import translations
 from src.keyboards.inline import get_payments_history_keyboard
 from src.keyboards.factories import PaymentHistoryCallback, PaymentDetailCallback
 from src.clients.backend_api import api_client
+from src.storage.redis_helper import RedisHelper
 from src.utils.formatters import format_payment_description
+from src.utils.render import edit_text_if_changed
 
 logger = logging.getLogger(__name__)
-router = Router()
+router = IndexedRouter()
 
 
 @router.callback_query(StateFilter(UserSG.STATE_PAYMENTS_HISTORY), PaymentHistoryCallback.filter())
-async def payments_history_pagination(callback: CallbackQuery, state: FSMContext, language: str, callback_data: PaymentHistoryCallback):
+async def payments_history_pagination(callback: CallbackQuery, state: FSMContext, language: str, redis_helper: RedisHelper, callback_data: PaymentHistoryCallback):
     """Пагинация списка истории платежей"""
     try:
         page = max(1, callback_data.page or 1)
@@ -31,16 +34,16 @@ async def payments_history_pagination(callback: CallbackQuery, state: FSMContext
             return
         text = translations.get("payments.history.title", language, n=len(items))
         keyboard = get_payments_history_keyboard(items, page, pages, language)
-        await callback.message.edit_text(text, reply_markup=keyboard)
+        await edit_text_if_changed(callback.message, redis_helper, text, reply_markup=keyboard)
         await callback.answer()
     except Exception as e:
-        logger.error(f"Error in payments history pagination: {e}")
+        logger.error("Error in payments history pagination: %s", e)
         await callback.answer(translations.get("error.service_unavailable", language), show_alert=True)
 
 
 @router.callback_query(StateFilter(UserSG.STATE_PAYMENTS_HISTORY), PaymentDetailCallback.filter())
 @router.callback_query(StateFilter(UserSG.STATE_IDLE), PaymentDetailCallback.filter())
-async def payment_detail(callback: CallbackQuery, state: FSMContext, language: str, callback_data: PaymentDetailCallback):
+async def payment_detail(callback: CallbackQuery, state: FSMContext, language: str, redis_helper: RedisHelper, callback_data: PaymentDetailCallback):
     """Показать деталь платежа"""
     try:
         payment_id = callback_data.payment_id
@@ -56,9 +59,9 @@ async def payment_detail(callback: CallbackQuery, state: FSMContext, language: s
             external_id=payment.get("external_id"),
             language=language,
         )
-        await callback.message.edit_text(text)
+        await edit_text_if_changed(callback.message, redis_helper, text)
         await state.set_state(UserSG.STATE_PAYMENT_DETAIL)
         await callback.answer()
     except Exception as e:
-        logger.error(f"Error in payment detail: {e}")
+        logger.error("Error in payment detail: %s", e)
         await callback.answer(translations.get("error.service_unavailable", language), show_alert=True)
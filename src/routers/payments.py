@@ -2,33 +2,38 @@
 Роутер платежей: создание счёта, ожидание, проверка статуса, отмена, оферта (PDF)
 """
 import logging
-import uuid
 from typing import Optional
-from aiogram import Router, F
+from aiogram import F
 from aiogram.filters import StateFilter
 from aiogram.fsm.context import FSMContext
 from aiogram.types import CallbackQuery
 from aiogram.types.input_file import FSInputFile
 
+from src.bot.dispatch import IndexedRouter
 from src.states.user import UserSG
 from src.i18n.translations import translations
 from src.keyboards.inline import (
     get_payment_waiting_keyboard,
     get_payment_failed_keyboard,
     get_subscription_detail_keyboard,
+    get_payment_method_select_keyboard,
 )
 from src.keyboards.factories import PaymentCallback, RenewCallback, SubscriptionCallback
 from src.clients.backend_api import api_client
+from src.services.countdown import payment_countdown
 from src.storage.redis_helper import RedisHelper
 from src.utils.formatters import calculate_minutes_until_expiry, format_date
+from src.utils.idempotency import payment_idempotency_key, payment_intent
+from src.utils.render import edit_text_if_changed
 from src.bot.config import config
 
 logger = logging.getLogger(__name__)
-router = Router()
+router = IndexedRouter()
 
 
 async def _show_payment_waiting(
     callback: CallbackQuery,
+    redis_helper: RedisHelper,
     language: str,
     payment_id: str,
     expires_at: str,
@@ -38,7 +43,17 @@ async def _show_payment_waiting(
     minutes = calculate_minutes_until_expiry(expires_at)
     text = translations.get("payment.waiting.title", language, minutes=minutes)
     keyboard = get_payment_waiting_keyboard(payment_id, pay_link=pay_link, qr_url=qr_url, language=language)
-    await callback.message.edit_text(text, reply_markup=keyboard)
+    await edit_text_if_changed(callback.message, redis_helper, text, reply_markup=keyboard)
+    # Дальше таймер обновляет планировщик, без повторных нажатий «Проверить статус»
+    payment_countdown.track(
+        payment_id,
+        callback.message.chat.id,
+        callback.message.message_id,
+        expires_at,
+        language=language,
+        pay_link=pay_link,
+        qr_url=qr_url,
+    )
 
 
 @router.callback_query(StateFilter(UserSG.STATE_PAYMENT_METHOD_SELECT), PaymentCallback.filter(F.action == "select"))
@@ -53,10 +68,10 @@ async def handle_payment_select(
     """Пользователь выбрал провайдера и план -> создаём платёж"""
     try:
         # Два режима:
-        # 1) select: payment_id содержит "<subscription_id>:<provider>:<plan>"
-        # 2) change_method: payment_id содержит "<subscription_id>"
+        # 1) select: выбраны subscription_id, provider и plan
+        # 2) change_method: известен только subscription_id
+        subscription_id = callback_data.subscription_id
         if callback_data.action == "change_method":
-            subscription_id = int(callback_data.payment_id)
             subscription = await api_client.get_subscription(subscription_id)
             service_id = subscription.get("service_id")
             options = await api_client.get_service_payment_options(service_id)
@@ -64,33 +79,44 @@ async def handle_payment_select(
             plans = options.get("plans", [])
             text = translations.get("payment.method_select.title", language)
             keyboard = get_payment_method_select_keyboard(providers, plans, subscription_id, language)
-            await callback.message.edit_text(text, reply_markup=keyboard)
+            await edit_text_if_changed(callback.message, redis_helper, text, reply_markup=keyboard)
             await state.set_state(UserSG.STATE_PAYMENT_METHOD_SELECT)
             await callback.answer()
             return
 
-        parts = (callback_data.payment_id or "").split(":")
-        if len(parts) != 3:
+        provider = callback_data.provider
+        plan = callback_data.plan
+        if not subscription_id or not provider or not plan:
             await callback.answer(translations.get("error.service_unavailable", language), show_alert=True)
             return
-        subscription_id = int(parts[0])
-        provider = parts[1]
-        plan = parts[2]
 
-        # Получаем сервис по подписке
-        subscription = await api_client.get_subscription(subscription_id)
-        service_id = subscription.get("service_id")
         tg_id = callback.from_user.id
 
-        # Создаём платёж через API (с идемпотентным ключом)
-        idempotency_key = str(uuid.uuid4())
-        payment = await api_client.create_payment(
-            tg_id=tg_id,
-            service_id=service_id,
-            plan=plan,
-            provider=provider,
-            idempotency_key=idempotency_key,
-        )
+        # Окно начинается с первого нажатия: повторное нажатие/передоставка callback отдаёт тот же счёт
+        window = config.payment_idempotency_window
+        intent = payment_intent(tg_id, subscription_id, provider, plan)
+        idempotency_key = await redis_helper.claim_payment_idempotency_key(intent, payment_idempotency_key(intent), window)
+        payment = await redis_helper.get_payment_result(idempotency_key)
+        if payment and not calculate_minutes_until_expiry(payment["expires_at"]):
+            # Счёт из окна уже истёк — окно закрываем, новый счёт создаём под новым ключом
+            await redis_helper.drop_payment_idempotency_key(intent)
+            idempotency_key = await redis_helper.claim_payment_idempotency_key(intent, payment_idempotency_key(intent), window)
+            payment = None
+        if not payment:
+            # Получаем сервис по подписке
+            subscription = await api_client.get_subscription(subscription_id)
+            service_id = subscription.get("service_id")
+
+            # Создаём платёж через API (с идемпотентным ключом)
+            payment = await api_client.create_payment(
+                tg_id=tg_id,
+                service_id=service_id,
+                plan=plan,
+                provider=provider,
+                idempotency_key=idempotency_key,
+            )
+            if payment.get("payment_id") and payment.get("expires_at"):
+                await redis_helper.set_payment_result(idempotency_key, payment, window)
 
         payment_id = payment.get("payment_id")
         pay_link = payment.get("pay_link") or payment.get("link")
@@ -102,11 +128,22 @@ async def handle_payment_select(
             return
 
         # Сохраняем контекст оплаты
-        await redis_helper.set_payment_context(payment_id, tg_id, subscription_id, callback.message.message_id)
+        await redis_helper.set_payment_context(
+            payment_id,
+            tg_id,
+            subscription_id,
+            callback.message.message_id,
+            expires_at=expires_at,
+            language=language,
+            pay_link=pay_link,
+            qr_url=qr_url,
+            intent=intent,
+        )
 
         # Показываем экран ожидания оплаты
         await _show_payment_waiting(
             callback,
+            redis_helper,
             language=language,
             payment_id=payment_id,
             expires_at=expires_at,
@@ -116,7 +153,7 @@ async def handle_payment_select(
         await state.set_state(UserSG.STATE_PAYMENT_PENDING)
         await callback.answer()
     except Exception as e:
-        logger.error(f"Error creating payment: {e}")
+        logger.error("Error creating payment: %s", e)
         await callback.answer(translations.get("error.service_unavailable", language), show_alert=True)
 
 
@@ -145,6 +182,7 @@ async def handle_payment_actions(
                 if expires_at:
                     await _show_payment_waiting(
                         callback,
+                        redis_helper,
                         language=language,
                         payment_id=payment_id,
                         expires_at=expires_at,
@@ -153,7 +191,10 @@ async def handle_payment_actions(
                     )
                 await callback.answer()
                 return
-            elif status == "paid":
+            payment_countdown.untrack(payment_id)
+            # Платёж завершён: «Повторить»/«Продлить» должны создать новый счёт
+            await redis_helper.end_payment_intent(payment_id)
+            if status == "paid":
                 # Оплачено — показываем успех и возвращаемся в карточку подписки
                 context = await redis_helper.get_payment_context(payment_id)
                 subscription_id = context.get("subscription_id") if context else None
@@ -166,7 +207,7 @@ async def handle_payment_actions(
                 until_text = format_date(until, language) if until else "—"
                 success_text = translations.get("payment.success.title", language, until_date=until_text)
                 keyboard = get_subscription_detail_keyboard(subscription_id, language)
-                await callback.message.edit_text(success_text, reply_markup=keyboard)
+                await edit_text_if_changed(callback.message, redis_helper, success_text, reply_markup=keyboard)
                 await state.set_state(UserSG.STATE_SUBSCRIPTION_DETAIL)
                 await callback.answer()
                 return
@@ -179,7 +220,7 @@ async def handle_payment_actions(
                     return
                 failed_text = translations.get("payment.failed.title", language)
                 keyboard = get_payment_failed_keyboard(payment_id, subscription_id, language)
-                await callback.message.edit_text(failed_text, reply_markup=keyboard)
+                await edit_text_if_changed(callback.message, redis_helper, failed_text, reply_markup=keyboard)
                 await callback.answer()
                 return
 
@@ -187,7 +228,9 @@ async def handle_payment_actions(
             # Отмена: чистим контекст и возвращаемся в карточку подписки
             context = await redis_helper.get_payment_context(payment_id)
             subscription_id = context.get("subscription_id") if context else None
+            await redis_helper.end_payment_intent(payment_id)
             await redis_helper.clear_payment_context(payment_id)
+            payment_countdown.untrack(payment_id)
             if subscription_id:
                 # Показать карточку подписки
                 try:
@@ -202,17 +245,15 @@ async def handle_payment_actions(
                 except Exception:
                     text = translations.get("menu.main.title", language)
                 keyboard = get_subscription_detail_keyboard(subscription_id, language)
-                await callback.message.edit_text(text, reply_markup=keyboard)
+                await edit_text_if_changed(callback.message, redis_helper, text, reply_markup=keyboard)
                 await state.set_state(UserSG.STATE_SUBSCRIPTION_DETAIL)
             await callback.answer()
             return
 
         elif action == "terms":
             # Отправка оферты (PDF) для сервиса выбранной подписки
-            # payment_id здесь несёт subscription_id в нашем UX
-            try:
-                subscription_id = int(payment_id)
-            except Exception:
+            subscription_id = callback_data.subscription_id
+            if not subscription_id:
                 await callback.answer()
                 return
             subscription = await api_client.get_subscription(subscription_id)
@@ -231,5 +272,5 @@ async def handle_payment_actions(
             return
 
     except Exception as e:
-        logger.error(f"Error in payment actions: {e}")
+        logger.error("Error in payment actions: %s", e)
         await callback.answer(translations.get("error.service_unavailable", language), show_alert=True)
@@ -2,11 +2,12 @@
 Роутер подписок: список, деталь, продление (вход)
 """
 import logging
-from aiogram import Router, F
+from aiogram import F
 from aiogram.fsm.context import FSMContext
 from aiogram.filters import StateFilter
 from aiogram.types import Message, CallbackQuery
 
+from src.bot.dispatch import IndexedRouter
 from src.states.user import UserSG
 from src.i18n.translations import translations
 from src.keyboards.inline import (
@@ -16,14 +17,16 @@ from src.keyboards.inline import (
 )
 from src.keyboards.factories import SubscriptionCallback, RenewCallback, PaymentCallback
 from src.clients.backend_api import api_client
+from src.storage.redis_helper import RedisHelper
 from src.utils.formatters import format_date
+from src.utils.render import edit_text_if_changed
 
 logger = logging.getLogger(__name__)
-router = Router()
+router = IndexedRouter()
 
 
 @router.callback_query(StateFilter(UserSG.STATE_SUBSCRIPTIONS_LIST), SubscriptionCallback.filter(F.action == "list"))
-async def subscriptions_pagination(callback: CallbackQuery, state: FSMContext, language: str, callback_data: SubscriptionCallback):
+async def subscriptions_pagination(callback: CallbackQuery, state: FSMContext, language: str, redis_helper: RedisHelper, callback_data: SubscriptionCallback):
     """Пагинация списка подписок"""
     try:
         page = max(1, callback_data.page or 1)
@@ -39,16 +42,16 @@ async def subscriptions_pagination(callback: CallbackQuery, state: FSMContext, l
         text = translations.get("subscriptions.list.title", language)
         keyboard = get_subscriptions_list_keyboard(items, page, pages, language)
         
-        await callback.message.edit_text(text, reply_markup=keyboard)
+        await edit_text_if_changed(callback.message, redis_helper, text, reply_markup=keyboard)
         await callback.answer()
     except Exception as e:
-        logger.error(f"Error in subscriptions pagination: {e}")
+        logger.error("Error in subscriptions pagination: %s", e)
         await callback.answer(translations.get("error.service_unavailable", language), show_alert=True)
 
 
 @router.callback_query(StateFilter(UserSG.STATE_SUBSCRIPTIONS_LIST), SubscriptionCallback.filter(F.action == "detail"))
 @router.callback_query(StateFilter(UserSG.STATE_IDLE), SubscriptionCallback.filter(F.action == "detail"))
-async def open_subscription_detail(callback: CallbackQuery, state: FSMContext, language: str, callback_data: SubscriptionCallback):
+async def open_subscription_detail(callback: CallbackQuery, state: FSMContext, language: str, redis_helper: RedisHelper, callback_data: SubscriptionCallback):
     """Открыть деталь подписки"""
     try:
         sub = await api_client.get_subscription(callback_data.subscription_id)
@@ -64,16 +67,16 @@ async def open_subscription_detail(callback: CallbackQuery, state: FSMContext, l
         
         keyboard = get_subscription_detail_keyboard(callback_data.subscription_id, language)
         
-        await callback.message.edit_text(text, reply_markup=keyboard)
+        await edit_text_if_changed(callback.message, redis_helper, text, reply_markup=keyboard)
         await state.set_state(UserSG.STATE_SUBSCRIPTION_DETAIL)
         await callback.answer()
     except Exception as e:
-        logger.error(f"Error open subscription detail: {e}")
+        logger.error("Error open subscription detail: %s", e)
         await callback.answer(translations.get("error.service_unavailable", language), show_alert=True)
 
 
 @router.callback_query(StateFilter(UserSG.STATE_SUBSCRIPTION_DETAIL), RenewCallback.filter())
-async def start_renew_flow(callback: CallbackQuery, state: FSMContext, language: str, callback_data: RenewCallback):
+async def start_renew_flow(callback: CallbackQuery, state: FSMContext, language: str, redis_helper: RedisHelper, callback_data: RenewCallback):
     """Начать продление: загрузить способы оплаты и планы"""
     try:
         subscription_id = callback_data.subscription_id
@@ -86,9 +89,9 @@ async def start_renew_flow(callback: CallbackQuery, state: FSMContext, language:
         text = translations.get("payment.method_select.title", language)
         keyboard = get_payment_method_select_keyboard(providers, plans, subscription_id, language)
         
-        await callback.message.edit_text(text, reply_markup=keyboard)
+        await edit_text_if_changed(callback.message, redis_helper, text, reply_markup=keyboard)
         await state.set_state(UserSG.STATE_PAYMENT_METHOD_SELECT)
         await callback.answer()
     except Exception as e:
-        logger.error(f"Error start renew flow: {e}")
+        logger.error("Error start renew flow: %s", e)
         await callback.answer(translations.get("error.service_unavailable", language), show_alert=True)
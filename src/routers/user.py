@@ -2,21 +2,24 @@
 Основной роутер пользователя
 """
 import logging
-from aiogram import Router, F
+from aiogram.dispatcher.event.handler import CallableObject
 from aiogram.filters import Command, StateFilter
 from aiogram.fsm.context import FSMContext
 from aiogram.types import Message, CallbackQuery
 
+from src.bot.dispatch import IndexedRouter
 from src.states.user import UserSG
 from src.keyboards.reply import get_main_keyboard, get_admin_main_reply_keyboard
 from src.keyboards.inline import get_language_select_keyboard
+from src.keyboards.menu import MenuButton
 from src.clients.backend_api import api_client
 from src.storage.redis_helper import RedisHelper
 from src.i18n.translations import translations
 from src.utils.formatters import format_date
+from src.utils.render import edit_text_if_changed
 
 logger = logging.getLogger(__name__)
-router = Router()
+router = IndexedRouter()
 
 
 @router.message(Command("start"))
@@ -54,7 +57,7 @@ async def cmd_start(message: Message, state: FSMContext, language: str, is_admin
         await api_client.send_event("user_start", message.from_user.id)
         
     except Exception as e:
-        logger.error(f"Error in start command: {e}")
+        logger.error("Error in start command: %s", e)
         error_message = translations.get("error.service_unavailable", language)
         await message.answer(error_message)
 
@@ -79,13 +82,11 @@ async def cmd_menu(message: Message, state: FSMContext, language: str, is_admin:
         await state.set_state(UserSG.STATE_IDLE)
         
     except Exception as e:
-        logger.error(f"Error in menu command: {e}")
+        logger.error("Error in menu command: %s", e)
         error_message = translations.get("error.service_unavailable", language)
         await message.answer(error_message)
 
 
-@router.message(StateFilter(UserSG.STATE_IDLE), F.text == "Подписки")
-@router.message(StateFilter(UserSG.STATE_IDLE), F.text == "Subscriptions")
 async def handle_subscriptions(message: Message, state: FSMContext, language: str):
     """Обработка кнопки 'Подписки'"""
     try:
@@ -118,13 +119,11 @@ async def handle_subscriptions(message: Message, state: FSMContext, language: st
         await state.set_state(UserSG.STATE_SUBSCRIPTIONS_LIST)
         
     except Exception as e:
-        logger.error(f"Error getting subscriptions: {e}")
+        logger.error("Error getting subscriptions: %s", e)
         error_message = translations.get("error.service_unavailable", language)
         await message.answer(error_message)
 
 
-@router.message(StateFilter(UserSG.STATE_IDLE), F.text == "История платежей")
-@router.message(StateFilter(UserSG.STATE_IDLE), F.text == "Payment history")
 async def handle_payment_history(message: Message, state: FSMContext, language: str):
     """Обработка кнопки 'История платежей'"""
     try:
@@ -157,13 +156,12 @@ async def handle_payment_history(message: Message, state: FSMContext, language:
         await state.set_state(UserSG.STATE_PAYMENTS_HISTORY)
         
     except Exception as e:
-        logger.error(f"Error getting payment history: {e}")
+        logger.error("Error getting payment history: %s", e)
         error_message = translations.get("error.service_unavailable", language)
         await message.answer(error_message)
 
 
 @router.message(Command("lang"))
-@router.message(StateFilter(UserSG.STATE_IDLE), F.text.in_({"Смена языка", "Language"}))
 async def handle_language_toggle(message: Message, state: FSMContext, language: str, redis_helper: RedisHelper, is_admin: bool):
     """Мгновенное переключение RU/EN"""
     try:
@@ -178,12 +176,10 @@ async def handle_language_toggle(message: Message, state: FSMContext, language:
         ))
         await state.set_state(UserSG.STATE_IDLE)
     except Exception as e:
-        logger.error(f"Error toggling language: {e}")
+        logger.error("Error toggling language: %s", e)
         await message.answer(translations.get("error.service_unavailable", language))
 
 
-@router.message(StateFilter(UserSG.STATE_IDLE), F.text == "Техподдержка")
-@router.message(StateFilter(UserSG.STATE_IDLE), F.text == "Support")
 async def handle_support(message: Message, language: str):
     """Обработка кнопки 'Техподдержка'"""
     try:
@@ -193,12 +189,11 @@ async def handle_support(message: Message, language: str):
         await message.answer(support_text)
         
     except Exception as e:
-        logger.error(f"Error in support: {e}")
+        logger.error("Error in support: %s", e)
         error_message = translations.get("error.service_unavailable", language)
         await message.answer(error_message)
 
 
-@router.message(StateFilter(UserSG.STATE_IDLE), F.text == "FAQ")
 async def handle_faq(message: Message, state: FSMContext, language: str):
     """Обработка кнопки 'FAQ'"""
     try:
@@ -218,13 +213,11 @@ async def handle_faq(message: Message, state: FSMContext, language: str):
         await state.set_state(UserSG.STATE_FAQ)
         
     except Exception as e:
-        logger.error(f"Error in FAQ: {e}")
+        logger.error("Error in FAQ: %s", e)
         error_message = translations.get("error.service_unavailable", language)
         await message.answer(error_message)
 
 
-@router.message(StateFilter(UserSG.STATE_IDLE), F.text == "Админ-панель")
-@router.message(StateFilter(UserSG.STATE_IDLE), F.text == "Admin Panel")
 async def handle_admin_panel(message: Message, state: FSMContext, language: str, is_admin: bool):
     """Обработка кнопки 'Админ-панель'"""
     if not is_admin:
@@ -239,11 +232,30 @@ async def handle_admin_panel(message: Message, state: FSMContext, language: str,
         # TODO: Установить админское состояние
         
     except Exception as e:
-        logger.error(f"Error in admin panel: {e}")
+        logger.error("Error in admin panel: %s", e)
         error_message = translations.get("error.service_unavailable", language)
         await message.answer(error_message)
 
 
+# Обработчики кнопок главного меню по ключу действия (см. src/keyboards/menu.py)
+MENU_HANDLERS = {
+    "menu.main.subscriptions": CallableObject(handle_subscriptions),
+    "menu.main.payment_history": CallableObject(handle_payment_history),
+    "menu.main.language": CallableObject(handle_language_toggle),
+    "menu.main.support": CallableObject(handle_support),
+    "menu.main.faq": CallableObject(handle_faq),
+    "menu.main.admin_panel": CallableObject(handle_admin_panel),
+}
+
+
+@router.message(StateFilter(UserSG.STATE_IDLE), MenuButton())
+async def handle_menu_button(message: Message, menu_action: str, **kwargs):
+    """Единая точка входа для reply-кнопок на любом языке"""
+    handler = MENU_HANDLERS.get(menu_action)
+    if handler is not None:
+        await handler.call(message, **kwargs)
+
+
 # Обработка callback для смены языка с MagicFilter
 from src.keyboards.factories import LanguageCallback
 
@@ -263,7 +275,7 @@ async def handle_language_callback(callback: CallbackQuery, state: FSMContext, l
         # Отправляем подтверждение
         confirmation_text = translations.get(f"language.switched.{new_language}", new_language)
         
-        await callback.message.edit_text(confirmation_text)
+        await edit_text_if_changed(callback.message, redis_helper, confirmation_text)
         
         # Возвращаемся в главное меню
         await state.set_state(UserSG.STATE_IDLE)
@@ -276,7 +288,7 @@ async def handle_language_callback(callback: CallbackQuery, state: FSMContext, l
         )
         
     except Exception as e:
-        logger.error(f"Error changing language: {e}")
+        logger.error("Error changing language: %s", e)
         error_message = translations.get("error.service_unavailable", language)
         await callback.answer(error_message, show_alert=True)
     
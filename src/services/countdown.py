@@ -0,0 +1,241 @@
+"""
+Обратный отсчёт на экранах ожидания оплаты: колесо таймеров с шагом в минуту
+"""
+import asyncio
+import contextlib
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+from aiogram import Bot
+
+from src.bot.config import config
+from src.i18n.translations import translations
+from src.keyboards.inline import get_payment_failed_keyboard, get_payment_waiting_keyboard
+from src.services.date_formatter import date_formatter
+from src.services.edit_coalescer import EditCoalescer
+from src.storage.redis_helper import RedisHelper
+
+logger = logging.getLogger(__name__)
+
+
+class TimingWheel:
+    """Колесо таймеров: ключ -> абсолютная минута срабатывания.
+
+    Вставка и отмена O(1); тик просматривает только слот своей минуты,
+    записи следующих оборотов остаются в слоте до своей минуты.
+    """
+
+    def __init__(self, slots: int = 64):
+        self._slots: List[Dict[str, int]] = [{} for _ in range(slots)]
+        self._where: Dict[str, int] = {}
+        self._cursor: Optional[int] = None
+
+    def __len__(self) -> int:
+        return len(self._where)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._where
+
+    def schedule(self, key: str, minute: int) -> None:
+        self.cancel(key)
+        if self._cursor is not None and minute <= self._cursor:
+            # Уже пройденная минута — срабатывает на ближайшем тике
+            minute = self._cursor + 1
+        self._slots[minute % len(self._slots)][key] = minute
+        self._where[key] = minute
+
+    def cancel(self, key: str) -> None:
+        minute = self._where.pop(key, None)
+        if minute is not None:
+            self._slots[minute % len(self._slots)].pop(key, None)
+
+    def advance(self, minute: int) -> List[str]:
+        """Продвинуть колесо до minute включительно и вернуть сработавшие ключи"""
+        # Первый тик или долгий простой: достаточно одного полного оборота
+        start = minute - len(self._slots) + 1
+        if self._cursor is not None:
+            start = max(start, self._cursor + 1)
+        due = []
+        for current in range(start, minute + 1):
+            slot = self._slots[current % len(self._slots)]
+            fired = [key for key, at in slot.items() if at <= minute]
+            for key in fired:
+                del slot[key]
+                del self._where[key]
+            due.extend(fired)
+        if self._cursor is None or minute > self._cursor:
+            self._cursor = minute
+        return due
+
+
+@dataclass
+class CountdownEntry:
+    payment_id: str
+    chat_id: int
+    message_id: int
+    expires_at: datetime
+    language: str = "ru"
+    pay_link: Optional[str] = None
+    qr_url: Optional[str] = None
+
+
+def _minute(ts: float) -> int:
+    return int(ts // 60)
+
+
+class PaymentCountdown:
+    """Планировщик обновления таймера «оплатите в течение N минут» для всех ожидающих платежей"""
+
+    def __init__(self, edit_rate: float = 20.0, refresh_minutes: int = 1, slots: int = 64):
+        self.edit_rate = edit_rate
+        self.refresh_minutes = max(1, refresh_minutes)
+        self.bot: Optional[Bot] = None
+        self.redis_helper: Optional[RedisHelper] = None
+        self.coalescer: Optional[EditCoalescer] = None
+        self._entries: Dict[str, CountdownEntry] = {}
+        self._wheel = TimingWheel(slots)
+        self._task: Optional[asyncio.Task] = None
+
+    def bind(self, bot: Bot, redis_helper: RedisHelper) -> None:
+        """Подключить бота и Redis (правки идут через EditCoalescer с общим render-хешем)"""
+        self.bot = bot
+        self.redis_helper = redis_helper
+        self.coalescer = EditCoalescer(bot, render_store=redis_helper)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def track(
+        self,
+        payment_id: str,
+        chat_id: int,
+        message_id: int,
+        expires_at: str,
+        language: str = "ru",
+        pay_link: Optional[str] = None,
+        qr_url: Optional[str] = None,
+        now: Optional[float] = None,
+    ) -> bool:
+        """Начать отсчёт для сообщения ожидания; False — срок не распознан"""
+        expires = date_formatter.parse(expires_at) if isinstance(expires_at, str) else None
+        if expires is None or not message_id:
+            return False
+        entry = CountdownEntry(payment_id, chat_id, message_id, expires, language, pay_link, qr_url)
+        self._entries[payment_id] = entry
+        self._schedule(entry, time.time() if now is None else now)
+        return True
+
+    def untrack(self, payment_id: str) -> None:
+        """Остановить отсчёт (оплачен, отменён, сообщение недоступно)"""
+        self._entries.pop(payment_id, None)
+        self._wheel.cancel(payment_id)
+
+    async def start(self) -> None:
+        """Восстановить ожидающие платежи из Redis и запустить тики"""
+        if self.redis_helper is not None:
+            restored = 0
+            async for payment_id, context in self.redis_helper.iter_payment_contexts():
+                if context.get("expires_at") and self.track(
+                    payment_id,
+                    int(context["tg_id"]),
+                    context.get("message_id"),
+                    context["expires_at"],
+                    language=context.get("language") or "ru",
+                    pay_link=context.get("pay_link"),
+                    qr_url=context.get("qr_url"),
+                ):
+                    restored += 1
+            logger.info("Payment countdown restored %d pending payments", restored)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        if self.coalescer is not None:
+            await self.coalescer.aclose()
+
+    async def tick(self, now: Optional[float] = None) -> int:
+        """Обновить все сработавшие на этой минуте сообщения; вернуть число правок"""
+        now = time.time() if now is None else now
+        due = self._wheel.advance(_minute(now))
+        edits = 0
+        for payment_id in due:
+            entry = self._entries.get(payment_id)
+            if entry is None:
+                continue
+            if edits and self.edit_rate > 0:
+                # Ограничение частоты правок, чтобы не упереться в лимиты Telegram
+                await asyncio.sleep(1 / self.edit_rate)
+            if entry.expires_at.timestamp() <= now:
+                self.untrack(payment_id)
+                await self._show_expired(entry)
+            else:
+                self._schedule(entry, now)
+                await self._show_countdown(entry, now)
+            edits += 1
+        return edits
+
+    async def _run(self) -> None:
+        while True:
+            # Тики выровнены по границе минуты
+            await asyncio.sleep(60 - time.time() % 60 + 0.05)
+            try:
+                await self.tick()
+            except Exception as e:
+                logger.error("Payment countdown tick failed: %s", e)
+
+    def _schedule(self, entry: CountdownEntry, now: float) -> None:
+        expiry_minute = -(-int(entry.expires_at.timestamp()) // 60)
+        next_refresh = _minute(now) + self.refresh_minutes
+        self._wheel.schedule(entry.payment_id, min(next_refresh, expiry_minute))
+
+    async def _show_countdown(self, entry: CountdownEntry, now: float) -> None:
+        minutes = date_formatter.minutes_until(
+            entry.expires_at, now=datetime.fromtimestamp(now, timezone.utc)
+        )
+        text = translations.get("payment.waiting.title", entry.language, minutes=minutes)
+        keyboard = get_payment_waiting_keyboard(
+            entry.payment_id, pay_link=entry.pay_link, qr_url=entry.qr_url, language=entry.language
+        )
+        await self._edit(entry, text, keyboard)
+
+    async def _show_expired(self, entry: CountdownEntry) -> None:
+        context = await self.redis_helper.get_payment_context(entry.payment_id) if self.redis_helper else None
+        subscription_id = context.get("subscription_id") if context else None
+        text = translations.get("payment.expired.title", entry.language)
+        keyboard = (
+            get_payment_failed_keyboard(entry.payment_id, subscription_id, entry.language)
+            if subscription_id else None
+        )
+        await self._edit(entry, text, keyboard)
+
+    async def _edit(self, entry: CountdownEntry, text: str, keyboard) -> None:
+        if self.coalescer is None:
+            return
+
+        async def on_error(error: Exception) -> None:
+            # Сообщение удалено/недоступно — отсчёт для него больше не нужен
+            logger.info("Countdown edit for %s failed, untracking: %s", entry.payment_id, error)
+            self.untrack(entry.payment_id)
+
+        await self.coalescer.edit(
+            entry.chat_id,
+            entry.message_id,
+            text,
+            reply_markup=keyboard,
+            on_error=on_error,
+            immediate=True,
+        )
+
+
+# Глобальный планировщик обратного отсчёта
+payment_countdown = PaymentCountdown(
+    edit_rate=config.countdown_edit_rate,
+    refresh_minutes=config.countdown_refresh_minutes,
+)
@@ -0,0 +1,103 @@
+"""
+Форматирование дат в часовом поясе бота с кешированием разбора и шаблонов
+"""
+import logging
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Union
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from src.bot.config import config
+
+logger = logging.getLogger(__name__)
+
+DateValue = Union[str, datetime, None]
+
+# Шаблоны вывода по языку; неизвестный язык — ISO-подобный формат
+DATE_PATTERNS: Dict[str, str] = {
+    "ru": "%d.%m.%Y %H:%M",
+    "en": "%Y-%m-%d %H:%M",
+}
+DEFAULT_PATTERN = "%Y-%m-%d %H:%M"
+
+
+@lru_cache(maxsize=None)
+def get_zone(name: str) -> ZoneInfo:
+    """ZoneInfo по имени (объекты неизменяемые, создаём один раз)"""
+    return ZoneInfo(name)
+
+
+def _parse_iso(value: str) -> Optional[datetime]:
+    try:
+        dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except (ValueError, TypeError, AttributeError):
+        return None
+    # Backend отдаёт UTC; строки без смещения тоже считаем UTC
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt
+
+
+class DateFormatter:
+    """Разбор ISO8601 и вывод дат в часовом поясе бота"""
+
+    def __init__(self, tz_name: str = "UTC", cache_size: int = 4096):
+        try:
+            self.tz = get_zone(tz_name)
+        except (ZoneInfoNotFoundError, ValueError):
+            logger.error("Unknown timezone %r, falling back to UTC", tz_name)
+            self.tz = get_zone("UTC")
+        # Одни и те же даты (until_date, created_at) повторяются во всех списках
+        self.parse = lru_cache(maxsize=cache_size)(_parse_iso)
+        self._format = lru_cache(maxsize=cache_size)(self._format_uncached)
+
+    def format(self, value: DateValue, language: str = "ru") -> DateValue:
+        """Дата для пользователя; нераспознанное значение возвращается как есть"""
+        if isinstance(value, datetime):
+            return self._render(value, language)
+        if not isinstance(value, str):
+            return value
+        return self._format(value, language)
+
+    def format_many(self, values: Iterable[DateValue], language: str = "ru") -> List[DateValue]:
+        """Отформатировать список дат за один проход"""
+        format_cached = self._format
+        render = self._render
+        result = []
+        for value in values:
+            if isinstance(value, str):
+                result.append(format_cached(value, language))
+            elif isinstance(value, datetime):
+                result.append(render(value, language))
+            else:
+                result.append(value)
+        return result
+
+    def minutes_until(self, value: DateValue, now: Optional[datetime] = None) -> int:
+        """Полных минут до момента value (0, если прошёл или не распознан)"""
+        dt = value if isinstance(value, datetime) else self.parse(value) if isinstance(value, str) else None
+        if dt is None:
+            return 0
+        if dt.tzinfo is None:
+            dt = dt.replace(tzinfo=timezone.utc)
+        now = now or datetime.now(timezone.utc)
+        return max(0, int((dt - now).total_seconds() // 60))
+
+    def cache_clear(self) -> None:
+        self.parse.cache_clear()
+        self._format.cache_clear()
+
+    def _format_uncached(self, value: str, language: str) -> str:
+        dt = self.parse(value)
+        if dt is None:
+            return value
+        return self._render(dt, language)
+
+    def _render(self, dt: datetime, language: str) -> str:
+        if dt.tzinfo is None:
+            dt = dt.replace(tzinfo=timezone.utc)
+        return dt.astimezone(self.tz).strftime(DATE_PATTERNS.get(language, DEFAULT_PATTERN))
+
+
+# Глобальный форматтер в часовом поясе из конфигурации
+date_formatter = DateFormatter(config.timezone)
@@ -0,0 +1,133 @@
+"""
+Склейка частых правок одного сообщения (created → pending → paid за секунды)
+"""
+import asyncio
+import contextlib
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+from aiogram import Bot
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.types import InlineKeyboardMarkup
+
+from src.storage.redis_helper import RedisHelper
+from src.utils.render import render_hash
+
+logger = logging.getLogger(__name__)
+
+EditKey = Tuple[int, int]
+ErrorCallback = Callable[[Exception], Awaitable[None]]
+
+
+@dataclass
+class _PendingEdit:
+    text: str
+    reply_markup: Optional[InlineKeyboardMarkup]
+    on_error: Optional[ErrorCallback]
+
+
+class EditCoalescer:
+    """Держит правки сообщения в окне и применяет только последний рендер"""
+
+    def __init__(
+        self,
+        bot: Bot,
+        window: float = 0.7,
+        max_tracked: int = 10000,
+        render_store: Optional[RedisHelper] = None,
+    ):
+        self.bot = bot
+        # Общий с роутерами Redis-хеш; без него — локальная память
+        self.render_store = render_store
+        self.window = window
+        self.max_tracked = max_tracked
+        self._pending: Dict[EditKey, _PendingEdit] = {}
+        self._timers: Dict[EditKey, asyncio.Task] = {}
+        self._last_hashes: "OrderedDict[EditKey, str]" = OrderedDict()
+
+    async def edit(
+        self,
+        chat_id: int,
+        message_id: int,
+        text: str,
+        reply_markup: Optional[InlineKeyboardMarkup] = None,
+        on_error: Optional[ErrorCallback] = None,
+        immediate: bool = False,
+    ) -> None:
+        """Поставить правку в очередь; immediate — применить сразу (финальный статус)"""
+        key = (chat_id, message_id)
+        self._pending[key] = _PendingEdit(text, reply_markup, on_error)
+        if immediate:
+            timer = self._timers.pop(key, None)
+            if timer:
+                timer.cancel()
+            await self._flush(key)
+            return
+        if key not in self._timers:
+            self._timers[key] = asyncio.create_task(self._flush_later(key))
+
+    async def aclose(self) -> None:
+        """Отменить таймеры и применить все отложенные правки"""
+        timers = list(self._timers.values())
+        self._timers.clear()
+        for timer in timers:
+            timer.cancel()
+        for timer in timers:
+            with contextlib.suppress(asyncio.CancelledError):
+                await timer
+        for key in list(self._pending):
+            await self._flush(key)
+
+    async def _flush_later(self, key: EditKey) -> None:
+        await asyncio.sleep(self.window)
+        self._timers.pop(key, None)
+        await self._flush(key)
+
+    async def _flush(self, key: EditKey) -> None:
+        pending = self._pending.pop(key, None)
+        if pending is None:
+            return
+        chat_id, message_id = key
+        digest = render_hash(pending.text, pending.reply_markup)
+        if await self._last_digest(key) == digest:
+            return
+        try:
+            await self.bot.edit_message_text(
+                chat_id=chat_id,
+                message_id=message_id,
+                text=pending.text,
+                reply_markup=pending.reply_markup,
+            )
+        except TelegramBadRequest as e:
+            if "message is not modified" not in str(e):
+                await self._handle_error(pending, e)
+                return
+        except Exception as e:
+            await self._handle_error(pending, e)
+            return
+        await self._remember(key, digest)
+
+    async def _handle_error(self, pending: _PendingEdit, error: Exception) -> None:
+        if pending.on_error is None:
+            logger.warning("edit_message_text failed: %s", error)
+            return
+        try:
+            await pending.on_error(error)
+        except Exception as e:
+            logger.error("edit fallback failed: %s", e)
+
+    async def _last_digest(self, key: EditKey) -> Optional[str]:
+        if self.render_store is not None:
+            return await self.render_store.get_render_hash(*key)
+        return self._last_hashes.get(key)
+
+    async def _remember(self, key: EditKey, digest: str) -> None:
+        if self.render_store is not None:
+            await self.render_store.set_render_hash(*key, digest)
+            return
+        self._last_hashes[key] = digest
+        self._last_hashes.move_to_end(key)
+        while len(self._last_hashes) > self.max_tracked:
+            self._last_hashes.popitem(last=False)
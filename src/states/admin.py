@@ -1,10 +1,10 @@
 """
 Состояния администратора (FSM)
 """
-from aiogram.fsm.state import State, StateGroup
+from aiogram.fsm.state import State, StatesGroup
 
 
-class AdminSG(StateGroup):
+class AdminSG(StatesGroup):
     """Состояния администратора"""
     
     # Основные состояния админа
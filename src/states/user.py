@@ -1,10 +1,10 @@
 """
 Состояния пользователя (FSM)
 """
-from aiogram.fsm.state import State, StateGroup
+from aiogram.fsm.state import State, StatesGroup
 
 
-class UserSG(StateGroup):
+class UserSG(StatesGroup):
     """Состояния пользователя"""
     
     # Основные состояния
@@ -0,0 +1,153 @@
+"""
+FSM-хранилище поверх RedisStorage: кеш на время апдейта и запись только изменений
+"""
+import contextlib
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
+
+from aiogram.fsm.state import State
+from aiogram.fsm.storage.base import BaseStorage, StateType, StorageKey
+from aiogram.fsm.storage.redis import RedisStorage
+
+
+@dataclass
+class _Record:
+    state: Optional[str] = None
+    # Данные храним сериализованными: сравнение без глубокого копирования,
+    # а изменения словаря, отданного хендлеру, не попадают в кеш
+    data_raw: Optional[str] = None
+    # Минимальный оставшийся TTL ключей (-2 — ключей нет, -1 — без TTL)
+    ttl: int = -2
+    state_dirty: bool = False
+    data_dirty: bool = False
+
+
+# Кеш текущего апдейта (StorageKey -> запись); None — вне FSMWriteBackMiddleware
+_scope: ContextVar[Optional[Dict[StorageKey, _Record]]] = ContextVar("fsm_scope", default=None)
+# Запись, прочитанная FSMContextMiddleware до открытия кеша апдейта
+_prefetched: ContextVar[Optional[Tuple[StorageKey, _Record]]] = ContextVar("fsm_prefetched", default=None)
+
+
+def _decode(value) -> Optional[str]:
+    return value.decode("utf-8") if isinstance(value, bytes) else value
+
+
+class CachedRedisStorage(BaseStorage):
+    """Обёртка над RedisStorage.
+
+    Состояние и данные читаются одним пайплайном и до конца апдейта отдаются
+    из кеша; set_state/set_data с прежним значением не пишут в Redis, а
+    изменения уходят одной транзакцией при закрытии scope(). Ключи живут
+    idle_ttl секунд с последнего обращения: TTL продлевается, когда осталось
+    меньше половины, чтобы не писать на каждом апдейте.
+    """
+
+    def __init__(self, storage: RedisStorage, idle_ttl: Optional[int] = None):
+        self.storage = storage
+        self.redis = storage.redis
+        self.key_builder = storage.key_builder
+        self.idle_ttl = idle_ttl
+
+    @contextlib.asynccontextmanager
+    async def scope(self) -> AsyncIterator[None]:
+        """Кеш на время обработки апдейта; изменения записываются на выходе"""
+        records: Dict[StorageKey, _Record] = {}
+        prefetched = _prefetched.get()
+        if prefetched is not None:
+            records[prefetched[0]] = prefetched[1]
+            _prefetched.set(None)
+        token = _scope.set(records)
+        try:
+            yield
+        finally:
+            _scope.reset(token)
+            # Изменения до ошибки в хендлере сохраняются, как и без кеша
+            await self._flush(records)
+
+    async def set_state(self, key: StorageKey, state: StateType = None) -> None:
+        value = state.state if isinstance(state, State) else state
+        if _scope.get() is None:
+            _prefetched.set(None)
+            await self._flush({key: _Record(state=value, state_dirty=True)})
+            return
+        record = await self._record(key)
+        if record.state != value:
+            record.state = value
+            record.state_dirty = True
+
+    async def get_state(self, key: StorageKey) -> Optional[str]:
+        return (await self._record(key)).state
+
+    async def set_data(self, key: StorageKey, data: Dict[str, Any]) -> None:
+        raw = self.storage.json_dumps(data) if data else None
+        if _scope.get() is None:
+            _prefetched.set(None)
+            await self._flush({key: _Record(data_raw=raw, data_dirty=True)})
+            return
+        record = await self._record(key)
+        if record.data_raw != raw:
+            record.data_raw = raw
+            record.data_dirty = True
+
+    async def get_data(self, key: StorageKey) -> Dict[str, Any]:
+        raw = (await self._record(key)).data_raw
+        return self.storage.json_loads(raw) if raw else {}
+
+    async def close(self) -> None:
+        await self.storage.close()
+
+    async def _record(self, key: StorageKey) -> _Record:
+        records = _scope.get()
+        if records is not None and key in records:
+            return records[key]
+        record = await self._load(key)
+        if records is not None:
+            records[key] = record
+        else:
+            _prefetched.set((key, record))
+        return record
+
+    async def _load(self, key: StorageKey) -> _Record:
+        state_key = self.key_builder.build(key, "state")
+        data_key = self.key_builder.build(key, "data")
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.get(state_key)
+        pipe.get(data_key)
+        pipe.ttl(state_key)
+        pipe.ttl(data_key)
+        state, data_raw, state_ttl, data_ttl = await pipe.execute()
+        ttls = [ttl for ttl in (state_ttl, data_ttl) if ttl != -2]
+        return _Record(state=_decode(state), data_raw=_decode(data_raw), ttl=min(ttls) if ttls else -2)
+
+    def _needs_refresh(self, record: _Record) -> bool:
+        if not self.idle_ttl or record.ttl == -2:
+            return False
+        return record.ttl == -1 or record.ttl < self.idle_ttl // 2
+
+    async def _flush(self, records: Dict[StorageKey, _Record]) -> None:
+        ops = []
+        for key, record in records.items():
+            refresh = self._needs_refresh(record)
+            for part, value, dirty in (
+                ("state", record.state, record.state_dirty),
+                ("data", record.data_raw, record.data_dirty),
+            ):
+                redis_key = self.key_builder.build(key, part)
+                if dirty and value is None:
+                    ops.append(("delete", redis_key))
+                elif dirty:
+                    ops.append(("set", redis_key, value))
+                elif refresh and value is not None:
+                    ops.append(("expire", redis_key))
+        if not ops:
+            return
+        pipe = self.redis.pipeline(transaction=True)
+        for op in ops:
+            if op[0] == "delete":
+                pipe.delete(op[1])
+            elif op[0] == "set":
+                pipe.set(op[1], op[2], ex=self.idle_ttl)
+            else:
+                pipe.expire(op[1], self.idle_ttl)
+        await pipe.execute()
@@ -0,0 +1,212 @@
+"""
+Анализ памяти Redis по пространствам имён бота: SCAN + выборочный MEMORY USAGE
+
+Запуск: python -m src.storage.keyspace [--sample 0.1] [--top 5] [--json]
+"""
+import argparse
+import asyncio
+import heapq
+import json
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from redis.asyncio import Redis
+from redis.exceptions import ResponseError
+
+from src.bot.config import config
+from src.storage.lifecycle import namespace_of
+
+# Корзины распределения TTL (верхняя граница в секундах, подпись)
+TTL_BUCKETS: Tuple[Tuple[float, str], ...] = (
+    (3600, "<1h"),
+    (86400, "<1d"),
+    (7 * 86400, "<7d"),
+    (float("inf"), ">=7d"),
+)
+NO_TTL = "no_ttl"
+
+
+@dataclass
+class NamespaceReport:
+    keys: int = 0
+    sampled: int = 0
+    sampled_bytes: int = 0
+    ttl: Dict[str, int] = field(default_factory=dict)
+    largest: List[Tuple[int, str]] = field(default_factory=list)
+
+    @property
+    def estimated_bytes(self) -> int:
+        """Оценка суммарной памяти: средний размер по выборке × число ключей"""
+        if not self.sampled:
+            return 0
+        return int(self.sampled_bytes / self.sampled * self.keys)
+
+    def to_dict(self) -> dict:
+        return {
+            "keys": self.keys,
+            "sampled": self.sampled,
+            "estimated_bytes": self.estimated_bytes,
+            "ttl": dict(self.ttl),
+            "largest": [{"key": key, "bytes": size} for size, key in self.top()],
+        }
+
+    def top(self) -> List[Tuple[int, str]]:
+        return sorted(self.largest, reverse=True)
+
+
+@dataclass
+class KeyspaceReport:
+    namespaces: Dict[str, NamespaceReport] = field(default_factory=dict)
+    scanned: int = 0
+    truncated: bool = False
+    memory_available: bool = True
+
+    def to_dict(self) -> dict:
+        return {
+            "scanned": self.scanned,
+            "truncated": self.truncated,
+            "memory_available": self.memory_available,
+            "namespaces": {name: item.to_dict() for name, item in sorted(self.namespaces.items())},
+        }
+
+
+def ttl_bucket(ttl: int) -> str:
+    if ttl < 0:
+        return NO_TTL
+    for limit, label in TTL_BUCKETS:
+        if ttl < limit:
+            return label
+    return TTL_BUCKETS[-1][1]
+
+
+class KeyspaceAnalyzer:
+    """Обход ключей бота с ограничением нагрузки на Redis.
+
+    SCAN идёт пачками по scan_count с паузой pause между ними; MEMORY USAGE
+    вызывается для каждого n-го ключа (sample_rate) с ограниченным SAMPLES,
+    чтобы не нагружать production-инстанс.
+    """
+
+    def __init__(
+        self,
+        redis: Redis,
+        prefix: str = None,
+        sample_rate: float = 0.1,
+        top: int = 5,
+        scan_count: int = 200,
+        pause: float = 0.01,
+        max_keys: Optional[int] = None,
+        memory_samples: int = 5,
+    ):
+        self.redis = redis
+        self.prefix = config.redis_key_prefix if prefix is None else prefix
+        self.sample_every = max(1, round(1 / sample_rate)) if sample_rate > 0 else 0
+        self.top = top
+        self.scan_count = scan_count
+        self.pause = pause
+        self.max_keys = max_keys
+        self.memory_samples = memory_samples
+
+    async def analyze(self) -> KeyspaceReport:
+        report = KeyspaceReport(memory_available=self.sample_every > 0)
+        cursor = 0
+        while True:
+            cursor, raw_keys = await self.redis.scan(cursor, match=f"{self.prefix}*", count=self.scan_count)
+            keys = [key.decode("utf-8") if isinstance(key, bytes) else key for key in raw_keys]
+            if self.max_keys is not None and report.scanned + len(keys) >= self.max_keys:
+                report.truncated = cursor != 0 or report.scanned + len(keys) > self.max_keys
+                keys = keys[: self.max_keys - report.scanned]
+                cursor = 0
+            if keys:
+                await self._process(keys, report)
+            if cursor == 0:
+                return report
+            if self.pause:
+                await asyncio.sleep(self.pause)
+
+    async def _process(self, keys: List[str], report: KeyspaceReport) -> None:
+        sampled = []
+        pipe = self.redis.pipeline(transaction=False)
+        for index, key in enumerate(keys, start=report.scanned):
+            pipe.ttl(key)
+            if report.memory_available and index % self.sample_every == 0:
+                pipe.memory_usage(key, samples=self.memory_samples)
+                sampled.append(key)
+        replies = iter(await pipe.execute(raise_on_error=False))
+        report.scanned += len(keys)
+        sampled_set = set(sampled)
+        for key in keys:
+            item = report.namespaces.setdefault(namespace_of(key, self.prefix), NamespaceReport())
+            item.keys += 1
+            ttl = next(replies)
+            if isinstance(ttl, int):
+                bucket = ttl_bucket(ttl)
+                item.ttl[bucket] = item.ttl.get(bucket, 0) + 1
+            if key not in sampled_set:
+                continue
+            size = next(replies)
+            if isinstance(size, ResponseError):
+                # MEMORY запрещён на сервере — дальше только счётчики и TTL
+                report.memory_available = False
+                continue
+            if not isinstance(size, int):
+                continue
+            item.sampled += 1
+            item.sampled_bytes += size
+            if len(item.largest) < self.top:
+                heapq.heappush(item.largest, (size, key))
+            elif self.top:
+                heapq.heappushpop(item.largest, (size, key))
+
+
+def format_report(report: KeyspaceReport, top: int = 3) -> str:
+    """Текстовый отчёт (моноширинный) для админа и CLI"""
+    lines = [f"scanned: {report.scanned}" + (" (truncated)" if report.truncated else "")]
+    if not report.memory_available:
+        lines.append("MEMORY USAGE unavailable: sizes not sampled")
+    ordered = sorted(report.namespaces.items(), key=lambda pair: (-pair[1].estimated_bytes, -pair[1].keys))
+    for name, item in ordered:
+        lines.append("")
+        lines.append(f"{name}: {item.keys} keys, ~{_human(item.estimated_bytes)} ({item.sampled} sampled)")
+        buckets = [NO_TTL] + [label for _, label in TTL_BUCKETS]
+        lines.append("  ttl " + " ".join(f"{label}={item.ttl[label]}" for label in buckets if item.ttl.get(label)))
+        for size, key in item.top()[:top]:
+            lines.append(f"  {_human(size):>8} {key}")
+    return "\n".join(lines)
+
+
+def _human(size: int) -> str:
+    for unit in ("B", "KB", "MB"):
+        if size < 1024:
+            return f"{size:.0f}{unit}" if unit == "B" else f"{size:.1f}{unit}"
+        size /= 1024
+    return f"{size:.1f}GB"
+
+
+async def _main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Память Redis по пространствам имён бота")
+    parser.add_argument("--sample", type=float, default=0.1, help="доля ключей для MEMORY USAGE")
+    parser.add_argument("--top", type=int, default=5, help="крупнейших ключей на пространство")
+    parser.add_argument("--count", type=int, default=200, help="COUNT для SCAN")
+    parser.add_argument("--pause", type=float, default=0.01, help="пауза между пачками SCAN, с")
+    parser.add_argument("--max-keys", type=int, default=None)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args(argv)
+    redis = Redis.from_url(config.fsm_storage_url)
+    analyzer = KeyspaceAnalyzer(
+        redis,
+        sample_rate=args.sample,
+        top=args.top,
+        scan_count=args.count,
+        pause=args.pause,
+        max_keys=args.max_keys,
+    )
+    try:
+        report = await analyzer.analyze()
+    finally:
+        await redis.aclose()
+    print(json.dumps(report.to_dict(), indent=2) if args.json else format_report(report, top=args.top))
+
+
+if __name__ == "__main__":
+    asyncio.run(_main())
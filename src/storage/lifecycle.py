@@ -0,0 +1,175 @@
+"""
+Жизненный цикл ключей Redis: TTL по пространствам имён, статистика и разовая миграция
+
+Запуск: python -m src.storage.lifecycle stats [--sample 0.1] | migrate [--dry-run]
+"""
+import argparse
+import asyncio
+import json
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+from redis.asyncio import Redis
+
+from src.bot.config import config
+
+# Границы TTL контекста платежа (24 часа — прежнее фиксированное значение)
+PAYMENT_CONTEXT_MIN_TTL = 60
+PAYMENT_CONTEXT_MAX_TTL = 86400
+
+
+def payment_context_ttl(expires_at: Optional[str], now: Optional[float] = None) -> int:
+    """TTL контекста платежа: до истечения счёта плюс config.payment_context_grace"""
+    if not expires_at:
+        return PAYMENT_CONTEXT_MAX_TTL
+    try:
+        expires = datetime.fromisoformat(expires_at.replace("Z", "+00:00"))
+    except (ValueError, TypeError, AttributeError):
+        return PAYMENT_CONTEXT_MAX_TTL
+    if expires.tzinfo is None:
+        expires = expires.replace(tzinfo=timezone.utc)
+    now = time.time() if now is None else now
+    ttl = int(expires.timestamp() - now) + config.payment_context_grace
+    return max(PAYMENT_CONTEXT_MIN_TTL, min(ttl, PAYMENT_CONTEXT_MAX_TTL))
+
+
+def namespace_ttls() -> Dict[str, int]:
+    """Фиксированные TTL по пространствам имён (payment — по expires_at, см. payment_context_ttl)"""
+    return {
+        "page": config.page_ttl,
+        "navstack": config.navstack_ttl,
+        "user": 86400,
+        "broadcast": 3600,
+        "notification": 3600,
+        "render": config.render_hash_ttl,
+        "idempotency": config.payment_idempotency_window,
+        "fsm:state": config.fsm_ttl,
+        "fsm:data": config.fsm_ttl,
+    }
+
+
+def namespace_of(key: str, prefix: str) -> str:
+    """Пространство имён ключа: первый сегмент после префикса, для FSM — fsm:state/fsm:data"""
+    if not key.startswith(prefix):
+        return "other"
+    head, _, rest = key[len(prefix):].partition(":")
+    if head == "fsm":
+        return f"fsm:{rest.rsplit(':', 1)[-1]}"
+    return head or "other"
+
+
+@dataclass
+class NamespaceStats:
+    keys: int = 0
+    no_ttl: int = 0
+    memory_bytes: int = 0  # оценка по выборке
+
+
+@dataclass
+class MigrationReport:
+    scanned: int = 0
+    updated: Dict[str, int] = field(default_factory=lambda: defaultdict(int))
+
+
+class KeyLifecycleManager:
+    """Проставляет и проверяет TTL ключей бота"""
+
+    def __init__(self, redis: Redis, prefix: str = None, batch_size: int = 500):
+        self.redis = redis
+        self.prefix = config.redis_key_prefix if prefix is None else prefix
+        self.batch_size = batch_size
+
+    async def _scan_batches(self):
+        batch: List[str] = []
+        async for raw_key in self.redis.scan_iter(match=f"{self.prefix}*", count=self.batch_size):
+            batch.append(raw_key.decode("utf-8") if isinstance(raw_key, bytes) else raw_key)
+            if len(batch) >= self.batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    async def stats(self, sample_rate: float = 0.1) -> Dict[str, NamespaceStats]:
+        """Число ключей, ключи без TTL и оценка памяти по пространствам имён.
+
+        Обход — KeyspaceAnalyzer: SCAN пачками с паузой и выборочный MEMORY USAGE.
+        """
+        # keyspace сам импортирует namespace_of из этого модуля
+        from src.storage.keyspace import NO_TTL, KeyspaceAnalyzer
+
+        analyzer = KeyspaceAnalyzer(self.redis, prefix=self.prefix, sample_rate=sample_rate, scan_count=self.batch_size)
+        report = await analyzer.analyze()
+        return {
+            name: NamespaceStats(keys=item.keys, no_ttl=item.ttl.get(NO_TTL, 0), memory_bytes=item.estimated_bytes)
+            for name, item in report.namespaces.items()
+        }
+
+    async def migrate(self, dry_run: bool = False, now: Optional[float] = None) -> MigrationReport:
+        """Проставить TTL существующим ключам: без TTL — по политике, контексты платежей — по expires_at"""
+        policy = namespace_ttls()
+        report = MigrationReport()
+        async for batch in self._scan_batches():
+            report.scanned += len(batch)
+            pipe = self.redis.pipeline(transaction=False)
+            for key in batch:
+                pipe.ttl(key)
+            ttls = await pipe.execute()
+            contexts = [
+                key for key in batch
+                if namespace_of(key, self.prefix) == "payment" and key.endswith(":context")
+            ]
+            values = dict(zip(contexts, await self.redis.mget(contexts))) if contexts else {}
+            pipe = self.redis.pipeline(transaction=False)
+            for key, current in zip(batch, ttls):
+                namespace = namespace_of(key, self.prefix)
+                if key in values:
+                    target = self._context_ttl(values[key], now)
+                    # Только сокращаем: 24-часовой TTL старых контекстов избыточен
+                    if current != -1 and 0 <= current <= target:
+                        continue
+                elif current == -1 and namespace in policy:
+                    target = policy[namespace]
+                else:
+                    continue
+                report.updated[namespace] += 1
+                if not dry_run:
+                    pipe.expire(key, target)
+            if not dry_run:
+                await pipe.execute()
+        return report
+
+    @staticmethod
+    def _context_ttl(value, now: Optional[float]) -> int:
+        try:
+            expires_at = json.loads(value).get("expires_at") if value else None
+        except (ValueError, AttributeError):
+            expires_at = None
+        return payment_context_ttl(expires_at, now=now)
+
+
+async def _main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="TTL ключей бота в Redis")
+    parser.add_argument("command", choices=("stats", "migrate"))
+    parser.add_argument("--dry-run", action="store_true", help="только посчитать, без EXPIRE")
+    parser.add_argument("--sample", type=float, default=0.1, help="доля ключей для MEMORY USAGE (stats)")
+    args = parser.parse_args(argv)
+    redis = Redis.from_url(config.fsm_storage_url)
+    manager = KeyLifecycleManager(redis)
+    try:
+        if args.command == "stats":
+            for namespace, item in sorted((await manager.stats(sample_rate=args.sample)).items()):
+                print(f"{namespace:<14}{item.keys:>10}{item.no_ttl:>10}{item.memory_bytes:>14}")
+        else:
+            report = await manager.migrate(dry_run=args.dry_run)
+            print(f"scanned: {report.scanned}")
+            for namespace, count in sorted(report.updated.items()):
+                print(f"{namespace:<14}{count:>10}")
+    finally:
+        await redis.aclose()
+
+
+if __name__ == "__main__":
+    asyncio.run(_main())
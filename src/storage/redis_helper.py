@@ -2,11 +2,27 @@
 Redis helper для хранения состояния и контекста
 """
 import json
-from typing import Optional, Any, Dict
+import uuid
+from typing import Optional, Any, AsyncIterator, Dict, Tuple
 from redis.asyncio import Redis
 from src.bot.config import config
+from src.monitoring.metrics import redis_duration, timed_methods
+from src.monitoring.tracing import traced_methods
+from src.storage.lifecycle import payment_context_ttl
+
+# Compare-and-delete: DEL только если значение — токен владельца
+RELEASE_LOCK_SCRIPT = """
+if redis.call("GET", KEYS[1]) == ARGV[1] then
+    return redis.call("DEL", KEYS[1])
+end
+return 0
+"""
 
 
+# Каждая публичная операция — отдельная серия bot_redis_operation_duration_seconds{op}
+# и спан в трассе текущего апдейта
+@timed_methods(redis_duration)
+@traced_methods("redis")
 class RedisHelper:
     """Helper для работы с Redis"""
     
@@ -25,7 +41,7 @@ class RedisHelper:
     async def set_page(self, tg_id: int, page_type: str, page: int) -> None:
         """Сохранить номер страницы для пользователя"""
         key = self._make_key("page", tg_id, page_type)
-        await self.redis.set(key, page)
+        await self.redis.set(key, page, ex=config.page_ttl)
     
     async def get_page(self, tg_id: int, page_type: str, default: int = 1) -> int:
         """Получить номер страницы для пользователя"""
@@ -46,7 +62,12 @@ class RedisHelper:
         payment_id: str, 
         tg_id: int, 
         subscription_id: int,
-        message_id: int
+        message_id: int,
+        expires_at: Optional[str] = None,
+        language: Optional[str] = None,
+        pay_link: Optional[str] = None,
+        qr_url: Optional[str] = None,
+        intent: Optional[str] = None,
     ) -> None:
         """Сохранить контекст платежа"""
         data = {
@@ -54,8 +75,15 @@ class RedisHelper:
             "subscription_id": subscription_id,
             "message_id": message_id
         }
+        # Чтобы закрыть окно идемпотентности при оплате/неуспехе/отмене
+        if intent:
+            data["intent"] = intent
+        # Для обратного отсчёта на экране ожидания (восстанавливается после рестарта)
+        if expires_at:
+            data.update(expires_at=expires_at, language=language, pay_link=pay_link, qr_url=qr_url)
         key = self._make_key("payment", payment_id, "context")
-        await self.redis.setex(key, 86400, json.dumps(data))  # TTL 24 часа
+        # Живёт до истечения счёта плюс запас на поздний вебхук
+        await self.redis.setex(key, payment_context_ttl(expires_at), json.dumps(data))
     
     async def get_payment_context(self, payment_id: str) -> Optional[Dict[str, Any]]:
         """Получить контекст платежа"""
@@ -71,13 +99,85 @@ class RedisHelper:
         if context:
             context["message_id"] = message_id
             key = self._make_key("payment", payment_id, "context")
-            await self.redis.setex(key, 86400, json.dumps(context))
+            await self.redis.set(key, json.dumps(context), keepttl=True)
     
     async def clear_payment_context(self, payment_id: str) -> None:
         """Очистить контекст платежа"""
         key = self._make_key("payment", payment_id, "context")
         await self.redis.delete(key)
     
+    async def iter_payment_contexts(self) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """Обойти все сохранённые контексты платежей (SCAN, без блокировки Redis)"""
+        head = f"{self.prefix}payment:"
+        tail = ":context"
+        async for raw_key in self.redis.scan_iter(match=f"{head}*{tail}", count=500):
+            key = raw_key.decode("utf-8") if isinstance(raw_key, bytes) else raw_key
+            value = await self.redis.get(key)
+            if not value:
+                continue
+            try:
+                context = json.loads(value)
+            except ValueError:
+                continue
+            yield key[len(head):-len(tail)], context
+    
+    async def end_payment_intent(self, payment_id: str) -> None:
+        """Закрыть окно идемпотентности платежа: следующее нажатие создаст новый счёт"""
+        context = await self.get_payment_context(payment_id)
+        intent = context.get("intent") if context else None
+        if intent:
+            await self.drop_payment_idempotency_key(intent)
+
+    # Ключи идемпотентности: окно начинается с первого нажатия (SET NX EX)
+    async def claim_payment_idempotency_key(self, intent: str, candidate: str, ttl: int) -> str:
+        """Ключ намерения оплаты: первый вызов сохраняет candidate, следующие в окне получают его же"""
+        key = self._make_key("idempotency", intent, "key")
+        while True:
+            if await self.redis.set(key, candidate, nx=True, ex=ttl):
+                return candidate
+            value = await self.redis.get(key)
+            if value:
+                return value.decode("utf-8") if isinstance(value, bytes) else value
+            # Ключ истёк между SET и GET — пробуем занять окно заново
+
+    async def drop_payment_idempotency_key(self, intent: str) -> None:
+        """Удалить ключ намерения и сохранённый под ним ответ POST /payments"""
+        key = self._make_key("idempotency", intent, "key")
+        value = await self.redis.get(key)
+        keys = [key]
+        if value:
+            idempotency_key = value.decode("utf-8") if isinstance(value, bytes) else value
+            keys.append(self._make_key("idempotency", idempotency_key, "payment"))
+        await self.redis.delete(*keys)
+
+    # Результаты создания платежей (идемпотентность повторных нажатий)
+    async def set_payment_result(self, idempotency_key: str, payment: Dict[str, Any], ttl: int) -> None:
+        """Сохранить ответ POST /payments на время окна идемпотентности"""
+        key = self._make_key("idempotency", idempotency_key, "payment")
+        await self.redis.setex(key, ttl, json.dumps(payment))
+    
+    async def get_payment_result(self, idempotency_key: str) -> Optional[Dict[str, Any]]:
+        """Получить сохранённый ответ POST /payments"""
+        key = self._make_key("idempotency", idempotency_key, "payment")
+        value = await self.redis.get(key)
+        if value:
+            return json.loads(value)
+        return None
+    
+    # Хеши отрисованных сообщений (дедупликация правок)
+    async def get_render_hash(self, chat_id: int, message_id: int) -> Optional[str]:
+        """Получить хеш последнего отрисованного содержимого сообщения"""
+        key = self._make_key("render", chat_id, str(message_id))
+        value = await self.redis.get(key)
+        if isinstance(value, bytes):
+            return value.decode("utf-8")
+        return value
+    
+    async def set_render_hash(self, chat_id: int, message_id: int, digest: str) -> None:
+        """Сохранить хеш отрисованного содержимого сообщения"""
+        key = self._make_key("render", chat_id, str(message_id))
+        await self.redis.setex(key, config.render_hash_ttl, digest)
+    
     # Черновики рассылок
     async def set_broadcast_draft(
         self, 
@@ -136,6 +236,35 @@ class RedisHelper:
         key = self._make_key("notification", tg_id, context_type)
         await self.redis.delete(key)
     
+    # Блокировка повторных нажатий (callback в обработке)
+    async def acquire_callback_lock(self, tg_id: int, callback_data: str, ttl: int) -> Optional[str]:
+        """Захватить блокировку на (пользователь, callback_data): токен владельца, None — уже занята"""
+        key = self._make_key("inflight", tg_id, callback_data)
+        token = uuid.uuid4().hex
+        if await self.redis.set(key, token, nx=True, ex=ttl):
+            return token
+        return None
+    
+    async def release_callback_lock(self, tg_id: int, callback_data: str, token: str) -> None:
+        """Снять блокировку нажатия, если она всё ещё принадлежит этому нажатию"""
+        key = self._make_key("inflight", tg_id, callback_data)
+        # Хендлер мог пережить TTL: тогда ключ уже держит следующее нажатие, его не трогаем
+        await self.redis.eval(RELEASE_LOCK_SCRIPT, 1, key, token)
+    
+    # Длинные callback_data за коротким токеном
+    async def set_callback_payload(self, token: str, payload: str, ttl: int) -> None:
+        """Сохранить callback payload по токену"""
+        key = f"{self.prefix}cbdata:{token}"
+        await self.redis.setex(key, ttl, payload)
+    
+    async def get_callback_payload(self, token: str) -> Optional[str]:
+        """Получить callback payload по токену"""
+        key = f"{self.prefix}cbdata:{token}"
+        value = await self.redis.get(key)
+        if isinstance(value, bytes):
+            return value.decode("utf-8")
+        return value
+    
     # Язык пользователя (кеш)
     async def set_user_language(self, tg_id: int, language: str) -> None:
         """Сохранить язык пользователя в кеше"""
@@ -145,7 +274,10 @@ class RedisHelper:
     async def get_user_language(self, tg_id: int) -> Optional[str]:
         """Получить язык пользователя из кеша"""
         key = self._make_key("user", tg_id, "language")
-        return await self.redis.get(key)
+        value = await self.redis.get(key)
+        if isinstance(value, bytes):
+            return value.decode("utf-8")
+        return value
     
     # Очистка всех данных пользователя
     async def clear_user_data(self, tg_id: int) -> None:
@@ -173,7 +305,7 @@ class RedisHelper:
             except Exception:
                 stack = []
         stack.append(screen)
-        await self.redis.set(key, json.dumps(stack))
+        await self.redis.set(key, json.dumps(stack), ex=config.navstack_ttl)
 
     async def pop_screen(self, tg_id: int) -> dict | None:
         key = f"{self.prefix}navstack:{tg_id}"
@@ -187,7 +319,7 @@ class RedisHelper:
         if not stack:
             return None
         screen = stack.pop()
-        await self.redis.set(key, json.dumps(stack))
+        await self.redis.set(key, json.dumps(stack), ex=config.navstack_ttl)
         return screen
 
     async def peek_screen(self, tg_id: int) -> dict | None:
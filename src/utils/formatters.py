@@ -1,23 +1,14 @@
 """
 Утилиты для форматирования
 """
-from datetime import datetime
 from typing import Optional
 from src.i18n.translations import translations
+from src.services.date_formatter import date_formatter
 
 
 def format_date(date_str: str, language: str = "ru") -> str:
-    """Форматирование даты согласно языку пользователя"""
-    try:
-        # Парсим ISO8601 дату
-        dt = datetime.fromisoformat(date_str.replace('Z', '+00:00'))
-        
-        if language == "ru":
-            return dt.strftime("%d.%m.%Y %H:%M")
-        else:
-            return dt.strftime("%Y-%m-%d %H:%M")
-    except (ValueError, TypeError):
-        return date_str
+    """Форматирование даты согласно языку пользователя (в часовом поясе бота)"""
+    return date_formatter.format(date_str, language)
 
 
 def format_money(amount: float, currency: str) -> str:
@@ -60,15 +51,7 @@ def truncate_service_name(name: str, max_length: int = 10) -> str:
 
 def calculate_minutes_until_expiry(expires_at: str) -> int:
     """Вычисление минут до истечения счета"""
-    try:
-        dt = datetime.fromisoformat(expires_at.replace('Z', '+00:00'))
-        now = datetime.utcnow()
-        diff = dt - now
-        
-        minutes = int(diff.total_seconds() / 60)
-        return max(0, minutes)
-    except (ValueError, TypeError):
-        return 0
+    return date_formatter.minutes_until(expires_at)
 
 
 def format_payment_description(
@@ -94,7 +77,9 @@ def format_payment_description(
         key = "payments.detail.no_description_no_external"
     
     # Подставляем значения
-    return translations.get(key, language).format(
+    return translations.get(
+        key,
+        language,
         payment_id=payment_id,
         provider=provider,
         amount=amount,
@@ -0,0 +1,20 @@
+"""
+Детерминированные ключи идемпотентности
+"""
+import time
+import uuid
+from typing import Optional
+
+# Фиксированное пространство имён: одинаковые входные данные -> одинаковый UUID
+PAYMENT_KEY_NAMESPACE = uuid.UUID("6f1c2b0e-8d3a-4f5e-9b7c-2a1d0e4f6c3b")
+
+
+def payment_intent(tg_id: int, subscription_id: int, provider: str, plan: str) -> str:
+    """Намерение оплаты: пользователь, подписка, провайдер и план"""
+    return f"{tg_id}:{subscription_id}:{provider}:{plan}"
+
+
+def payment_idempotency_key(intent: str, started_at: Optional[float] = None) -> str:
+    """Ключ для POST /payments: намерение + момент первого нажатия (начало окна)"""
+    started = time.time() if started_at is None else started_at
+    return str(uuid.uuid5(PAYMENT_KEY_NAMESPACE, f"{intent}:{started:.6f}"))
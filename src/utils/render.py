@@ -0,0 +1,42 @@
+"""
+Утилиты рендера сообщений: компактный хеш текста и клавиатуры
+"""
+import hashlib
+from typing import Optional
+
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.types import InlineKeyboardMarkup, Message
+
+from src.storage.redis_helper import RedisHelper
+
+
+def render_hash(text: str, reply_markup: Optional[InlineKeyboardMarkup] = None) -> str:
+    """Хеш отрисованного содержимого сообщения (текст + клавиатура)"""
+    digest = hashlib.blake2b(text.encode("utf-8"), digest_size=8)
+    if reply_markup is not None:
+        digest.update(b"\x00")
+        digest.update(reply_markup.model_dump_json(exclude_none=True).encode("utf-8"))
+    return digest.hexdigest()
+
+
+async def edit_text_if_changed(
+    message: Message,
+    redis_helper: RedisHelper,
+    text: str,
+    reply_markup: Optional[InlineKeyboardMarkup] = None,
+) -> bool:
+    """Редактировать сообщение, только если рендер отличается от последнего.
+
+    Возвращает False, если правка пропущена (вызывающий лишь отвечает на callback).
+    """
+    chat_id = message.chat.id
+    digest = render_hash(text, reply_markup)
+    if await redis_helper.get_render_hash(chat_id, message.message_id) == digest:
+        return False
+    try:
+        await message.edit_text(text, reply_markup=reply_markup)
+    except TelegramBadRequest as e:
+        if "message is not modified" not in str(e):
+            raise
+    await redis_helper.set_render_hash(chat_id, message.message_id, digest)
+    return True
@@ -0,0 +1,117 @@
+import httpx
+import pytest
+
+from src.clients.backend_api import (
+    BackendAPIClient,
+    BackendClientError,
+    BackendInvalidResponseError,
+    BackendNetworkError,
+    BackendNotFoundError,
+    BackendRateLimitError,
+    BackendServerError,
+    BackendTimeoutError,
+)
+from src.monitoring.metrics import backend_bytes, backend_errors, backend_requests, backend_retries
+
+
+def _client(handler) -> BackendAPIClient:
+    client = BackendAPIClient()
+    client.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return client
+
+
+def _value(metric, *labels) -> float:
+    return metric.labels(*labels).value
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "status, error_class, message",
+    [
+        (404, BackendNotFoundError, "Not found"),
+        (409, BackendClientError, "HTTP error 409: conflict"),
+        (503, BackendServerError, "HTTP error 503: conflict"),
+    ],
+)
+async def test_status_errors_are_typed(status, error_class, message):
+    client = _client(lambda request: httpx.Response(status, text="conflict"))
+    with pytest.raises(error_class) as info:
+        await client._make_request("POST", "/payments/pay_9x/cancel", route="/payments/{id}/cancel")
+    assert str(info.value) == message
+    assert info.value.status == status
+    assert info.value.endpoint == "/payments/{id}/cancel"
+    # Совместимость со старыми обработчиками
+    assert isinstance(info.value, ValueError)
+    assert isinstance(info.value, BackendServerError) == (status >= 500)
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_timeout_and_network_errors_are_distinct():
+    def timeout(request):
+        raise httpx.ReadTimeout("read timed out", request=request)
+
+    def refused(request):
+        raise httpx.ConnectError("connection refused", request=request)
+
+    before = _value(backend_requests, "GET", "/users/{id}", "timeout")
+    timeouts = _value(backend_errors, "GET", "/users/{id}", "timeout")
+    client = _client(timeout)
+    with pytest.raises(BackendTimeoutError):
+        await client.get_user(5)
+    assert _value(backend_requests, "GET", "/users/{id}", "timeout") == before + 1
+    assert _value(backend_errors, "GET", "/users/{id}", "timeout") == timeouts + 1
+    await client.aclose()
+
+    network = _value(backend_errors, "GET", "/users/{id}", "network")
+    client = _client(refused)
+    with pytest.raises(BackendNetworkError) as info:
+        await client.get_user(5)
+    assert not isinstance(info.value, BackendTimeoutError)
+    assert _value(backend_errors, "GET", "/users/{id}", "network") == network + 1
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_invalid_json_is_reported():
+    client = _client(lambda request: httpx.Response(200, text="<html>"))
+    with pytest.raises(BackendInvalidResponseError):
+        await client._make_request("GET", "/health")
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_retries_and_bytes_are_counted(monkeypatch):
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        if len(calls) <= 2:
+            return httpx.Response(429, text="slow down")
+        return httpx.Response(200, json={"ok": True})
+
+    async def no_sleep(delay):
+        return None
+
+    monkeypatch.setattr("src.clients.backend_api.asyncio.sleep", no_sleep)
+    client = _client(handler)
+    retries = _value(backend_retries, "GET", "/bench/{id}")
+    received = _value(backend_bytes, "GET", "/bench/{id}", "received")
+
+    assert await client._make_request("GET", "/bench/1", route="/bench/{id}") == {"ok": True}
+    assert _value(backend_retries, "GET", "/bench/{id}") == retries + 2
+    expected = 2 * len("slow down") + len(httpx.Response(200, json={"ok": True}).content)
+    assert _value(backend_bytes, "GET", "/bench/{id}", "received") == received + expected
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_error_keeps_retry_after_and_sent_bytes():
+    client = _client(lambda request: httpx.Response(429, headers={"Retry-After": "12"}))
+    sent = _value(backend_bytes, "POST", "/users/{id}/trial", "sent")
+    with pytest.raises(BackendRateLimitError) as info:
+        await client._make_request("POST", "/users/1/trial", data={"days": 3}, route="/users/{id}/trial")
+    assert info.value.retry_after == 12.0
+    assert _value(backend_bytes, "POST", "/users/{id}/trial", "sent") > sent
+    assert _value(backend_errors, "POST", "/users/{id}/trial", "rate_limited") >= 1
+    await client.aclose()
@@ -0,0 +1,62 @@
+import logging
+
+import httpx
+import pytest
+
+from loadtest.fake_backend import FakeBackend, FakeBackendSettings
+from src.clients import backend_api
+from src.clients.backend_api import BackendAPIClient
+from src.monitoring.metrics import backend_in_flight, backend_pool_connections, backend_pool_wait
+
+
+def test_pool_limits_and_http2_fallback(monkeypatch, caplog):
+    monkeypatch.setattr(backend_api, "_http2_available", lambda: False)
+    with caplog.at_level(logging.WARNING, logger=backend_api.__name__):
+        client = BackendAPIClient(max_connections=7, max_keepalive=3, keepalive_expiry=1.5, pool_timeout=0.5, http2=True)
+    assert client.http2 is False
+    assert "h2 is not installed" in caplog.text
+    assert (client.limits.max_connections, client.limits.max_keepalive_connections) == (7, 3)
+    assert client.limits.keepalive_expiry == 1.5
+    assert client.timeout.pool == 0.5
+
+
+@pytest.mark.asyncio
+async def test_default_headers_live_on_the_client():
+    seen = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request.headers)
+        return httpx.Response(200, json={})
+
+    client = BackendAPIClient()
+    client.client = httpx.AsyncClient(
+        transport=httpx.MockTransport(handler), headers=client.default_headers
+    )
+    await client._make_request("POST", "/payments", {"plan": "m1"}, idempotency_key="key-1")
+    assert seen[0]["Authorization"] == client.default_headers["Authorization"]
+    assert seen[0]["X-Idempotency-Key"] == "key-1"
+    assert client.default_headers == {
+        "Authorization": f"Bearer {client.token}",
+        "Content-Type": "application/json",
+    }
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_pool_wait_and_connection_metrics_against_fake_backend():
+    async with FakeBackend(FakeBackendSettings(latency=0)) as backend:
+        client = BackendAPIClient(max_connections=2, max_keepalive=2)
+        client.base_url = backend.url
+        wait = backend_pool_wait.labels()
+        observed = wait.count
+        try:
+            for tg_id in (1, 2, 3):
+                await client.get_user(tg_id)
+            assert wait.count == observed + 3
+            assert backend_in_flight.labels().value == 0
+
+            client.collect_pool_metrics()
+            assert backend_pool_connections.labels("idle").value == 1
+            assert backend_pool_connections.labels("active").value == 0
+        finally:
+            await client.aclose()
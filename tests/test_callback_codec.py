@@ -0,0 +1,99 @@
+import asyncio
+
+import pytest
+
+from src.keyboards.codec import CallbackPayloadStore, payload_store
+from src.keyboards.factories import AdminExtendCallback, PaymentCallback
+
+
+def test_roundtrip_and_fits_telegram_limit():
+    cb = PaymentCallback(action="select", subscription_id=123456, provider="yookassa", plan="m1")
+    packed = cb.pack()
+    assert packed.startswith("pay:")
+    assert len(packed.encode()) <= 64
+    assert PaymentCallback.unpack(packed) == cb
+
+
+def test_payment_id_may_contain_separator():
+    cb = PaymentCallback(action="check", payment_id="pay:abc:1")
+    assert PaymentCallback.unpack(cb.pack()).payment_id == "pay:abc:1"
+
+
+def test_legacy_text_format_still_parses():
+    legacy = "aex:confirm:5:m1"
+    cb = AdminExtendCallback.unpack(legacy)
+    assert (cb.action, cb.subscription_id, cb.plan) == ("confirm", 5, "m1")
+
+
+def test_legacy_payment_buttons_map_to_new_fields():
+    # Кнопки «Проверить статус»/«Отмена», уже разосланные в текстовом формате
+    assert PaymentCallback.unpack("pay:check:pay_123:1") == PaymentCallback(action="check", payment_id="pay_123")
+    assert PaymentCallback.unpack("pay:cancel:pay_123:2") == PaymentCallback(action="cancel", payment_id="pay_123", page=2)
+    # «Сменить способ»/«Оферта» несли subscription_id в поле payment_id
+    assert PaymentCallback.unpack("pay:change_method:42:1") == PaymentCallback(action="change_method", subscription_id=42)
+    with pytest.raises(TypeError):
+        PaymentCallback.unpack("pay:check:pay_123")
+
+
+def test_foreign_prefix_and_garbage_are_rejected():
+    with pytest.raises(ValueError):
+        PaymentCallback.unpack("sub:list:1:0")
+    with pytest.raises(ValueError):
+        PaymentCallback.unpack("pay:!!!")
+
+
+@pytest.mark.asyncio
+async def test_oversized_payload_goes_to_store():
+    cb = PaymentCallback(action="check", payment_id="x" * 80)
+    token = cb.pack()
+    assert token.startswith("~") and len(token) <= 64
+    assert token == cb.pack()
+    payload = await payload_store.resolve(token)
+    assert PaymentCallback.unpack(payload) == cb
+    assert await CallbackPayloadStore().resolve(token) is None
+
+
+class _PayloadRedis:
+    def __init__(self):
+        self.writes = []
+        self.fail = False
+
+    async def set_callback_payload(self, token, payload, ttl):
+        self.writes.append(token)
+        if self.fail:
+            raise ConnectionError("redis down")
+
+
+async def _settle():
+    # Фоновая запись и её done-callback
+    for _ in range(3):
+        await asyncio.sleep(0)
+
+
+@pytest.mark.asyncio
+async def test_store_retries_failed_writes_and_refreshes_ttl(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr("src.keyboards.codec.time.monotonic", lambda: clock[0])
+    redis = _PayloadRedis()
+    store = CallbackPayloadStore(ttl=100)
+    store.bind(redis)
+
+    redis.fail = True
+    token = store.put("x" * 80)
+    await _settle()
+    # Запись упала — следующий put() пишет снова
+    redis.fail = False
+    assert store.put("x" * 80) == token
+    await _settle()
+    assert redis.writes == [token, token]
+
+    # Пока не прошла половина TTL, повторные put() в Redis не ходят
+    clock[0] += 49
+    store.put("x" * 80)
+    await _settle()
+    assert len(redis.writes) == 2
+
+    clock[0] += 1
+    store.put("x" * 80)
+    await _settle()
+    assert len(redis.writes) == 3
@@ -0,0 +1,87 @@
+import asyncio
+import pytest
+from aiogram.types import CallbackQuery, User
+from fakeredis.aioredis import FakeRedis
+
+from src.bot.middleware import CallbackDedupMiddleware
+from src.storage.redis_helper import RedisHelper
+
+answered = []
+
+
+class FakeCallbackQuery(CallbackQuery):
+    async def answer(self, *args, **kwargs):
+        answered.append(self.id)
+
+
+def make_callback(callback_id: str, data: str = "pay:check") -> FakeCallbackQuery:
+    return FakeCallbackQuery(
+        id=callback_id,
+        from_user=User(id=1, is_bot=False, first_name="u"),
+        chat_instance="c",
+        data=data,
+    )
+
+
+@pytest.mark.asyncio
+async def test_duplicate_tap_is_answered_without_handler():
+    answered.clear()
+    middleware = CallbackDedupMiddleware(redis_helper=None)
+    release = asyncio.Event()
+    calls = []
+
+    async def handler(event, data):
+        calls.append(event.id)
+        await release.wait()
+        return "done"
+
+    first = asyncio.create_task(middleware(handler, make_callback("1"), {}))
+    await asyncio.sleep(0)
+    assert await middleware(handler, make_callback("2"), {}) is None
+    other = asyncio.create_task(middleware(handler, make_callback("3", data="pay:cancel"), {}))
+    await asyncio.sleep(0)
+    release.set()
+    assert await first == "done"
+    assert await other == "done"
+    assert calls == ["1", "3"]
+    assert answered == ["2"]
+
+    # После завершения первого нажатия кнопка снова доступна
+    assert await middleware(handler, make_callback("4"), {}) == "done"
+
+
+@pytest.mark.asyncio
+async def test_redis_lock_is_released_only_by_its_owner():
+    answered.clear()
+    redis = FakeRedis()
+    helper = RedisHelper(redis)
+    middleware = CallbackDedupMiddleware(redis_helper=helper, use_redis=True, ttl=10)
+    lock_key = helper._make_key("inflight", 1, "pay:check")
+    release_first = asyncio.Event()
+    release_second = asyncio.Event()
+    calls = []
+
+    async def handler(event, data):
+        calls.append(event.id)
+        await (release_first if event.id == "1" else release_second).wait()
+        return "done"
+
+    first = asyncio.create_task(middleware(handler, make_callback("1"), {}))
+    await asyncio.sleep(0.01)
+    assert await middleware(handler, make_callback("2"), {}) is None
+
+    # Первый хендлер пережил TTL: блокировку забирает следующее нажатие
+    await redis.delete(lock_key)
+    second = asyncio.create_task(middleware(handler, make_callback("3"), {}))
+    await asyncio.sleep(0.01)
+    release_first.set()
+    assert await first == "done"
+
+    # Завершение первого не снимает чужую блокировку — дубликат второго отброшен
+    assert await redis.exists(lock_key)
+    assert await middleware(handler, make_callback("4"), {}) is None
+    release_second.set()
+    assert await second == "done"
+    assert not await redis.exists(lock_key)
+    assert calls == ["1", "3"]
+    assert answered == ["2", "4"]
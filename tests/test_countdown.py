@@ -0,0 +1,76 @@
+import pytest
+from aiogram.exceptions import TelegramBadRequest
+
+from src.services.countdown import PaymentCountdown, TimingWheel
+
+T0 = 1_700_000_000 - 1_700_000_000 % 60  # граница минуты
+
+
+class FakeBot:
+    def __init__(self, fail: bool = False):
+        self.edits = []
+        self.fail = fail
+
+    async def edit_message_text(self, chat_id, message_id, text, reply_markup=None):
+        if self.fail:
+            raise TelegramBadRequest(method=None, message="message to edit not found")
+        self.edits.append((chat_id, message_id, text))
+
+
+def _iso(ts: float) -> str:
+    from datetime import datetime, timezone
+    return datetime.fromtimestamp(ts, timezone.utc).isoformat()
+
+
+def test_wheel_fires_in_order_across_rounds():
+    wheel = TimingWheel(slots=4)
+    wheel.schedule("a", 10)
+    wheel.schedule("b", 14)  # тот же слот, следующий оборот
+    wheel.schedule("c", 11)
+    wheel.cancel("c")
+    assert wheel.advance(9) == []
+    assert wheel.advance(10) == ["a"]
+    assert wheel.advance(13) == []
+    assert wheel.advance(14) == ["b"]
+    assert len(wheel) == 0
+
+
+def test_wheel_catches_up_after_missed_ticks():
+    wheel = TimingWheel(slots=4)
+    wheel.advance(100)
+    wheel.schedule("a", 101)
+    wheel.schedule("b", 103)
+    wheel.schedule("late", 50)  # уже прошло — на ближайшем тике
+    assert sorted(wheel.advance(110)) == ["a", "b", "late"]
+
+
+@pytest.mark.asyncio
+async def test_countdown_refreshes_every_minute_then_expires():
+    bot = FakeBot()
+    countdown = PaymentCountdown(edit_rate=0)
+    countdown.bind(bot, None)
+    assert countdown.track("p1", 1, 10, _iso(T0 + 150), language="en", now=T0)
+
+    assert await countdown.tick(T0 + 30) == 0
+    assert await countdown.tick(T0 + 60) == 1
+    assert await countdown.tick(T0 + 120) == 1
+    assert await countdown.tick(T0 + 180) == 1
+    texts = [text for _, _, text in bot.edits]
+    assert "within 1 minutes" in texts[0]
+    assert "within 0 minutes" in texts[1]
+    assert texts[2].startswith("The invoice has expired")
+    assert len(countdown) == 0
+    assert await countdown.tick(T0 + 240) == 0
+
+
+@pytest.mark.asyncio
+async def test_untracked_and_broken_messages_stop_refreshing():
+    bot = FakeBot(fail=True)
+    countdown = PaymentCountdown(edit_rate=0)
+    countdown.bind(bot, None)
+    countdown.track("gone", 1, 10, _iso(T0 + 600), now=T0)
+    countdown.track("paid", 1, 11, _iso(T0 + 600), now=T0)
+    countdown.untrack("paid")
+    assert await countdown.tick(T0 + 60) == 1
+    assert len(countdown) == 0
+    assert not countdown.track("bad", 1, 12, "not-a-date", now=T0)
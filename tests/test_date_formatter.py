@@ -0,0 +1,73 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from src.services.date_formatter import DateFormatter, get_zone
+from src.utils.formatters import calculate_minutes_until_expiry, format_date
+
+
+@pytest.mark.parametrize("value,language,expected", [
+    ("2024-03-01T12:30:00Z", "ru", "01.03.2024 15:30"),
+    ("2024-03-01T12:30:00+00:00", "en", "2024-03-01 15:30"),
+    ("2024-03-01T12:30:00", "ru", "01.03.2024 15:30"),
+    ("2024-03-01T15:30:00+03:00", "de", "2024-03-01 15:30"),
+    ("2024-12-31T22:00:00Z", "ru", "01.01.2025 01:00"),
+])
+def test_format_in_configured_timezone(value, language, expected):
+    assert DateFormatter("Europe/Moscow").format(value, language) == expected
+
+
+def test_dst_transition_uses_zone_rules():
+    formatter = DateFormatter("Europe/Berlin")
+    assert formatter.format("2024-03-31T00:30:00Z", "en") == "2024-03-31 01:30"
+    assert formatter.format("2024-03-31T01:30:00Z", "en") == "2024-03-31 03:30"
+
+
+def test_unparseable_values_are_returned_as_is():
+    formatter = DateFormatter("UTC")
+    assert formatter.format("not a date", "ru") == "not a date"
+    assert formatter.format(None, "ru") is None
+    assert formatter.format_many(["2024-01-02T03:04:05Z", "", None], "en") == ["2024-01-02 03:04", "", None]
+
+
+def test_unknown_timezone_falls_back_to_utc():
+    assert DateFormatter("Mars/Olympus").tz is get_zone("UTC")
+
+
+def test_minutes_until_handles_aware_timestamps():
+    now = datetime(2024, 1, 1, 12, 0, tzinfo=timezone.utc)
+    formatter = DateFormatter("UTC")
+    assert formatter.minutes_until("2024-01-01T12:15:30Z", now=now) == 15
+    assert formatter.minutes_until("2024-01-01T15:15:30+03:00", now=now) == 15
+    assert formatter.minutes_until("2024-01-01T12:15:30", now=now) == 15
+    assert formatter.minutes_until("2024-01-01T11:00:00Z", now=now) == 0
+    assert formatter.minutes_until("garbage", now=now) == 0
+
+
+def test_calculate_minutes_until_expiry_no_longer_returns_zero():
+    expires_at = (datetime.now(timezone.utc) + timedelta(minutes=30, seconds=30)).isoformat().replace("+00:00", "Z")
+    assert calculate_minutes_until_expiry(expires_at) == 30
+    assert format_date("2024-01-02T03:04:05Z", "en") == "2024-01-02 03:04"
+
+
+def _naive_format(value: str, language: str) -> str:
+    dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    return dt.astimezone(get_zone("Europe/Moscow")).strftime("%d.%m.%Y %H:%M" if language == "ru" else "%Y-%m-%d %H:%M")
+
+
+def test_repeated_timestamps_are_served_from_cache():
+    # Типичная страница истории: 20 платежей, даты повторяются между запросами
+    # (сравнение по времени — benchmarks/bench_date_formatter.py)
+    values = [f"2024-01-{day:02d}T10:00:00Z" for day in range(1, 21)]
+    formatter = DateFormatter("Europe/Moscow")
+    assert formatter.format_many(values, "ru") == [_naive_format(v, "ru") for v in values]
+    first = formatter._format.cache_info()
+    assert (first.hits, first.misses) == (0, 20)
+
+    for _ in range(3):
+        assert formatter.format_many(values, "ru") == [_naive_format(v, "ru") for v in values]
+    repeated = formatter._format.cache_info()
+    assert (repeated.hits, repeated.misses) == (60, 20)
+    # Разбор не повторяется: та же строка на другом языке берёт datetime из кеша parse
+    formatter.format_many(values, "en")
+    assert formatter.parse.cache_info().misses == 20
@@ -0,0 +1,87 @@
+from typing import Literal
+
+import pytest
+from aiogram import F, Router
+from aiogram.dispatcher.event.bases import UNHANDLED, SkipHandler
+from aiogram.filters import StateFilter
+from aiogram.filters.callback_data import CallbackData
+from aiogram.fsm.state import State, StatesGroup
+from aiogram.types import CallbackQuery, User
+
+from src.bot.dispatch import IndexedRouter
+from src.keyboards.factories import PaymentCallback
+
+
+class DispatchSG(StatesGroup):
+    idle = State()
+    pending = State()
+
+
+class ItemCallback(CallbackData, prefix="it"):
+    action: Literal["open", "close"]
+    item_id: int
+
+
+def _query(data: str) -> CallbackQuery:
+    return CallbackQuery(
+        id="1",
+        from_user=User(id=1, is_bot=False, first_name="u"),
+        chat_instance="c",
+        data=data,
+    )
+
+
+def _populate(router: Router) -> None:
+    def named(name):
+        async def handler(callback: CallbackQuery):
+            return name
+        return handler
+
+    async def skipping(callback: CallbackQuery):
+        raise SkipHandler()
+
+    cq = router.callback_query
+    cq.register(named("item-open"), StateFilter(DispatchSG.idle), ItemCallback.filter(F.action == "open"))
+    cq.register(skipping, ItemCallback.filter(F.action == "close"))
+    cq.register(named("item-close"), StateFilter("*"), ItemCallback.filter(F.action == "close"))
+    cq.register(named("pay-check"), StateFilter(DispatchSG.pending), PaymentCallback.filter(F.action.in_({"check", "cancel"})))
+    cq.register(named("pay-any"), PaymentCallback.filter())
+    cq.register(named("raw"), F.data == "back")
+
+
+CASES = [
+    ("it:open:1", DispatchSG.idle.state),
+    ("it:open:1", DispatchSG.pending.state),
+    ("it:close:1", None),
+    (PaymentCallback(action="check", payment_id="p1").pack(), DispatchSG.pending.state),
+    (PaymentCallback(action="check", payment_id="p1").pack(), DispatchSG.idle.state),
+    (PaymentCallback(action="terms").pack(), DispatchSG.pending.state),
+    ("pay:%%%", DispatchSG.pending.state),
+    ("back", None),
+    ("unknown:1", DispatchSG.idle.state),
+]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("data,raw_state", CASES)
+async def test_indexed_router_matches_plain_router(data, raw_state):
+    plain, indexed = Router(), IndexedRouter()
+    _populate(plain)
+    _populate(indexed)
+    event = _query(data)
+    expected = await plain.callback_query.trigger(event, raw_state=raw_state)
+    assert await indexed.callback_query.trigger(event, raw_state=raw_state) == expected
+
+
+@pytest.mark.asyncio
+async def test_registration_after_dispatch_rebuilds_index():
+    router = IndexedRouter()
+    _populate(router)
+    event = _query("it:open:1")
+    assert await router.callback_query.trigger(event, raw_state=None) is UNHANDLED
+
+    async def late(callback: CallbackQuery):
+        return "late"
+
+    router.callback_query.register(late, ItemCallback.filter(F.action == "open"))
+    assert await router.callback_query.trigger(event, raw_state=None) == "late"
@@ -7,6 +7,7 @@ from aiohttp import web
 from src.bot.internal_server import _build_app
 from src.bot.config import config
 from src.clients.backend_api import api_client
+from src.monitoring.metrics import notify_snapshots
 
 
 class FakeBot:
@@ -28,6 +29,8 @@ class FakeBot:
 class FakeRedisHelper:
     def __init__(self):
         self.ctx = {}
+        self.render = {}
+        self.ended = []
 
     async def get_payment_context(self, payment_id: str):
         return self.ctx.get(payment_id)
@@ -39,6 +42,15 @@ class FakeRedisHelper:
     async def clear_payment_context(self, payment_id: str):
         self.ctx.pop(payment_id, None)
 
+    async def end_payment_intent(self, payment_id: str):
+        self.ended.append(payment_id)
+
+    async def get_render_hash(self, chat_id: int, message_id: int):
+        return self.render.get((chat_id, message_id))
+
+    async def set_render_hash(self, chat_id: int, message_id: int, digest: str):
+        self.render[(chat_id, message_id)] = digest
+
 
 @pytest.mark.asyncio
 async def test_internal_notify_paid(monkeypatch):
@@ -52,7 +64,7 @@ async def test_internal_notify_paid(monkeypatch):
     config.bot_internal_webhook_token = "testtoken"
 
     # Мокаем Backend API ответы
-    async def fake_make_request(method, endpoint, data=None, params=None, idempotency_key=None):
+    async def fake_make_request(method, endpoint, data=None, params=None, idempotency_key=None, route=None):
         if endpoint.startswith("/payments/"):
             return {"id": "pay1", "status": "paid", "expires_at": "2099-01-01T00:00:00Z"}
         if endpoint.startswith("/subscriptions/"):
@@ -76,8 +88,56 @@ async def test_internal_notify_paid(monkeypatch):
         assert resp.status == 200
         # Проверяем, что бот отрисовал успех
         assert any("Оплата получена" in call[3] for call in fake_bot.calls)
+        assert fake_redis.ended == ["pay1"]
     finally:
         await client.close()
         await server.close()
         config.bot_internal_webhook_token = old_token
 
+
+
+@pytest.mark.asyncio
+async def test_internal_notify_paid_uses_embedded_snapshot(monkeypatch):
+    fake_bot = FakeBot()
+    fake_redis = FakeRedisHelper()
+    fake_redis.ctx["pay2"] = {"tg_id": 111, "subscription_id": 123, "message_id": 1}
+
+    old_token = config.bot_internal_webhook_token
+    config.bot_internal_webhook_token = "testtoken"
+    backend_calls = []
+
+    async def fake_make_request(method, endpoint, data=None, params=None, idempotency_key=None, route=None):
+        backend_calls.append(endpoint)
+        return {}
+
+    monkeypatch.setattr(api_client, "_make_request", fake_make_request)
+    snapshot_hits = notify_snapshots.labels("subscription", "hit")
+    hits_before = snapshot_hits.value
+
+    app = _build_app(fake_bot, fake_redis)
+    server = TestServer(app)
+    await server.start_server()
+    client = TestClient(server)
+    await client.start_server()
+
+    try:
+        resp = await client.post(
+            config.internal_webhook_path,
+            headers={"X-Internal-Token": "testtoken"},
+            json={
+                "payment_id": "pay2",
+                "status": "paid",
+                "version": 1,
+                "subscription": {"id": 123, "until_date": "2025-01-01T00:00:00Z"},
+            },
+        )
+        assert resp.status == 200
+        assert backend_calls == []
+        assert any("Оплата получена" in call[3] for call in fake_bot.calls)
+        assert snapshot_hits.value == hits_before + 1
+        metrics = await (await client.get("/metrics")).text()
+        assert 'bot_notify_snapshots_total{snapshot="subscription",result="hit"}' in metrics
+    finally:
+        await client.close()
+        await server.close()
+        config.bot_internal_webhook_token = old_token
@@ -0,0 +1,49 @@
+import asyncio
+import pytest
+
+from src.services.edit_coalescer import EditCoalescer
+
+
+class FakeBot:
+    def __init__(self, fail: bool = False):
+        self.calls = []
+        self.fail = fail
+
+    async def edit_message_text(self, chat_id, message_id, text, reply_markup=None):
+        if self.fail:
+            raise RuntimeError("message to edit not found")
+        self.calls.append((chat_id, message_id, text))
+
+
+@pytest.mark.asyncio
+async def test_rapid_edits_collapse_to_latest():
+    bot = FakeBot()
+    coalescer = EditCoalescer(bot, window=0.05)
+    for text in ("created", "pending", "pending 2"):
+        await coalescer.edit(1, 10, text)
+    assert bot.calls == []
+    await asyncio.sleep(0.1)
+    assert bot.calls == [(1, 10, "pending 2")]
+
+
+@pytest.mark.asyncio
+async def test_same_render_is_skipped_and_immediate_flushes():
+    bot = FakeBot()
+    coalescer = EditCoalescer(bot, window=0.05)
+    await coalescer.edit(1, 10, "paid", immediate=True)
+    await coalescer.edit(1, 10, "paid", immediate=True)
+    assert bot.calls == [(1, 10, "paid")]
+
+
+@pytest.mark.asyncio
+async def test_error_goes_to_fallback_and_aclose_flushes():
+    bot = FakeBot(fail=True)
+    errors = []
+
+    async def on_error(e):
+        errors.append(e)
+
+    coalescer = EditCoalescer(bot, window=10)
+    await coalescer.edit(1, 10, "pending", on_error=on_error)
+    await coalescer.aclose()
+    assert len(errors) == 1
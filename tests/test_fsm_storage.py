@@ -0,0 +1,92 @@
+import pytest
+from aiogram.fsm.context import FSMContext
+from aiogram.fsm.state import State, StatesGroup
+from aiogram.fsm.storage.base import StorageKey
+from aiogram.fsm.storage.redis import DefaultKeyBuilder, RedisStorage
+from fakeredis.aioredis import FakeRedis
+
+from src.storage.fsm import CachedRedisStorage
+
+KEY = StorageKey(bot_id=1, chat_id=10, user_id=10)
+
+
+class SG(StatesGroup):
+    idle = State()
+    busy = State()
+
+
+class CountingRedis(FakeRedis):
+    """Считает пайплайны: один на чтение записи и один на сброс изменений"""
+
+    pipelines = 0
+
+    def pipeline(self, *args, **kwargs):
+        self.pipelines += 1
+        return super().pipeline(*args, **kwargs)
+
+
+def _storage(idle_ttl=None):
+    redis = CountingRedis()
+    storage = CachedRedisStorage(RedisStorage(redis, key_builder=DefaultKeyBuilder(prefix="t:fsm")), idle_ttl=idle_ttl)
+    return storage, redis
+
+
+@pytest.mark.asyncio
+async def test_unchanged_state_and_data_are_not_written():
+    storage, redis = _storage()
+    await redis.set("t:fsm:10:10:state", SG.idle.state)
+    await redis.set("t:fsm:10:10:data", '{"page": 1}')
+    context = FSMContext(storage, KEY)
+
+    async with storage.scope():
+        assert await context.get_state() == SG.idle.state
+        await context.set_state(SG.idle)
+        await context.update_data(page=1)
+        data = await context.get_data()
+        data["page"] = 99  # изменение копии не должно попасть в кеш
+        assert await context.get_data() == {"page": 1}
+    assert redis.pipelines == 1  # только чтение
+
+
+@pytest.mark.asyncio
+async def test_changes_are_flushed_once_with_idle_ttl():
+    storage, redis = _storage(idle_ttl=600)
+    context = FSMContext(storage, KEY)
+    # Состояние, прочитанное до scope (как в FSMContextMiddleware), подхватывается кешем
+    assert await context.get_state() is None
+    async with storage.scope():
+        await context.set_state(SG.busy)
+        await context.update_data(step=1)
+        await context.update_data(step=2)
+        assert await redis.get("t:fsm:10:10:state") is None
+    assert redis.pipelines == 2
+    assert await redis.get("t:fsm:10:10:state") == SG.busy.state.encode()
+    assert await redis.get("t:fsm:10:10:data") == b'{"step": 2}'
+    assert await redis.ttl("t:fsm:10:10:data") == 600
+
+    async with storage.scope():
+        await context.set_state(None)
+        await context.set_data({})
+    assert await redis.exists("t:fsm:10:10:state", "t:fsm:10:10:data") == 0
+
+
+@pytest.mark.asyncio
+async def test_idle_ttl_is_refreshed_only_when_half_spent():
+    storage, redis = _storage(idle_ttl=600)
+    await redis.set("t:fsm:10:10:state", SG.idle.state, ex=500)
+    async with storage.scope():
+        await storage.get_state(KEY)
+    assert await redis.ttl("t:fsm:10:10:state") == 500
+
+    await redis.expire("t:fsm:10:10:state", 100)
+    async with storage.scope():
+        await storage.get_state(KEY)
+    assert await redis.ttl("t:fsm:10:10:state") == 600
+
+
+@pytest.mark.asyncio
+async def test_writes_outside_scope_go_straight_to_redis():
+    storage, redis = _storage()
+    await storage.set_state(KEY, SG.idle)
+    await storage.set_data(KEY, {"a": 1})
+    assert await RedisStorage(redis, key_builder=DefaultKeyBuilder(prefix="t:fsm")).get_data(KEY) == {"a": 1}
@@ -0,0 +1,41 @@
+import uuid
+
+import pytest
+from fakeredis.aioredis import FakeRedis
+
+from src.storage.redis_helper import RedisHelper
+from src.utils.idempotency import payment_idempotency_key, payment_intent
+
+
+def test_key_is_stable_for_the_same_window_start():
+    intent = payment_intent(1, 2, "yookassa", "m1")
+    a = payment_idempotency_key(intent, started_at=600.0)
+    assert a == payment_idempotency_key(intent, started_at=600.0)
+    assert uuid.UUID(a).version == 5
+
+
+def test_key_changes_with_inputs_and_window_start():
+    base = payment_idempotency_key(payment_intent(1, 2, "yookassa", "m1"), started_at=600.0)
+    assert base != payment_idempotency_key(payment_intent(1, 2, "yookassa", "m1"), started_at=600.5)
+    assert base != payment_idempotency_key(payment_intent(1, 2, "paypal", "m1"), started_at=600.0)
+    assert base != payment_idempotency_key(payment_intent(1, 2, "yookassa", "m3"), started_at=600.0)
+    assert base != payment_idempotency_key(payment_intent(3, 2, "yookassa", "m1"), started_at=600.0)
+
+
+@pytest.mark.asyncio
+async def test_window_is_anchored_to_first_tap_and_closed_by_terminal_status():
+    redis = FakeRedis()
+    helper = RedisHelper(redis)
+    intent = payment_intent(1, 2, "yookassa", "m1")
+
+    first = await helper.claim_payment_idempotency_key(intent, "key-1", 300)
+    # Второе нажатие в окне (даже «через границу» часов) получает ключ первого
+    assert await helper.claim_payment_idempotency_key(intent, "key-2", 300) == first == "key-1"
+    assert 0 < await redis.ttl(helper._make_key("idempotency", intent, "key")) <= 300
+
+    await helper.set_payment_result(first, {"payment_id": "p1", "expires_at": "x"}, 300)
+    await helper.set_payment_context("p1", 1, 2, 10, intent=intent)
+    await helper.end_payment_intent("p1")
+    assert await helper.get_payment_result(first) is None
+    # После неуспеха/отмены «Повторить» открывает новое окно с новым ключом
+    assert await helper.claim_payment_idempotency_key(intent, "key-3", 300) == "key-3"
@@ -0,0 +1,71 @@
+import json
+
+import pytest
+from fakeredis.aioredis import FakeRedis
+
+from src.bot.config import config
+from src.storage.lifecycle import KeyLifecycleManager, namespace_of, payment_context_ttl
+from src.storage.redis_helper import RedisHelper
+
+P = config.redis_key_prefix
+T0 = 1_700_000_000
+
+
+def _iso(ts: float) -> str:
+    from datetime import datetime, timezone
+    return datetime.fromtimestamp(ts, timezone.utc).isoformat()
+
+
+def test_payment_context_ttl_follows_expiry():
+    assert payment_context_ttl(_iso(T0 + 900), now=T0) == 900 + config.payment_context_grace
+    assert payment_context_ttl(_iso(T0 - 10 * 86400), now=T0) == 60
+    assert payment_context_ttl(_iso(T0 + 10 * 86400), now=T0) == 86400
+    assert payment_context_ttl(None) == 86400
+    assert payment_context_ttl("garbage") == 86400
+
+
+def test_namespace_of():
+    assert namespace_of(f"{P}page:1:subs", P) == "page"
+    assert namespace_of(f"{P}fsm:1:1:state", P) == "fsm:state"
+    assert namespace_of(f"{P}fsm:1:1:data", P) == "fsm:data"
+    assert namespace_of("rate_limit:1", P) == "other"
+
+
+@pytest.mark.asyncio
+async def test_helper_writes_keys_with_ttl():
+    redis = FakeRedis()
+    helper = RedisHelper(redis)
+    await helper.set_page(1, "subs", 2)
+    await helper.push_screen(1, {"screen": "main"})
+    await helper.set_payment_context("p1", 1, 5, 10)
+    await redis.expire(f"{P}payment:p1:context", 500)
+    await helper.update_payment_message_id("p1", 11)
+
+    assert 0 < await redis.ttl(f"{P}page:1:subs") <= config.page_ttl
+    assert 0 < await redis.ttl(f"{P}navstack:1") <= config.navstack_ttl
+    assert 0 < await redis.ttl(f"{P}payment:p1:context") <= 500
+    assert (await helper.get_payment_context("p1"))["message_id"] == 11
+
+
+@pytest.mark.asyncio
+async def test_migration_sets_missing_ttls_and_shortens_contexts():
+    redis = FakeRedis()
+    await redis.set(f"{P}page:1:subs", 1)
+    await redis.set(f"{P}fsm:1:1:state", "S")
+    await redis.set(f"{P}unknown:1", 1)
+    await redis.setex(f"{P}payment:p1:context", 86400, json.dumps({"expires_at": _iso(T0 + 600)}))
+    manager = KeyLifecycleManager(redis, prefix=P, batch_size=2)
+
+    stats = await manager.stats()
+    assert stats["page"].no_ttl == 1 and stats["payment"].no_ttl == 0
+
+    report = await manager.migrate(dry_run=True, now=T0)
+    assert dict(report.updated) == {"page": 1, "fsm:state": 1, "payment": 1}
+    assert await redis.ttl(f"{P}page:1:subs") == -1
+
+    await manager.migrate(now=T0)
+    assert await redis.ttl(f"{P}page:1:subs") == config.page_ttl
+    assert await redis.ttl(f"{P}fsm:1:1:state") == config.fsm_ttl
+    assert await redis.ttl(f"{P}payment:p1:context") == 600 + config.payment_context_grace
+    assert await redis.ttl(f"{P}unknown:1") == -1
+    assert dict((await manager.migrate(now=T0)).updated) == {}
@@ -0,0 +1,37 @@
+from src.keyboards.cache import clear_keyboard_caches, keyboard_cache_info, prebuild_keyboards
+from src.keyboards.inline import (
+    get_payment_method_select_keyboard,
+    get_payment_waiting_keyboard,
+    get_subscription_detail_keyboard,
+)
+from src.keyboards.reply import get_main_keyboard
+
+PLANS = [{"code": "m1", "amount": 299, "currency": "RUB"}]
+
+
+def test_static_keyboards_are_prebuilt_per_language():
+    clear_keyboard_caches()
+    assert prebuild_keyboards(("ru", "en")) > 0
+    assert keyboard_cache_info()["get_main_keyboard"]["currsize"] == 2
+    assert get_main_keyboard("ru") is get_main_keyboard("ru")
+    assert get_main_keyboard("ru") is not get_main_keyboard("en")
+
+
+def test_parameterized_keyboards_are_keyed_by_arguments():
+    first = get_subscription_detail_keyboard(1, "ru")
+    assert get_subscription_detail_keyboard(1, "ru") is first
+    assert get_subscription_detail_keyboard(2, "ru") is not first
+    assert get_payment_waiting_keyboard("p1", None, None, "en").inline_keyboard[0][0].text == "Check Status"
+
+
+def test_list_arguments_are_normalized_for_cache():
+    keyboard = get_payment_method_select_keyboard(["yookassa"], PLANS, 5, "ru")
+    assert get_payment_method_select_keyboard(["yookassa"], list(PLANS), 5, "ru") is keyboard
+    assert keyboard.inline_keyboard[0][0].text == "YOOKASSA - m1 (299 RUB)"
+
+
+def test_clear_drops_cached_instances():
+    keyboard = get_main_keyboard("ru")
+    clear_keyboard_caches()
+    assert get_main_keyboard("ru") is not keyboard
+    assert get_main_keyboard("ru") == keyboard
@@ -0,0 +1,95 @@
+import pytest
+from fakeredis.aioredis import FakeRedis
+
+from src.storage.keyspace import KeyspaceAnalyzer, format_report, ttl_bucket
+from src.storage.lifecycle import KeyLifecycleManager
+
+P = "test:"
+
+
+async def _populate(redis):
+    for i in range(20):
+        await redis.set(f"{P}page:{i}:subs", 1, ex=600)
+    await redis.set(f"{P}navstack:1", "x" * 1000)
+    await redis.set(f"{P}fsm:1:1:data", "{}", ex=90000)
+    await redis.set("other:1", 1)
+
+
+class SizedKeyspace:
+    """Минимальный Redis с MEMORY USAGE (в fakeredis его нет): размер = длина значения + 50"""
+
+    def __init__(self, redis):
+        self.redis = redis
+        self.memory_calls = 0
+
+    async def scan(self, cursor, match=None, count=None):
+        return await self.redis.scan(cursor, match=match, count=count)
+
+    def pipeline(self, transaction=False):
+        return _SizedPipeline(self)
+
+
+class _SizedPipeline:
+    def __init__(self, keyspace):
+        self.keyspace = keyspace
+        self.redis = keyspace.redis
+        self.calls = []
+
+    def ttl(self, key):
+        self.calls.append(self.redis.ttl(key))
+
+    def memory_usage(self, key, samples=None):
+        self.keyspace.memory_calls += 1
+        self.calls.append(self._size(key))
+
+    async def _size(self, key):
+        return len(await self.redis.get(key) or b"") + 50
+
+    async def execute(self, raise_on_error=True):
+        return [await call for call in self.calls]
+
+
+def test_ttl_bucket():
+    assert ttl_bucket(-1) == "no_ttl"
+    assert ttl_bucket(60) == "<1h"
+    assert ttl_bucket(90000) == "<7d"
+    assert ttl_bucket(10**7) == ">=7d"
+
+
+@pytest.mark.asyncio
+async def test_report_counts_ttls_and_largest_keys():
+    redis = FakeRedis()
+    await _populate(redis)
+    report = await KeyspaceAnalyzer(SizedKeyspace(redis), prefix=P, sample_rate=1, top=2, scan_count=5, pause=0).analyze()
+
+    assert report.scanned == 22
+    assert set(report.namespaces) == {"page", "navstack", "fsm:data"}
+    assert report.namespaces["page"].keys == 20
+    assert report.namespaces["page"].ttl == {"<1h": 20}
+    assert report.namespaces["navstack"].ttl == {"no_ttl": 1}
+    assert report.namespaces["navstack"].top() == [(1050, f"{P}navstack:1")]
+    assert len(report.namespaces["page"].largest) == 2
+    assert format_report(report).splitlines()[2].startswith("navstack: 1 keys")
+
+
+@pytest.mark.asyncio
+async def test_sampling_truncation_and_missing_memory_command():
+    redis = FakeRedis()
+    await _populate(redis)
+    report = await KeyspaceAnalyzer(redis, prefix=P, sample_rate=0.5, pause=0, max_keys=10).analyze()
+    assert report.scanned == 10 and report.truncated
+    assert not report.memory_available
+    assert "MEMORY USAGE unavailable" in format_report(report)
+
+
+@pytest.mark.asyncio
+async def test_lifecycle_stats_sample_memory_through_analyzer():
+    redis = FakeRedis()
+    await _populate(redis)
+    sized = SizedKeyspace(redis)
+    stats = await KeyLifecycleManager(sized, prefix=P, batch_size=5).stats(sample_rate=0.25)
+    # MEMORY USAGE — для каждого 4-го из 22 ключей бота, а не для всех
+    assert sized.memory_calls == 6
+    assert stats["page"].keys == 20 and stats["page"].no_ttl == 0
+    assert stats["navstack"].no_ttl == 1
+    assert stats["page"].memory_bytes > 0
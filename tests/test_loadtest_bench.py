@@ -0,0 +1,54 @@
+import pytest
+from fakeredis.aioredis import FakeRedis
+
+from loadtest.bench import compare
+from loadtest.fake_backend import FakeBackend, FakeBackendSettings
+from loadtest.fake_telegram import FakeTelegram, FakeTelegramSettings
+from loadtest.harness import Harness, percentile
+from loadtest.scenarios import SCENARIOS
+
+
+def test_percentile_nearest_rank():
+    values = [float(i) for i in range(1, 101)]
+    assert percentile(values, 50) == 50.0
+    assert percentile(values, 99) == 99.0
+    assert percentile([], 95) == 0.0
+
+
+def test_compare_flags_regressions_beyond_tolerance():
+    baseline = {"scenarios": {"start_storm": {"ops_per_sec": 100.0, "p50_ms": 10.0, "p95_ms": 20.0, "p99_ms": 30.0}}}
+    current = {"scenarios": {
+        "start_storm": {"ops_per_sec": 95.0, "p50_ms": 10.5, "p95_ms": 25.0, "p99_ms": 30.0},
+        "broadcast": {"ops_per_sec": 1.0},
+    }}
+    lines, regressions = compare(current, baseline, tolerance=0.1)
+    assert regressions == ["start_storm.p95_ms: 20.0 -> 25.0 (+25.0%)"]
+    assert any("нет в baseline" in line for line in lines)
+
+
+@pytest.mark.asyncio
+async def test_all_scenarios_run_through_dispatcher():
+    backend = FakeBackend(FakeBackendSettings(latency=0, users=30, subscriptions_per_user=25))
+    telegram = FakeTelegram(FakeTelegramSettings(global_rate=1e9, global_burst=10**9, chat_rate=1e9, chat_burst=10**9))
+    await backend.start()
+    await telegram.start()
+    harness = Harness(FakeRedis(), backend, telegram, concurrency=5)
+    await harness.start()
+    try:
+        results = {}
+        for index, (name, scenario) in enumerate(SCENARIOS.items()):
+            first = 1_000_000 * (index + 1)
+            results[name] = (await scenario(harness, list(range(first, first + 6)))).summary()
+    finally:
+        await harness.stop()
+        await telegram.stop()
+        await backend.stop()
+
+    assert all(summary["errors"] == 0 for summary in results.values()), results
+    assert results["start_storm"]["operations"] == 6
+    assert results["pagination"]["operations"] == 6 * 6
+    assert results["renew_storm"]["payments_created"] == 6
+    assert results["payment_notify_storm"]["statuses"] == {"200": 6}
+    assert results["broadcast"]["operations"] == 30
+    # Каждая подписка-деталь и выбор способа оплаты редактируют сообщение, а не шлют новое
+    assert telegram.counts["editMessageText"] > 0
@@ -0,0 +1,112 @@
+import httpx
+import pytest
+from aiogram import Bot
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.telegram import TelegramAPIServer
+from aiogram.exceptions import TelegramBadRequest, TelegramForbiddenError, TelegramRetryAfter
+
+from loadtest.fake_backend import FakeBackend, FakeBackendSettings
+from loadtest.fake_telegram import FakeTelegram, FakeTelegramSettings
+from src.clients.backend_api import BackendAPIClient, BackendServerError, BackendUnauthorizedError
+
+TOKEN = "42:fake-token"
+
+
+def _client(url: str) -> BackendAPIClient:
+    client = BackendAPIClient()
+    client.base_url = url
+    return client
+
+
+@pytest.mark.asyncio
+async def test_fake_backend_follows_client_contracts():
+    async with FakeBackend(FakeBackendSettings(latency=0, subscriptions_per_user=12, users=25)) as backend:
+        client = _client(backend.url)
+        try:
+            user = await client.get_user(100001)
+            assert user == {"tg_id": 100001, "language": "ru", "used_bot_before": False}
+            await client.update_user_language(100001, "en")
+            assert (await client.get_user(100001))["language"] == "en"
+
+            page = await client.get_user_subscriptions(100001, page=2)
+            assert (page["page"], page["pages"], len(page["items"])) == (2, 2, 2)
+            subscription = await client.get_subscription(page["items"][0]["id"])
+            options = await client.get_service_payment_options(subscription["service_id"])
+            assert options["providers"] and options["plans"][0]["currency"] == "USD"
+
+            first = await client.create_payment(100001, 1, "m1", "paypal", idempotency_key="k1")
+            again = await client.create_payment(100001, 1, "m1", "paypal", idempotency_key="k1")
+            assert first == again and first["expires_at"].endswith("Z")
+            assert (await client.get_payment(first["payment_id"]))["status"] == "pending"
+
+            recipients = await client.get_broadcast_recipients("all", limit=20)
+            rest = await client.get_broadcast_recipients("all", cursor=recipients["next_cursor"], limit=20)
+            assert len(recipients["items"]) + len(rest["items"]) == 25 and "next_cursor" not in rest
+        finally:
+            await client.aclose()
+        assert backend.requests["GET /users/{tg_id}"] == 2
+
+
+@pytest.mark.asyncio
+async def test_fake_backend_injects_errors_and_checks_token():
+    settings = FakeBackendSettings(latency=0, error_rate=1.0, error_status=503, token="secret")
+    async with FakeBackend(settings) as backend:
+        client = _client(backend.url)
+        try:
+            with pytest.raises(BackendUnauthorizedError):
+                await client.get_user(1)
+            client.client.headers["Authorization"] = "Bearer secret"
+            client.default_headers["Authorization"] = "Bearer secret"
+            with pytest.raises(BackendServerError) as info:
+                await client.get_user(1)
+            assert info.value.status == 503
+        finally:
+            await client.aclose()
+        assert backend.errors_injected == 1
+
+
+@pytest.mark.asyncio
+async def test_fake_telegram_records_calls_and_enforces_limits():
+    settings = FakeTelegramSettings(chat_rate=1.0, chat_burst=2, blocked=frozenset({13}))
+    async with FakeTelegram(settings) as telegram:
+        bot = Bot(TOKEN, session=AiohttpSession(api=TelegramAPIServer.from_base(telegram.url)))
+        try:
+            me = await bot.get_me()
+            assert me.username == "fake_bot"
+
+            message = await bot.send_message(7, "hello")
+            await bot.send_message(7, "again")
+            with pytest.raises(TelegramRetryAfter) as info:
+                await bot.send_message(7, "too fast")
+            assert info.value.retry_after >= 1
+            # Лимит на чат: другой чат не затронут
+            await bot.send_message(8, "other chat")
+
+            telegram.reset()
+            await bot.edit_message_text("edited", chat_id=7, message_id=message.message_id)
+            with pytest.raises(TelegramBadRequest, match="message is not modified"):
+                await bot.edit_message_text("edited", chat_id=7, message_id=message.message_id)
+            with pytest.raises(TelegramForbiddenError):
+                await bot.send_message(13, "blocked")
+        finally:
+            await bot.session.close()
+        assert telegram.counts["editMessageText"] == 2
+        assert telegram.calls_for("editMessageText")[0].params["text"] == "edited"
+
+
+@pytest.mark.asyncio
+async def test_fake_telegram_serves_pushed_updates():
+    async with FakeTelegram() as telegram:
+        update_id = telegram.push_update({
+            "message": {
+                "message_id": 1, "date": 0, "chat": {"id": 5, "type": "private"},
+                "from": {"id": 5, "is_bot": False, "first_name": "U"}, "text": "/start",
+            },
+        })
+        async with httpx.AsyncClient() as client:
+            response = await client.post(f"{telegram.url}/bot{TOKEN}/getUpdates", json={"timeout": 1})
+            assert [u["update_id"] for u in response.json()["result"]] == [update_id]
+            response = await client.post(
+                f"{telegram.url}/bot{TOKEN}/getUpdates", json={"offset": update_id + 1, "timeout": 0}
+            )
+            assert response.json()["result"] == []
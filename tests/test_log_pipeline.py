@@ -0,0 +1,73 @@
+import io
+import json
+import logging
+
+from src.monitoring.log_pipeline import LogPipeline, TextFormatter, _summary
+from src.monitoring.tracing import Tracer
+
+
+def _pipeline(**kwargs):
+    stream = io.StringIO()
+    pipeline = LogPipeline(stream=stream, **kwargs)
+    logger = logging.getLogger(f"test.pipeline.{id(pipeline)}")
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    logger.addHandler(pipeline.handler)
+    return pipeline, logger, stream
+
+
+def _lines(stream):
+    return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+
+def test_error_storm_collapses_into_counted_line():
+    pipeline, logger, stream = _pipeline(burst=2, window=60)
+    pipeline.start()
+    for i in range(1000):
+        logger.error("Network error: %s", f"timeout #{i}")
+    logger.warning("other message")
+    pipeline.stop()
+
+    lines = _lines(stream)
+    errors = [line for line in lines if line["level"] == "ERROR"]
+    assert [line["msg"] for line in errors[:2]] == ["Network error: timeout #0", "Network error: timeout #1"]
+    assert errors[2]["suppressed"] == 998
+    assert errors[2]["msg"] == "998 similar records suppressed, last: Network error: timeout #999"
+    assert len(errors) == 3
+    assert any(line["msg"] == "other message" for line in lines)
+
+
+def test_json_fields_request_id_extra_and_exception():
+    pipeline, logger, stream = _pipeline()
+    pipeline.start()
+    with Tracer().trace("update message") as trace:
+        logger.info("handled", extra={"tg_id": 42})
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        logger.exception("failed")
+    pipeline.stop()
+
+    handled, failed = _lines(stream)
+    assert handled["request_id"] == trace.trace_id
+    assert handled["tg_id"] == 42
+    assert "ValueError: boom" in failed["exc"]
+
+
+def test_full_queue_drops_instead_of_blocking():
+    pipeline, logger, stream = _pipeline(queue_size=3, burst=0)
+    for i in range(10):
+        logger.info("line %d", i)
+    assert pipeline.handler.dropped == 7
+    pipeline.start()
+    pipeline.stop()
+    lines = _lines(stream)
+    assert [line["msg"] for line in lines[:3]] == ["line 0", "line 1", "line 2"]
+    assert lines[-1]["msg"] == "log queue full, dropped 7 records"
+
+
+def test_text_summary_reports_similar_records():
+    record = logging.makeLogRecord({"name": "x", "levelname": "ERROR", "msg": "Network error: %s", "args": ("timeout",)})
+    assert TextFormatter().format(_summary(record, 3)).endswith(
+        "ERROR - 3 similar records suppressed, last: Network error: timeout"
+    )
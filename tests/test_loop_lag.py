@@ -0,0 +1,55 @@
+import asyncio
+import time
+
+import pytest
+from aiohttp.test_utils import TestClient, TestServer
+
+from src.bot.config import config
+from src.bot.internal_server import _build_app
+from src.monitoring.loop_lag import LoopLagMonitor, loop_monitor
+
+
+def blocking_json_parse(seconds: float) -> None:
+    time.sleep(seconds)
+
+
+@pytest.mark.asyncio
+async def test_stall_is_sampled_with_offending_stack():
+    monitor = LoopLagMonitor(interval=0.01, threshold=0.05)
+    await monitor.start()
+    try:
+        await asyncio.sleep(0.05)
+        blocking_json_parse(0.3)
+        await asyncio.sleep(0.05)
+    finally:
+        await monitor.stop()
+
+    stalls = monitor.stalls()
+    assert len(stalls) == 1
+    assert "blocking_json_parse" in stalls[0]["stack"]
+    # После восстановления записана полная длительность зависания
+    assert stalls[0]["lag"] >= 0.25
+
+
+@pytest.mark.asyncio
+async def test_no_samples_when_loop_is_responsive():
+    monitor = LoopLagMonitor(interval=0.01, threshold=0.2)
+    await monitor.start()
+    await asyncio.sleep(0.1)
+    await monitor.stop()
+    assert monitor.stalls() == []
+
+
+@pytest.mark.asyncio
+async def test_stalls_endpoint_requires_token(monkeypatch):
+    monkeypatch.setattr(config, "bot_internal_webhook_token", "t")
+    loop_monitor.samples.append({"at": 1.0, "lag": 0.5, "stack": "frame"})
+    client = TestClient(TestServer(_build_app(None, None)))
+    await client.start_server()
+    try:
+        assert (await client.get("/internal/loop/stalls")).status == 401
+        resp = await client.get("/internal/loop/stalls", headers={"X-Internal-Token": "t"})
+        assert (await resp.json())["stalls"][0]["stack"] == "frame"
+    finally:
+        loop_monitor.samples.clear()
+        await client.close()
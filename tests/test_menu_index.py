@@ -0,0 +1,80 @@
+import datetime
+import json
+import shutil
+
+import pytest
+from aiogram.types import Chat, Message, User
+
+from src.i18n.translations import LOCALES_DIR, TranslationError, Translations
+from src.keyboards.menu import MAIN_MENU_KEYS, MenuButton, MenuTextIndex, menu_index
+from src.routers import user as user_router
+
+answers = []
+
+
+class FakeMessage(Message):
+    async def answer(self, text, *args, **kwargs):
+        answers.append(text)
+
+
+def make_message(text: str) -> FakeMessage:
+    return FakeMessage(
+        message_id=1,
+        date=datetime.datetime.now(),
+        chat=Chat(id=1, type="private"),
+        from_user=User(id=1, is_bot=False, first_name="u"),
+        text=text,
+    )
+
+
+def test_labels_of_every_language_resolve_to_one_key():
+    assert menu_index.resolve("Подписки") == "menu.main.subscriptions"
+    assert menu_index.resolve("Subscriptions") == "menu.main.subscriptions"
+    assert menu_index.resolve("FAQ") == "menu.main.faq"
+    assert menu_index.resolve("подписки") is None
+    assert menu_index.resolve(None) is None
+
+
+def _catalogs(tmp_path, **extra):
+    for language in ("ru", "en"):
+        shutil.copy(LOCALES_DIR / f"{language}.json", tmp_path / f"{language}.json")
+    for language, catalog in extra.items():
+        (tmp_path / f"{language}.json").write_text(json.dumps(catalog), encoding="utf-8")
+    return Translations(tmp_path)
+
+
+def test_every_language_catalog_is_indexed(tmp_path):
+    index = MenuTextIndex(_catalogs(tmp_path, de={"menu.main.support": "Hilfe"}), MAIN_MENU_KEYS)
+    assert index.resolve("Hilfe") == "menu.main.support"
+    assert index.resolve("Support") == "menu.main.support"
+
+
+def test_conflicting_labels_are_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        MenuTextIndex(_catalogs(tmp_path, de={"menu.main.support": "FAQ"}), MAIN_MENU_KEYS)
+
+
+def test_conflicting_labels_fail_the_reload_before_swap(tmp_path):
+    source = _catalogs(tmp_path)
+    index = MenuTextIndex(source, MAIN_MENU_KEYS)
+    source.add_reload_validator(index.validate)
+    (tmp_path / "de.json").write_text(json.dumps({"menu.main.support": "FAQ"}), encoding="utf-8")
+    with pytest.raises(TranslationError, match="FAQ"):
+        source.build()
+    assert source.languages == ("en", "ru")
+    assert index.resolve("FAQ") == "menu.main.faq"
+
+
+def test_every_menu_key_has_a_handler():
+    assert set(user_router.MENU_HANDLERS) == set(MAIN_MENU_KEYS)
+
+
+@pytest.mark.asyncio
+async def test_menu_button_dispatches_by_action():
+    answers.clear()
+    message = make_message("Support")
+    data = await MenuButton()(message)
+    assert data == {"menu_action": "menu.main.support"}
+    await user_router.handle_menu_button(message, language="en", state=None, is_admin=False, **data)
+    assert answers and answers[0].startswith("Support")
+    assert await MenuButton()(make_message("hello")) is False
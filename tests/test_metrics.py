@@ -0,0 +1,81 @@
+import httpx
+import pytest
+from aiohttp.test_utils import TestClient, TestServer
+from fakeredis.aioredis import FakeRedis
+
+from src.bot.internal_server import _build_app
+from src.bot.middleware import HandlerMetricsMiddleware
+from src.clients.backend_api import BackendAPIClient
+from src.monitoring.metrics import Registry, handler_duration, registry
+from src.storage.redis_helper import RedisHelper
+
+
+def test_render_prometheus_text_format():
+    reg = Registry()
+    hits = reg.counter("hits_total", "Hits", ("route",))
+    depth = reg.gauge("depth", "Depth")
+    latency = reg.histogram("latency_seconds", "Latency", ("route",), buckets=(0.1, 1.0))
+    series = hits.labels("/a")
+    assert hits.labels("/a") is series
+    series.inc()
+    series.inc(2)
+    depth.set(5)
+    latency.labels('say "hi"').observe(0.05)
+    latency.labels('say "hi"').observe(3)
+
+    text = reg.render()
+    assert 'hits_total{route="/a"} 3' in text
+    assert "depth 5" in text
+    assert 'latency_seconds_bucket{route="say \\"hi\\"",le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{route="say \\"hi\\"",le="1"} 1' in text
+    assert 'latency_seconds_bucket{route="say \\"hi\\"",le="+Inf"} 2' in text
+    assert 'latency_seconds_count{route="say \\"hi\\""} 2' in text
+    with pytest.raises(ValueError):
+        hits.labels("a", "b")
+
+
+@pytest.mark.asyncio
+async def test_backend_and_redis_calls_are_recorded():
+    client = BackendAPIClient()
+    client.client = httpx.AsyncClient(transport=httpx.MockTransport(lambda request: httpx.Response(200, json={})))
+    await client.get_user(777001)
+    # Буквенные id (slug) тоже не попадают в метки: шаблон передаёт метод клиента
+    await client.get_subscription("basic-plan")
+    await RedisHelper(FakeRedis()).set_page(1, "subs", 2)
+
+    text = registry.render()
+    assert 'bot_backend_requests_total{method="GET",endpoint="/users/{id}",status="200"}' in text
+    assert 'bot_backend_requests_total{method="GET",endpoint="/subscriptions/{id}",status="200"}' in text
+    assert "777001" not in text and "basic-plan" not in text
+    assert 'bot_redis_operation_duration_seconds_count{op="set_page"}' in text
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_menu_actions_get_their_own_handler_series():
+    async def handle_menu_button(event, data):
+        return None
+
+    class Handler:
+        callback = handle_menu_button
+
+    middleware = HandlerMetricsMiddleware("message")
+    await middleware(handle_menu_button, None, {"handler": Handler(), "menu_action": "menu.main.faq"})
+    await middleware(handle_menu_button, None, {"handler": Handler()})
+
+    assert handler_duration.labels("message", "menu.main.faq").count == 1
+    assert handler_duration.labels("message", "handle_menu_button").count >= 1
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint():
+    server = TestServer(_build_app(None, None))
+    client = TestClient(server)
+    await client.start_server()
+    try:
+        resp = await client.get("/metrics")
+        assert resp.status == 200
+        assert resp.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+        assert "# TYPE bot_update_duration_seconds histogram" in await resp.text()
+    finally:
+        await client.close()
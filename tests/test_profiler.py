@@ -0,0 +1,84 @@
+import asyncio
+
+import pytest
+from aiohttp.test_utils import TestClient, TestServer
+
+from src.bot.config import config
+from src.bot.internal_server import _build_app
+from src.monitoring.profiler import MemorySnapshots, ProfilerBusyError, SamplingProfiler
+
+_leak = []
+
+
+def hot_function(deadline: float) -> None:
+    import time
+    while time.perf_counter() < deadline:
+        pass
+
+
+@pytest.mark.asyncio
+async def test_profile_collapses_stacks_of_busy_code():
+    import time
+    profiler = SamplingProfiler()
+
+    async def busy():
+        await asyncio.sleep(0.02)
+        for _ in range(5):
+            hot_function(time.perf_counter() + 0.03)
+            await asyncio.sleep(0)
+
+    task = asyncio.create_task(busy())
+    folded = await profiler.profile(0.25, interval=0.002)
+    await task
+    lines = folded.strip().splitlines()
+    assert lines and all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+    assert any(line.startswith("MainThread;") and "hot_function (tests/test_profiler.py)" in line for line in lines)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_profile_is_rejected():
+    profiler = SamplingProfiler()
+    first = asyncio.create_task(profiler.profile(0.1))
+    await asyncio.sleep(0.01)
+    with pytest.raises(ProfilerBusyError):
+        await profiler.profile(0.1)
+    await first
+
+
+@pytest.mark.asyncio
+async def test_memory_diff_points_at_growing_allocation():
+    snapshots = MemorySnapshots(max_snapshots=2)
+    try:
+        base = await snapshots.take()
+        _leak.extend(bytearray(1024) for _ in range(2000))
+        await snapshots.take()
+        diff = await snapshots.diff(base["id"])
+        assert diff["size_diff_total"] > 1024 * 1000
+        assert "test_profiler.py" in diff["top"][0]["where"]
+        third = await snapshots.take()
+        assert third["snapshots"] == [2, 3]
+        with pytest.raises(KeyError):
+            await snapshots.diff(base["id"])
+    finally:
+        snapshots.stop()
+        _leak.clear()
+
+
+@pytest.mark.asyncio
+async def test_profiling_endpoints_require_token(monkeypatch):
+    monkeypatch.setattr(config, "bot_internal_webhook_token", "t")
+    client = TestClient(TestServer(_build_app(None, None)))
+    await client.start_server()
+    headers = {"X-Internal-Token": "t"}
+    try:
+        assert (await client.post("/internal/profile/cpu?seconds=0.01")).status == 401
+        resp = await client.post("/internal/profile/cpu?seconds=0.05", headers=headers)
+        assert resp.status == 200
+        assert resp.headers["Content-Disposition"].endswith('.folded"')
+        snap = await (await client.post("/internal/memory/snapshot", headers=headers)).json()
+        diff = await client.get(f"/internal/memory/diff?base={snap['id']}", headers=headers)
+        assert diff.status == 200
+        assert (await client.get("/internal/memory/diff?base=999", headers=headers)).status == 400
+    finally:
+        await client.post("/internal/memory/stop", headers=headers)
+        await client.close()
@@ -0,0 +1,45 @@
+import types
+import pytest
+
+from src.utils.render import edit_text_if_changed, render_hash
+from src.keyboards.inline import get_subscription_detail_keyboard
+
+
+class FakeRenderStore:
+    def __init__(self):
+        self.hashes = {}
+
+    async def get_render_hash(self, chat_id, message_id):
+        return self.hashes.get((chat_id, message_id))
+
+    async def set_render_hash(self, chat_id, message_id, digest):
+        self.hashes[(chat_id, message_id)] = digest
+
+
+class FakeMessage:
+    def __init__(self):
+        self.chat = types.SimpleNamespace(id=1)
+        self.message_id = 10
+        self.edits = []
+
+    async def edit_text(self, text, reply_markup=None):
+        self.edits.append(text)
+
+
+def test_render_hash_depends_on_markup():
+    kb1 = get_subscription_detail_keyboard(1, "ru")
+    kb2 = get_subscription_detail_keyboard(2, "ru")
+    assert render_hash("a", kb1) == render_hash("a", get_subscription_detail_keyboard(1, "ru"))
+    assert render_hash("a", kb1) != render_hash("a", kb2)
+    assert render_hash("a") != render_hash("a", kb1)
+
+
+@pytest.mark.asyncio
+async def test_edit_skipped_when_render_unchanged():
+    store = FakeRenderStore()
+    message = FakeMessage()
+    kb = get_subscription_detail_keyboard(1, "ru")
+    assert await edit_text_if_changed(message, store, "text", reply_markup=kb)
+    assert not await edit_text_if_changed(message, store, "text", reply_markup=kb)
+    assert await edit_text_if_changed(message, store, "other", reply_markup=kb)
+    assert message.edits == ["text", "other"]
@@ -0,0 +1,71 @@
+import json
+
+import httpx
+import pytest
+from fakeredis.aioredis import FakeRedis
+
+from src.clients.backend_api import BackendAPIClient
+from src.monitoring.tracing import Tracer, current_trace_id, format_trace, span, to_otlp
+from src.storage.redis_helper import RedisHelper
+
+
+def test_spans_outside_trace_are_noops():
+    with span("orphan") as current:
+        assert current is None
+    assert current_trace_id() is None
+
+
+@pytest.mark.asyncio
+async def test_update_trace_collects_spans_and_propagates_request_id(tmp_path):
+    seen = []
+
+    def handler(request):
+        seen.append(request.headers.get("X-Request-Id"))
+        return httpx.Response(200, json={"id": 1})
+
+    client = BackendAPIClient()
+    client.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    helper = RedisHelper(FakeRedis())
+    tracer = Tracer(slow_threshold=0, buffer_size=2, export_path=str(tmp_path / "traces.jsonl"))
+
+    with tracer.trace("update callback_query", update_id=7, user_id=42) as trace:
+        await helper.set_page(42, "subs", 1)
+        await client.get_subscription(5)
+    await client.aclose()
+
+    assert seen == [trace.trace_id]
+    assert [(item.kind, item.name) for item in trace.spans] == [
+        ("redis", "set_page"),
+        ("backend", "GET /subscriptions/{id}"),
+    ]
+    assert trace.spans[1].attributes["http.status_code"] == 200
+    assert all(item.parent_id == trace.root.span_id for item in trace.spans)
+    assert tracer.slow_traces() == [trace]
+    assert "GET /subscriptions/{id}" in format_trace(trace)
+
+    # Медленная трасса уже выгружена автоматически — export() её не дублирует
+    assert tracer.export() == 0
+    tracer.close()
+    assert len((tmp_path / "traces.jsonl").read_text().splitlines()) == 1
+    exported = json.loads((tmp_path / "traces.jsonl").read_text().splitlines()[0])
+    spans = exported["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    assert {item["traceId"] for item in spans} == {trace.trace_id}
+    assert spans[0]["name"] == "update callback_query" and "parentSpanId" not in spans[0]
+
+
+def test_errors_and_ring_buffer_limits():
+    tracer = Tracer(slow_threshold=0, buffer_size=2)
+    for i in range(3):
+        with pytest.raises(RuntimeError):
+            with tracer.trace(f"update {i}"):
+                with span("work"):
+                    raise RuntimeError("boom")
+    traces = tracer.slow_traces()
+    assert [trace.root.name for trace in traces] == ["update 2", "update 1"]
+    assert traces[0].spans[0].error == "RuntimeError: boom"
+    assert to_otlp(traces)["resourceSpans"][0]["scopeSpans"][0]["spans"][0]["status"]["code"] == 2
+
+    fast = Tracer(slow_threshold=10)
+    with fast.trace("update quick"):
+        pass
+    assert fast.slow_traces() == []
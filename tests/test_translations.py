@@ -0,0 +1,88 @@
+import json
+
+import pytest
+
+from src.i18n.translations import CompiledTemplate, TranslationError, Translations, translations
+
+
+def _write(tmp_path, **catalogs):
+    for language, catalog in catalogs.items():
+        (tmp_path / f"{language}.json").write_text(json.dumps(catalog, ensure_ascii=False), encoding="utf-8")
+    return Translations(tmp_path)
+
+
+@pytest.mark.parametrize("template", [
+    "plain",
+    "{{braces}} only",
+    "a {x} b {y}",
+    "{x!r:>8} | {y:.2f}",
+    "quotes ' \" and \\ {x}",
+    "nested {y:{width}}",
+    "keyword {class} and {x!a}",
+])
+def test_compiled_template_matches_str_format(template):
+    values = {"x": "v", "y": 1.5, "width": 6, "class": "c"}
+    assert CompiledTemplate(template).render(**values) == template.format(**values)
+
+
+def test_shipped_catalogs_load_and_validate():
+    for language in translations.languages:
+        assert translations.catalog(language)
+    assert translations.get("pagination.page", "en", page=1, pages=3) == "◀️ 1/3 ▶️"
+    assert translations.get("pagination.page", "en") == "◀️ {page}/{pages} ▶️"
+
+
+def test_languages_load_lazily(tmp_path):
+    source = _write(tmp_path, ru={"k": "ру"}, en={"k": "en"})
+    assert source.languages == ("en", "ru")
+    assert source._catalogs == {}
+    assert source.get("k", "ru") == "ру"
+    assert set(source._catalogs) == {"ru"}
+
+
+def test_fallback_chain(tmp_path):
+    source = _write(
+        tmp_path,
+        ru={"a": "ру-a", "b": "ру-b", "c": "ру-c"},
+        en={"a": "en-a", "b": "en-b"},
+        uk={"a": "uk-a"},
+    )
+    source.fallbacks = {"uk": ["en"]}
+    assert source.get("a", "uk") == "uk-a"
+    assert source.get("b", "uk") == "en-b"
+    assert source.get("c", "uk") == "ру-c"
+    assert source.get("b", "en-GB") == "en-b"
+    assert source.get("a", "xx") == "ру-a"
+    assert source.get("missing", "en") == "missing"
+
+
+def test_unknown_placeholder_is_rejected_at_load(tmp_path):
+    source = _write(tmp_path, ru={"k": "{n} шт"}, en={"k": "{count} pcs"})
+    with pytest.raises(TranslationError, match="count"):
+        source.get("k", "en", n=1)
+
+
+def test_dropped_placeholder_is_rejected_at_load(tmp_path):
+    source = _write(tmp_path, ru={"k": "{n} из {total}"}, en={"k": "{n} items"})
+    with pytest.raises(TranslationError, match="missing placeholders.*total"):
+        source.get("k", "en", n=1)
+
+
+def test_malformed_template_is_rejected_at_load(tmp_path):
+    source = _write(tmp_path, ru={"k": "broken {"})
+    with pytest.raises(TranslationError):
+        source.get("k", "ru")
+
+
+@pytest.mark.parametrize("template", ["{x!z}", "{x!}"])
+def test_invalid_conversion_is_rejected_at_load(tmp_path, template):
+    with pytest.raises(TranslationError):
+        _write(tmp_path, ru={"k": template}).get("k", "ru")
+
+
+def test_missing_placeholder_raises_translation_error(tmp_path):
+    source = _write(tmp_path, ru={"k": "{n} из {total}", "kw": "{n} {class}"})
+    with pytest.raises(TranslationError, match="total"):
+        source.get("k", "ru", n=1)
+    with pytest.raises(TranslationError, match="class"):
+        source.get("kw", "ru", n=1)
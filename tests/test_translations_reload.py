@@ -0,0 +1,81 @@
+import asyncio
+import json
+
+import pytest
+from fakeredis import FakeServer
+from fakeredis.aioredis import FakeRedis
+
+from src.i18n.reload import TranslationReloader
+from src.i18n.translations import TranslationError, Translations
+
+
+def _write(path, language, catalog):
+    (path / f"{language}.json").write_text(json.dumps(catalog, ensure_ascii=False), encoding="utf-8")
+
+
+async def _eventually(predicate, timeout: float = 2.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not predicate():
+        assert asyncio.get_running_loop().time() < deadline
+        await asyncio.sleep(0.01)
+
+
+@pytest.mark.asyncio
+async def test_reload_swaps_catalogs_and_notifies_listeners(tmp_path):
+    _write(tmp_path, "ru", {"k": "старый {n}"})
+    source = Translations(tmp_path)
+    calls = []
+    source.add_reload_listener(lambda: calls.append(source.get("k", "ru", n=1)))
+    assert source.get("k", "ru", n=1) == "старый 1"
+
+    _write(tmp_path, "ru", {"k": "новый {n}"})
+    _write(tmp_path, "en", {"k": "new {n}"})
+    languages = await TranslationReloader(source).reload()
+
+    assert languages == ("en", "ru")
+    assert source.get("k", "en", n=2) == "new 2"
+    assert calls == ["новый 1"]
+
+
+@pytest.mark.asyncio
+async def test_broken_catalog_keeps_previous_translations(tmp_path):
+    _write(tmp_path, "ru", {"k": "ок"})
+    source = Translations(tmp_path)
+    assert source.get("k", "ru") == "ок"
+    _write(tmp_path, "ru", {"k": "сломан {"})
+    with pytest.raises(TranslationError):
+        await TranslationReloader(source).reload()
+    assert source.get("k", "ru") == "ок"
+
+
+@pytest.mark.asyncio
+async def test_reload_is_broadcast_to_other_replicas(tmp_path):
+    _write(tmp_path, "ru", {"k": "v1"})
+    server = FakeServer()
+    replicas = []
+    for _ in range(2):
+        reloader = TranslationReloader(Translations(tmp_path))
+        reloader.bind(FakeRedis(server=server), "test:i18n:reload")
+        await reloader.start()
+        replicas.append(reloader)
+    first, second = replicas
+    try:
+        await asyncio.sleep(0.05)
+        _write(tmp_path, "ru", {"k": "v2"})
+        await first.reload()
+        await _eventually(lambda: second.source.get("k", "ru") == "v2")
+    finally:
+        for reloader in replicas:
+            await reloader.stop()
+
+
+@pytest.mark.asyncio
+async def test_watcher_picks_up_file_changes(tmp_path):
+    _write(tmp_path, "ru", {"k": "v1"})
+    reloader = TranslationReloader(Translations(tmp_path))
+    await reloader.start(poll_interval=0.01)
+    try:
+        _write(tmp_path, "ru", {"k": "v2-longer"})
+        await _eventually(lambda: reloader.source.get("k", "ru") == "v2-longer")
+    finally:
+        await reloader.stop()